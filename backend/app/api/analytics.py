@@ -4,7 +4,7 @@ Provides metrics and statistics for business dashboards.
 """
 
 from fastapi import APIRouter, HTTPException
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from app.services.database import db
 
 router = APIRouter()
@@ -15,67 +15,46 @@ async def get_analytics(business_id: str, days: int = 30):
     """
     Get analytics data for a business.
     Returns conversation counts, message stats, and channel breakdown.
+    All counting is done by SQL aggregates, so the number of queries is
+    constant regardless of how much data the business has.
     """
     # Verify business exists
     business = db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
 
-    # Get all conversations for this business
-    conversations = db.get_business_conversations(business_id)
-
     # Calculate date range
     now = datetime.utcnow()
     start_date = now - timedelta(days=days)
+    since = start_date.replace(tzinfo=timezone.utc).isoformat()
 
-    # Filter conversations within date range
-    recent_conversations = []
-    for conv in conversations:
-        conv_date = conv.get("started_at")
-        if conv_date:
-            if isinstance(conv_date, str):
-                conv_date = datetime.fromisoformat(conv_date.replace("Z", "+00:00"))
-            if conv_date.replace(tzinfo=None) >= start_date:
-                recent_conversations.append(conv)
+    # Counts, channel breakdown, message totals and ratings in one aggregate query
+    stats = db.get_analytics_summary(business_id, since)
 
-    # Calculate metrics
-    total_conversations = len(conversations)
-    recent_count = len(recent_conversations)
+    total_conversations = stats.get("total_conversations", 0)
+    recent_count = stats.get("recent_conversations", 0)
 
     # Channel breakdown
-    widget_count = sum(1 for c in conversations if c.get("channel") == "widget")
-    whatsapp_count = sum(1 for c in conversations if c.get("channel") == "whatsapp")
-
-    # Recent channel breakdown
-    recent_widget = sum(1 for c in recent_conversations if c.get("channel") == "widget")
-    recent_whatsapp = sum(1 for c in recent_conversations if c.get("channel") == "whatsapp")
-
-    # Get message counts
-    total_messages = 0
-    user_messages = 0
-    assistant_messages = 0
+    widget_count = stats.get("widget_total", 0)
+    whatsapp_count = stats.get("whatsapp_total", 0)
+    recent_widget = stats.get("widget_recent", 0)
+    recent_whatsapp = stats.get("whatsapp_recent", 0)
 
-    for conv in conversations:
-        messages = db.get_conversation_messages(conv["id"])
-        total_messages += len(messages)
-        user_messages += sum(1 for m in messages if m.get("role") == "user")
-        assistant_messages += sum(1 for m in messages if m.get("role") == "assistant")
+    # Message counts
+    total_messages = stats.get("total_messages", 0)
+    user_messages = stats.get("user_messages", 0)
+    assistant_messages = stats.get("assistant_messages", 0)
 
-    # Calculate conversations per day for the chart
+    # Conversations per day for the chart, one rollup row per day and channel (see migration 022)
     daily_counts = {}
     for i in range(days):
         date = (now - timedelta(days=i)).strftime("%Y-%m-%d")
         daily_counts[date] = {"widget": 0, "whatsapp": 0}
 
-    for conv in recent_conversations:
-        conv_date = conv.get("started_at")
-        if conv_date:
-            if isinstance(conv_date, str):
-                conv_date = datetime.fromisoformat(conv_date.replace("Z", "+00:00"))
-            date_str = conv_date.strftime("%Y-%m-%d")
-            if date_str in daily_counts:
-                channel = conv.get("channel", "widget")
-                daily_counts[date_str][channel] += 1
+    today = now.date()
+    for row in db.get_daily_stats(business_id, today - timedelta(days=days - 1), today):
+        if row["day"] in daily_counts:
+            daily_counts[row["day"]][row.get("channel") or "widget"] += row["conversations"]
 
     # Convert to sorted list for chart
     chart_data = [
@@ -83,26 +62,26 @@ async def get_analytics(business_id: str, days: int = 30):
         for date, counts in sorted(daily_counts.items())
     ]
 
-    # Get recent conversations for activity feed
+    # Get recent conversations for activity feed (counters and preview are columns, see migration 021)
+    recent_conversations = db.get_conversations_by_business(business_id, limit=10, started_after=since)
+
     recent_activity = []
-    for conv in sorted(recent_conversations, key=lambda x: x.get("last_message_at", ""), reverse=True)[:10]:
-        messages = db.get_conversation_messages(conv["id"])
-        last_message = messages[-1] if messages else None
+    for conv in recent_conversations:
+        last_content = conv.get("last_message_preview") or ""
         recent_activity.append({
             "id": conv["id"],
             "channel": conv.get("channel", "widget"),
             "visitor_id": conv.get("visitor_id", "Unknown"),
             "started_at": conv.get("started_at"),
             "last_message_at": conv.get("last_message_at"),
-            "message_count": len(messages),
-            "last_message_preview": (last_message.get("content", "")[:50] + "...") if last_message and len(last_message.get("content", "")) > 50 else (last_message.get("content", "") if last_message else ""),
+            "message_count": conv.get("message_count", 0),
+            "last_message_preview": (last_content[:50] + "...") if len(last_content) > 50 else last_content,
         })
 
     # Satisfaction stats
-    rated_conversations = [c for c in conversations if c.get("rating")]
-    total_rated = len(rated_conversations)
-    positive_count = sum(1 for c in rated_conversations if c.get("rating") == "positive")
-    negative_count = sum(1 for c in rated_conversations if c.get("rating") == "negative")
+    total_rated = stats.get("total_rated", 0)
+    positive_count = stats.get("positive_ratings", 0)
+    negative_count = stats.get("negative_ratings", 0)
     satisfaction_percent = round((positive_count / total_rated) * 100) if total_rated > 0 else None
 
     return {
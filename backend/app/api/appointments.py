@@ -18,6 +18,8 @@ from app.models.schemas import (
 )
 from app.services.database import db
 from app.services.notifications import get_notification_service
+from app.services.availability import find_available_slots
+from app.services.business_cache import business_cache
 from app.services.admin import is_platform_admin
 from app.api.business import get_user_id_from_header
 
@@ -158,7 +160,8 @@ async def update_appointment(
     new_status = update_data.get("status")
     if new_status == "cancelled" and old_status != "cancelled":
         try:
-            notification_service.send_appointment_cancellation(
+            notification_service.send_in_background(
+                notification_service.send_appointment_cancellation,
                 appointment_id=appointment_id,
                 business_id=appointment["business_id"],
                 customer_name=appointment["customer_name"],
@@ -179,7 +182,8 @@ async def update_appointment(
 
     if is_rescheduled and new_status != "cancelled":
         try:
-            notification_service.send_appointment_update(
+            notification_service.send_in_background(
+                notification_service.send_appointment_update,
                 appointment_id=appointment_id,
                 business_id=appointment["business_id"],
                 customer_name=appointment["customer_name"],
@@ -274,6 +278,7 @@ async def update_business_availability(
         availability_data["timezone"] = availability.timezone
 
     result = db.upsert_business_availability(business_id, availability_data)
+    business_cache.invalidate(business_id)
     return result
 
 
@@ -304,74 +309,18 @@ async def get_available_slots(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    # Get existing appointments
+    # Get existing pending/confirmed appointments in one query
     end_date_str = (start + timedelta(days=days)).strftime("%Y-%m-%d")
-    existing_appointments = db.get_appointments_by_business(
+    booked = db.get_booked_appointments(
         business_id=business_id,
         start_date=start_date,
         end_date=end_date_str,
-        status="pending",  # Only check pending and confirmed
     )
-    confirmed_appointments = db.get_appointments_by_business(
-        business_id=business_id,
-        start_date=start_date,
-        end_date=end_date_str,
-        status="confirmed",
-    )
-    existing_appointments.extend(confirmed_appointments)
-
-    # Build list of available slots
-    available_slots = []
-    weekly_schedule = availability["weekly_schedule"]
-    duration = availability["default_duration_minutes"]
-    buffer = availability["buffer_minutes"]
-
-    for day_offset in range(days):
-        current_date = start + timedelta(days=day_offset)
-        day_name = current_date.strftime("%A").lower()
-
-        # Check if this day is enabled
-        if day_name not in weekly_schedule or not weekly_schedule[day_name]["enabled"]:
-            continue
-
-        day_slots = weekly_schedule[day_name].get("slots", [])
-        for slot in day_slots:
-            slot_start = datetime.strptime(slot["start"], "%H:%M").time()
-            slot_end = datetime.strptime(slot["end"], "%H:%M").time()
-
-            # Generate time slots within this range
-            current_time = datetime.combine(current_date, slot_start)
-            end_time = datetime.combine(current_date, slot_end)
-
-            while current_time + timedelta(minutes=duration) <= end_time:
-                time_str = current_time.strftime("%H:%M")
-
-                # Check if this slot is already booked
-                is_booked = False
-                for appt in existing_appointments:
-                    if appt["appointment_date"] == current_date.strftime("%Y-%m-%d"):
-                        appt_time = datetime.strptime(appt["appointment_time"], "%H:%M:%S").time()
-                        appt_datetime = datetime.combine(current_date, appt_time)
-                        appt_end = appt_datetime + timedelta(minutes=appt["duration_minutes"])
-
-                        # Check for overlap
-                        if current_time < appt_end and current_time + timedelta(minutes=duration) > appt_datetime:
-                            is_booked = True
-                            break
-
-                if not is_booked:
-                    available_slots.append(
-                        AvailableSlot(
-                            date=current_date.strftime("%Y-%m-%d"),
-                            time=time_str,
-                            duration_minutes=duration,
-                        )
-                    )
-
-                # Move to next slot (duration + buffer)
-                current_time += timedelta(minutes=duration + buffer)
-
-    return available_slots
+
+    return [
+        AvailableSlot(date=slot["date"], time=slot["time"], duration_minutes=slot["duration_minutes"])
+        for slot in find_available_slots(availability, booked, start, days)
+    ]
 
 
 @router.get("/customer/{business_id}/phone/{phone}", response_model=list[AppointmentResponse])
@@ -4,6 +4,7 @@ Handles CRUD operations for businesses and their configurations.
 """
 
 from fastapi import APIRouter, HTTPException, Header
+from postgrest.exceptions import APIError
 from typing import Optional
 
 from app.models.schemas import (
@@ -16,6 +17,11 @@ from app.models.schemas import (
 )
 from app.services.database import db
 from app.services.admin import is_platform_admin
+from app.services.business_cache import (
+    get_business_context,
+    invalidate_business,
+    normalize_whatsapp_number,
+)
 
 router = APIRouter()
 
@@ -56,6 +62,8 @@ async def create_business(
     if not result:
         raise HTTPException(status_code=500, detail="Failed to create business")
 
+    # A second business ends the single-business WhatsApp fallback
+    invalidate_business(result)
     return result
 
 
@@ -123,11 +131,20 @@ async def update_business(
     update_data = {k: v for k, v in updates.model_dump().items() if v is not None}
     if "language" in update_data:
         update_data["language"] = update_data["language"].value
+    if "whatsapp_number" in update_data:
+        # Empty string unlinks the number
+        update_data["whatsapp_number"] = normalize_whatsapp_number(update_data["whatsapp_number"]) or None
 
     if not update_data:
         return business
 
-    result = db.update_business(business_id, update_data)
+    try:
+        result = db.update_business(business_id, update_data)
+    except APIError as e:
+        if e.code == "23505":  # unique_violation on whatsapp_number
+            raise HTTPException(status_code=409, detail="This WhatsApp number is already linked to another business")
+        raise
+    invalidate_business(business)
     return result
 
 
@@ -153,6 +170,7 @@ async def delete_business(
     success = db.delete_business(business_id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete business")
+    invalidate_business(business)
 
     return {"status": "success", "message": "Business deleted successfully"}
 
@@ -201,6 +219,10 @@ async def update_business_config(
         config_data["away_message_en"] = config.away_message_en
 
     result = db.upsert_business_config(business_id, config_data)
+    invalidate_business(business)
+    # Reload the chat context now so the FAQ/product retrieval index is
+    # rebuilt here rather than on the next customer message
+    await get_business_context(business_id)
     return {"status": "success", "config": result}
 
 
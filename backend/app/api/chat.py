@@ -3,168 +3,188 @@ Chat API endpoints.
 Handles chat interactions between customers and the AI chatbot.
 """
 
+import asyncio
+import hashlib
+import json
 import re
-from fastapi import APIRouter, HTTPException
+import time
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
+from app.config import get_settings
 from app.models.schemas import ChatRequest, ChatResponse, ConversationWithMessages, ConversationRating, TranscriptRequest
-from app.services.database import db
-from app.services.ai import get_ai_service
+from app.services.database import async_db
+from app.services.ai import AI_ERROR_MESSAGE, HISTORY_WINDOW, get_ai_service
+from app.services.availability import find_available_slots, get_online_status
+from app.services.business_cache import get_business_context, get_cached_system_prompt, get_faq_answer, get_turn_knowledge
 from app.services.notifications import get_notification_service
+from app.services.live_events import live_events, sse_event
+from app.services.summaries import schedule_summary_update
 from app.services.email import get_email_service
 
 router = APIRouter()
+settings = get_settings()
 
 
-def get_available_slots_for_chat(business_id: str, days: int = 5) -> list[dict]:
+async def get_available_slots_for_chat(
+    business_id: str,
+    days: int = 5,
+    availability: Optional[dict] = None,
+) -> list[dict]:
     """
     Get available time slots for the next N days.
     Returns a simplified list of slots for the AI to present.
     """
-    availability = db.get_business_availability(business_id)
+    if availability is None:
+        availability = await async_db.get_business_availability(business_id)
     if not availability:
         return []
 
     start = datetime.now().date()
     end_date = start + timedelta(days=days)
 
-    # Get existing appointments
-    existing_appointments = db.get_appointments_by_business(
+    booked = await async_db.get_booked_appointments(
         business_id=business_id,
         start_date=start.strftime("%Y-%m-%d"),
         end_date=end_date.strftime("%Y-%m-%d"),
-        status="pending",
     )
-    confirmed = db.get_appointments_by_business(
-        business_id=business_id,
-        start_date=start.strftime("%Y-%m-%d"),
-        end_date=end_date.strftime("%Y-%m-%d"),
-        status="confirmed",
-    )
-    existing_appointments.extend(confirmed)
-
-    # Build list of available slots
-    available_slots = []
-    weekly_schedule = availability["weekly_schedule"]
-    duration = availability["default_duration_minutes"]
-    buffer = availability["buffer_minutes"]
-
-    for day_offset in range(days):
-        current_date = start + timedelta(days=day_offset)
-        day_name = current_date.strftime("%A").lower()
-
-        if day_name not in weekly_schedule or not weekly_schedule[day_name]["enabled"]:
-            continue
-
-        day_slots = weekly_schedule[day_name].get("slots", [])
-        for slot in day_slots:
-            slot_start = datetime.strptime(slot["start"], "%H:%M").time()
-            slot_end = datetime.strptime(slot["end"], "%H:%M").time()
-
-            current_time = datetime.combine(current_date, slot_start)
-            end_time = datetime.combine(current_date, slot_end)
-
-            while current_time + timedelta(minutes=duration) <= end_time:
-                time_str = current_time.strftime("%H:%M")
-
-                # Check if slot is booked
-                is_booked = False
-                for appt in existing_appointments:
-                    if appt["appointment_date"] == current_date.strftime("%Y-%m-%d"):
-                        try:
-                            appt_time = datetime.strptime(appt["appointment_time"], "%H:%M:%S").time()
-                        except ValueError:
-                            appt_time = datetime.strptime(appt["appointment_time"], "%H:%M").time()
-                        appt_datetime = datetime.combine(current_date, appt_time)
-                        appt_end = appt_datetime + timedelta(minutes=appt["duration_minutes"])
-
-                        if current_time < appt_end and current_time + timedelta(minutes=duration) > appt_datetime:
-                            is_booked = True
-                            break
-
-                if not is_booked:
-                    available_slots.append({
-                        "date": current_date.strftime("%Y-%m-%d"),
-                        "time": time_str,
-                        "duration_minutes": duration,
-                        "display_date": current_date.strftime("%A %d %B"),  # e.g., "Monday 04 February"
-                    })
-
-                current_time += timedelta(minutes=duration + buffer)
 
     # Return only first 10 slots to keep response manageable
-    return available_slots[:10]
+    return find_available_slots(availability, booked, start, days, limit=10)
 
 
-@router.post("", response_model=ChatResponse)
-async def send_message(request: ChatRequest):
+async def _prepare_chat_turn(request: ChatRequest) -> dict:
     """
-    Send a message to the chatbot and get a response.
-    This endpoint is called by the chat widget.
+    Run everything that happens before the AI reply for a chat turn:
+    load the business, resolve the conversation, save the user message and
+    gather history and slots.
+
+    Independent reads run concurrently: once the business context is known,
+    the slot lookup starts in the background, and an existing conversation
+    is verified while its history loads. The critical path is context ->
+    conversation + history -> user message insert, and the stage timings
+    are logged per turn.
+
+    Returns a dict describing the turn. If the conversation is in human
+    takeover mode, the dict carries a ready-made "response" and no AI reply
+    should be generated.
     """
-    # Get the business and its config
-    business = db.get_business(request.business_id)
-    if not business:
+    timings = {}
+    started = stage_started = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal stage_started
+        now = time.perf_counter()
+        timings[stage] = (now - stage_started) * 1000
+        stage_started = now
+
+    # Get the business, its config and availability (cached per business)
+    context = await get_business_context(request.business_id)
+    if not context:
         raise HTTPException(status_code=404, detail="Business not found")
+    lap("context")
 
-    config = db.get_business_config(request.business_id)
-    business["config"] = config
-
-    # Get or create conversation
-    conversation_id = request.conversation_id
-    if not conversation_id:
-        # Create new conversation
-        conversation = db.create_conversation(
-            business_id=request.business_id,
-            visitor_id=request.visitor_id,
-            channel="widget",
-        )
-        if not conversation:
-            raise HTTPException(status_code=500, detail="Failed to create conversation")
-        conversation_id = conversation["id"]
+    business = context["business"]
+    config = context["config"]
 
-        # Save visitor info from lead capture form if provided
-        if any([request.visitor_name, request.visitor_email, request.visitor_phone]):
-            db.update_conversation_visitor_info(
-                conversation_id=conversation_id,
-                visitor_name=request.visitor_name,
-                visitor_email=request.visitor_email,
-                visitor_phone=request.visitor_phone,
-            )
+    # Check if business has appointment booking enabled
+    availability = context["availability"]
+    has_appointments = availability is not None
 
-        # Persist the welcome message that the widget already displayed locally.
-        # Without this the AI has no prior context and repeats the greeting.
-        lang = business.get("language", "fr")
-        if lang == "en":
-            welcome = config.get("welcome_message_en", "Hello! How can I help you?") if config else "Hello! How can I help you?"
-        else:
-            welcome = config.get("welcome_message", "Bonjour! Comment puis-je vous aider?") if config else "Bonjour! Comment puis-je vous aider?"
-        db.create_message(conversation_id=conversation_id, role="assistant", content=welcome)
-    else:
-        # Verify conversation exists and belongs to this business
-        conversation = db.get_conversation(conversation_id)
-        if not conversation:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        if conversation["business_id"] != request.business_id:
-            raise HTTPException(status_code=403, detail="Conversation doesn't belong to this business")
-
-    # Save the user message with optional media
+    # Slots only depend on the business - fetch them while the conversation is resolved
+    slots_task = None
+    if has_appointments:
+        slots_task = asyncio.create_task(
+            get_available_slots_for_chat(request.business_id, days=5, availability=availability)
+        )
+
+    # User message media attachments
     media_data = None
     if request.media:
         media_data = [m.model_dump() for m in request.media]
 
-    db.create_message(
-        conversation_id=conversation_id,
-        role="user",
-        content=request.message,
-        media=media_data,
-    )
+    try:
+        # Get or create conversation, save the user message and load the messages before it
+        conversation_id = request.conversation_id
+        if not conversation_id:
+            # Create new conversation
+            conversation = await async_db.create_conversation(
+                business_id=request.business_id,
+                visitor_id=request.visitor_id,
+                channel="widget",
+            )
+            if not conversation:
+                raise HTTPException(status_code=500, detail="Failed to create conversation")
+            conversation_id = conversation["id"]
+            live_events.publish(request.business_id, "conversation", {"conversation": conversation})
+
+            # Persist the welcome message that the widget already displayed locally.
+            # Without this the AI has no prior context and repeats the greeting.
+            lang = business.get("language", "fr")
+            if lang == "en":
+                welcome = config.get("welcome_message_en", "Hello! How can I help you?") if config else "Hello! How can I help you?"
+            else:
+                welcome = config.get("welcome_message", "Bonjour! Comment puis-je vous aider?") if config else "Bonjour! Comment puis-je vous aider?"
+            # Saved together with the user message in a single write
+            messages_insert = async_db.create_messages(conversation_id, [
+                {"role": "assistant", "content": welcome},
+                {"role": "user", "content": request.message, "media": media_data},
+            ])
+
+            # Save visitor info from lead capture form if provided
+            if any([request.visitor_name, request.visitor_email, request.visitor_phone]):
+                inserted, _ = await asyncio.gather(
+                    messages_insert,
+                    async_db.update_conversation_visitor_info(
+                        conversation_id=conversation_id,
+                        visitor_name=request.visitor_name,
+                        visitor_email=request.visitor_email,
+                        visitor_phone=request.visitor_phone,
+                    ),
+                )
+            else:
+                inserted = await messages_insert
+            for message in inserted:
+                live_events.publish_message(request.business_id, conversation_id, message)
+            # A new conversation's history is just the welcome message
+            previous_messages = inserted[:1]
+            user_message = inserted[1] if len(inserted) > 1 else None
+            lap("conversation")
+        else:
+            # Verify conversation exists and belongs to this business, loading
+            # its recent history at the same time
+            conversation, previous_messages = await asyncio.gather(
+                async_db.get_conversation(conversation_id),
+                async_db.get_recent_messages(conversation_id, limit=HISTORY_WINDOW - 1),
+            )
+            if not conversation:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+            if conversation["business_id"] != request.business_id:
+                raise HTTPException(status_code=403, detail="Conversation doesn't belong to this business")
+            lap("conversation")
+
+            # Save the user message (also bumps the conversation's last_message_at)
+            user_message = await async_db.create_message(
+                conversation_id=conversation_id,
+                role="user",
+                content=request.message,
+                media=media_data,
+            )
+            live_events.publish_message(request.business_id, conversation_id, user_message)
+            lap("user_message")
+    except BaseException:
+        if slots_task:
+            slots_task.cancel()
+        raise
 
     # Check if conversation is in human takeover mode
     # If so, skip AI response - human agent will respond via dashboard
     if conversation and conversation.get("is_human_takeover"):
+        if slots_task:
+            slots_task.cancel()
         print(f"🙋 Conversation {conversation_id} is in human takeover mode - skipping AI")
-        db.update_conversation_timestamp(conversation_id)
 
         # Return acknowledgment that message was received
         lang = business.get("language", "fr")
@@ -173,19 +193,18 @@ async def send_message(request: ChatRequest):
         else:
             waiting_msg = "Message received. An agent will respond shortly."
 
-        return ChatResponse(
-            conversation_id=conversation_id,
-            message=waiting_msg,
-            created_at=datetime.now(timezone.utc),
-            is_human_takeover=True,
-        )
-
-    # Check if business has appointment booking enabled
-    availability = db.get_business_availability(request.business_id)
-    has_appointments = availability is not None
+        return {
+            "conversation_id": conversation_id,
+            "response": ChatResponse(
+                conversation_id=conversation_id,
+                message=waiting_msg,
+                created_at=datetime.now(timezone.utc),
+                is_human_takeover=True,
+            ),
+        }
 
-    # Get conversation history for context with media support
-    messages = db.get_conversation_messages(conversation_id)
+    # The recent conversation history the prompt uses, with media support
+    messages = previous_messages + [user_message or {"role": "user", "content": request.message, "media": media_data}]
     message_history = [
         {
             "role": m["role"],
@@ -213,29 +232,57 @@ async def send_message(request: ChatRequest):
     if not is_closing and len(user_message_lower.split()) <= 2:
         is_closing = user_message_lower in (closing_exact_fr + closing_exact_en)
 
-    # Fetch available slots if appointments are enabled
+    # FAQ fast path - answer restated FAQs without the LLM. Booking requests and
+    # images always go to the LLM so it can present slots or describe the media.
+    faq_answer = None
+    if not is_closing and not request.media and not (
+        has_appointments and get_ai_service().detect_appointment_intent(request.message, business["language"])
+    ):
+        faq_answer = get_faq_answer(context, request.message)
+
+    # Available slots if appointments are enabled (usually ready by now)
     available_slots = []
-    if has_appointments:
-        available_slots = get_available_slots_for_chat(request.business_id, days=5)
+    if slots_task:
+        available_slots = await slots_task
+        lap("slots_wait")
+
+    timings["total"] = (time.perf_counter() - started) * 1000
+    print("⏱️ Chat turn prep: " + ", ".join(f"{stage} {ms:.0f}ms" for stage, ms in timings.items()))
+
+    return {
+        "business": business,
+        "context": context,
+        "conversation_id": conversation_id,
+        "availability": availability,
+        "has_appointments": has_appointments,
+        "message_history": message_history,
+        "history_window": messages,
+        "summary": conversation.get("summary") if conversation else None,
+        "knowledge": get_turn_knowledge(context, message_history),
+        "available_slots": available_slots,
+        "is_closing": is_closing,
+        "faq_answer": faq_answer,
+    }
+
+
+def _closing_message(business: dict) -> str:
+    """Friendly closing message sent when the visitor ends the conversation."""
+    if business["language"] == "fr":
+        return "Merci d'avoir contacté " + business["name"] + " ! N'hésitez pas à revenir si vous avez besoin d'aide. À bientôt ! 👋"
+    return "Thank you for contacting " + business["name"] + "! Feel free to come back if you need help. See you soon! 👋"
 
-    # Generate AI response (or closing message if user wants to end)
-    try:
-        if is_closing:
-            # User wants to end conversation - send friendly closing message
-            if business["language"] == "fr":
-                ai_response = "Merci d'avoir contacté " + business["name"] + " ! N'hésitez pas à revenir si vous avez besoin d'aide. À bientôt ! 👋"
-            else:
-                ai_response = "Thank you for contacting " + business["name"] + "! Feel free to come back if you need help. See you soon! 👋"
-        else:
-            ai_response = get_ai_service().generate_response(
-                messages=message_history,
-                business_context=business,
-                has_appointments=has_appointments,
-                available_slots=available_slots,
-            )
-    except Exception as e:
-        print(f"AI error: {e}")
-        ai_response = "Désolé, je rencontre un problème technique. Veuillez réessayer ou contacter l'entreprise directement."
+
+async def _finish_chat_turn(request: ChatRequest, turn: dict, ai_response: str) -> ChatResponse:
+    """
+    Post-process the AI reply for a chat turn: run the appointment booking
+    flow, persist the assistant message and build the widget response.
+    """
+    business = turn["business"]
+    conversation_id = turn["conversation_id"]
+    availability = turn["availability"]
+    has_appointments = turn["has_appointments"]
+    message_history = turn["message_history"]
+    available_slots = turn["available_slots"]
 
     # Check for appointment booking intent and auto-create if ready.
     # Trigger if the current message signals intent OR if recent messages in the
@@ -302,7 +349,7 @@ async def send_message(request: ChatRequest):
             print(f"✅ All required info present - creating appointment...")
             try:
                 # Create the appointment
-                appointment = db.create_appointment(
+                appointment = await async_db.create_appointment(
                     business_id=request.business_id,
                     customer_name=appointment_info["name"],
                     customer_email=appointment_info["email"],  # Required field
@@ -318,10 +365,11 @@ async def send_message(request: ChatRequest):
                 if appointment:
                     appointment_created = True
                     print(f"🎉 Appointment created successfully! ID: {appointment['id']}")
-                    # Send confirmation notifications (email/SMS)
+                    # Send confirmation notifications (email/SMS) in the background
                     try:
                         notification_service = get_notification_service()
-                        notification_service.send_appointment_confirmation(
+                        notification_service.send_in_background(
+                            notification_service.send_appointment_confirmation,
                             appointment_id=appointment["id"],
                             business_id=request.business_id,
                             customer_name=appointment_info["name"],
@@ -360,14 +408,15 @@ async def send_message(request: ChatRequest):
             print(f"⚠️  Missing required info: {', '.join(missing)}")
 
     # Save the AI response
-    db.create_message(
+    assistant_message = await async_db.create_message(
         conversation_id=conversation_id,
         role="assistant",
         content=ai_response,
     )
+    live_events.publish_message(request.business_id, conversation_id, assistant_message)
 
-    # Update conversation timestamp
-    db.update_conversation_timestamp(conversation_id)
+    # Fold messages that left the history window into the rolling summary
+    schedule_summary_update(conversation_id, turn["history_window"], business.get("language", "fr"))
 
     # Return slot buttons only when:
     # 1. Appointment intent is active
@@ -426,22 +475,158 @@ async def send_message(request: ChatRequest):
     )
 
 
+@router.post("", response_model=ChatResponse)
+async def send_message(request: ChatRequest):
+    """
+    Send a message to the chatbot and get a response.
+    This endpoint is called by the chat widget.
+    """
+    turn = await _prepare_chat_turn(request)
+    if "response" in turn:
+        return turn["response"]
+
+    business = turn["business"]
+
+    # Generate AI response (or closing message if user wants to end)
+    try:
+        if turn["is_closing"]:
+            # User wants to end conversation - send friendly closing message
+            ai_response = _closing_message(business)
+        elif turn["faq_answer"]:
+            ai_response = turn["faq_answer"]
+        else:
+            ai_response = await get_ai_service().generate_response_async(
+                messages=turn["message_history"],
+                business_context=business,
+                has_appointments=turn["has_appointments"],
+                available_slots=turn["available_slots"],
+                system_prompt=get_cached_system_prompt(
+                    turn["context"], turn["has_appointments"], turn["available_slots"]
+                ),
+                summary=turn["summary"],
+                knowledge=turn["knowledge"],
+            )
+    except Exception as e:
+        print(f"AI error: {e}")
+        ai_response = AI_ERROR_MESSAGE
+
+    return await _finish_chat_turn(request, turn, ai_response)
+
+
+async def _run_stream_turn(request: ChatRequest, turn: dict, events: asyncio.Queue) -> None:
+    """
+    Generate and finish a streaming chat turn, putting ("token"|"done", payload)
+    events on `events` and None once there is nothing more to send.
+
+    Runs as its own task so the reply is saved and the booking flow runs even
+    if the client disconnects mid-stream.
+    """
+    business = turn["business"]
+    chunks = []
+    try:
+        try:
+            if turn["is_closing"]:
+                chunks.append(_closing_message(business))
+                events.put_nowait(("token", {"content": chunks[-1]}))
+            elif turn["faq_answer"]:
+                chunks.append(turn["faq_answer"])
+                events.put_nowait(("token", {"content": chunks[-1]}))
+            else:
+                tokens = get_ai_service().stream_response_async(
+                    messages=turn["message_history"],
+                    business_context=business,
+                    has_appointments=turn["has_appointments"],
+                    available_slots=turn["available_slots"],
+                    system_prompt=get_cached_system_prompt(
+                        turn["context"], turn["has_appointments"], turn["available_slots"]
+                    ),
+                    summary=turn["summary"],
+                    knowledge=turn["knowledge"],
+                )
+                async for token in tokens:
+                    chunks.append(token)
+                    events.put_nowait(("token", {"content": token}))
+        except Exception as e:
+            print(f"AI streaming error: {e}")
+            # A reply cut off mid-stream is never saved as if it were complete
+            chunks.append(f"\n\n{AI_ERROR_MESSAGE}" if chunks else AI_ERROR_MESSAGE)
+            events.put_nowait(("token", {"content": chunks[-1]}))
+
+        response = await _finish_chat_turn(request, turn, "".join(chunks))
+        events.put_nowait(("done", response.model_dump(mode="json")))
+    except Exception as e:
+        print(f"Error finishing streamed chat turn: {e}")
+    finally:
+        events.put_nowait(None)
+
+
+# Streaming turns still generating or saving, kept referenced so they finish
+# after a client disconnect
+_stream_turns: set[asyncio.Task] = set()
+
+
+async def drain_stream_turns(timeout: float = 30.0) -> None:
+    """Wait for in-flight streaming turns to finish (called on shutdown)."""
+    if _stream_turns:
+        await asyncio.wait(set(_stream_turns), timeout=timeout)
+
+
+@router.post("/stream")
+async def send_message_stream(request: ChatRequest):
+    """
+    Streaming variant of POST /api/chat for the widget.
+
+    Responds with Server-Sent Events:
+      - "token": {"content": "..."} for each piece of the AI reply as Groq produces it
+      - "done": the same payload as POST /api/chat, sent once the reply has been
+        saved and the appointment flow has run. Its "message" is the final text
+        (it may include a booking confirmation appended after streaming).
+
+    The reply is generated and saved by a background task; the SSE stream only
+    forwards its events, so a disconnect stops the forwarding, not the turn.
+    """
+    turn = await _prepare_chat_turn(request)
+
+    if "response" in turn:
+        async def event_stream():
+            yield sse_event("done", turn["response"].model_dump(mode="json"))
+    else:
+        events: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(_run_stream_turn(request, turn, events))
+        _stream_turns.add(task)
+        task.add_done_callback(_stream_turns.discard)
+
+        async def event_stream():
+            while (event := await events.get()) is not None:
+                yield sse_event(*event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/conversation/{conversation_id}", response_model=ConversationWithMessages)
-async def get_conversation(conversation_id: str):
+async def get_conversation(conversation_id: str, limit: int = 50, before: Optional[str] = None):
     """
-    Get a conversation with all its messages.
+    Get a conversation with its most recent messages (oldest first).
     Used by the dashboard to view conversation history.
+
+    To load older messages, pass the created_at of the first message
+    returned as `before`.
     """
-    conversation = db.get_conversation(conversation_id)
+    conversation = await async_db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    messages = db.get_conversation_messages(conversation_id)
+    messages = await async_db.get_recent_messages(conversation_id, limit=min(limit, 200), before=before)
     conversation["messages"] = [
         {
             "role": m["role"],
             "content": m["content"],
             "media": m.get("media"),
+            "created_at": m.get("created_at"),
         }
         for m in messages
     ]
@@ -449,17 +634,13 @@ async def get_conversation(conversation_id: str):
     return conversation
 
 
-@router.get("/business/{business_id}/public")
-async def get_business_public_info(business_id: str):
+def _build_widget_bootstrap(context: dict) -> dict:
     """
-    Get public business info for the widget.
-    Returns only what's needed to initialize the chat widget.
+    Build the widget bootstrap payload for a business, with its ETag and the
+    time it stays valid (the next open/close boundary, None if none this week).
     """
-    business = db.get_business(business_id)
-    if not business:
-        raise HTTPException(status_code=404, detail="Business not found")
-
-    config = db.get_business_config(business_id)
+    business = context["business"]
+    config = context["config"]
 
     # Default widget settings
     default_widget_settings = {
@@ -472,6 +653,7 @@ async def get_business_public_info(business_id: str):
 
     # Compute online status
     is_online = True
+    valid_until = None
     away_message = ""
     away_message_en = ""
 
@@ -484,42 +666,14 @@ async def get_business_public_info(business_id: str):
 
     if is_online:
         # Check business availability schedule
-        availability = db.get_business_availability(business_id)
-        if availability:
-            try:
-                from zoneinfo import ZoneInfo
-            except ImportError:
-                from backports.zoneinfo import ZoneInfo
-            tz_name = availability.get("timezone", "Africa/Douala")
-            try:
-                tz = ZoneInfo(tz_name)
-            except Exception:
-                tz = ZoneInfo("Africa/Douala")
-            now = datetime.now(tz)
-            day_name = now.strftime("%A").lower()
-            schedule = availability.get("weekly_schedule", {})
-            day_schedule = schedule.get(day_name, {})
-            if not day_schedule.get("enabled", True):
-                is_online = False
-            else:
-                # Check if current time is within any slot
-                current_time = now.strftime("%H:%M")
-                slots = day_schedule.get("slots", [])
-                if slots:
-                    in_slot = False
-                    for slot in slots:
-                        if slot.get("start", "00:00") <= current_time <= slot.get("end", "23:59"):
-                            in_slot = True
-                            break
-                    if not in_slot:
-                        is_online = False
+        is_online, valid_until = get_online_status(context["availability"])
 
     # Lead capture config
     lead_capture_config = None
     if config and config.get("lead_capture_config"):
         lead_capture_config = config["lead_capture_config"]
 
-    return {
+    payload = {
         "business_id": business["id"],
         "name": business["name"],
         "welcome_message": config.get("welcome_message", "Bonjour! Comment puis-je vous aider?") if config else "Bonjour! Comment puis-je vous aider?",
@@ -531,19 +685,61 @@ async def get_business_public_info(business_id: str):
         "away_message_en": away_message_en,
         "lead_capture_config": lead_capture_config,
     }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode())
+    return {"payload": payload, "etag": f'"{digest.hexdigest()[:32]}"', "valid_until": valid_until}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list, or weak tags) against an ETag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+@router.get("/business/{business_id}/public")
+async def get_business_public_info(business_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Get public business info for the widget.
+    Returns only what's needed to initialize the chat widget.
+
+    Built from the cached business context and reused until the business
+    changes or its next open/close boundary. Responses carry an ETag (a hash
+    of the payload) and a Cache-Control max-age that never runs past that
+    boundary, so browsers and edge caches can serve it and revalidations
+    with If-None-Match get a 304.
+    """
+    context = await get_business_context(business_id)
+    if not context:
+        raise HTTPException(status_code=404, detail="Business not found")
+
+    now = datetime.now(timezone.utc)
+    bootstrap = context.get("widget_bootstrap")
+    if not bootstrap or (bootstrap["valid_until"] and bootstrap["valid_until"] <= now):
+        bootstrap = _build_widget_bootstrap(context)
+        context["widget_bootstrap"] = bootstrap
+
+    max_age = settings.widget_bootstrap_max_age_seconds
+    if bootstrap["valid_until"]:
+        max_age = min(max_age, int((bootstrap["valid_until"] - now).total_seconds()))
+    headers = {"ETag": bootstrap["etag"], "Cache-Control": f"public, max-age={max(max_age, 0)}"}
+
+    if _etag_matches(if_none_match, bootstrap["etag"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=bootstrap["payload"], headers=headers)
 
 
 @router.post("/conversation/{conversation_id}/rate")
 async def rate_conversation(conversation_id: str, rating_data: ConversationRating):
     """Rate a conversation (thumbs up/down). Called by the widget."""
-    conversation = db.get_conversation(conversation_id)
+    conversation = await async_db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     if rating_data.rating not in ("positive", "negative"):
         raise HTTPException(status_code=400, detail="Rating must be 'positive' or 'negative'")
 
-    result = db.rate_conversation(
+    result = await async_db.rate_conversation(
         conversation_id=conversation_id,
         rating=rating_data.rating,
         comment=rating_data.comment,
@@ -558,17 +754,17 @@ async def rate_conversation(conversation_id: str, rating_data: ConversationRatin
 @router.post("/conversation/{conversation_id}/transcript")
 async def email_transcript(conversation_id: str, request: TranscriptRequest):
     """Email a chat transcript to the visitor. Called by the widget."""
-    conversation = db.get_conversation(conversation_id)
+    conversation = await async_db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Get business info
-    business = db.get_business(conversation["business_id"])
+    business = await async_db.get_business(conversation["business_id"])
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
 
     # Get messages
-    messages = db.get_conversation_messages(conversation_id, limit=200)
+    messages = await async_db.get_conversation_messages(conversation_id, limit=200)
 
     # Send transcript email
     email_service = get_email_service()
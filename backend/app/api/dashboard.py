@@ -7,10 +7,17 @@ from fastapi import APIRouter, HTTPException, Header
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-from app.services.database import db
+from app.config import get_settings
+from app.services.cache import TTLCache
+from app.services.database import async_db
 from app.services.admin import is_platform_admin
 
 router = APIRouter()
+settings = get_settings()
+
+# Short-lived per-business cache so dashboard reloads and multiple open tabs
+# share one stats query
+stats_cache = TTLCache(ttl_seconds=settings.dashboard_stats_ttl_seconds)
 
 
 def get_user_id_from_header(authorization: Optional[str] = Header(None)) -> str:
@@ -30,79 +37,31 @@ async def get_dashboard_stats(business_id: str, authorization: Optional[str] = H
     """
     Get today's dashboard statistics for a business.
     Returns key metrics like conversation count, appointments, ratings, etc.
+    Computed by a single aggregate query and cached for a few seconds.
     """
     user_id = get_user_id_from_header(authorization)
 
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != user_id and not is_platform_admin(user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    today = datetime.now(timezone.utc).date()
-    today_start = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
-    today_end = datetime.combine(today, datetime.max.time()).replace(tzinfo=timezone.utc)
-
-    # Get today's conversations
-    all_conversations = db.client.table("conversations")\
-        .select("*")\
-        .eq("business_id", business_id)\
-        .gte("started_at", today_start.isoformat())\
-        .lte("started_at", today_end.isoformat())\
-        .execute()
-
-    conversations_today = len(all_conversations.data) if all_conversations.data else 0
-
-    # Get active conversations (last message within last hour)
-    one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-    active_conversations = db.client.table("conversations")\
-        .select("id")\
-        .eq("business_id", business_id)\
-        .gte("last_message_at", one_hour_ago.isoformat())\
-        .execute()
-
-    active_now = len(active_conversations.data) if active_conversations.data else 0
-
-    # Get today's appointments
-    appointments = db.client.table("appointments")\
-        .select("id")\
-        .eq("business_id", business_id)\
-        .eq("appointment_date", today.isoformat())\
-        .execute()
-
-    appointments_today = len(appointments.data) if appointments.data else 0
-
-    # Get average rating (last 30 days)
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    rated_conversations = db.client.table("conversations")\
-        .select("rating")\
-        .eq("business_id", business_id)\
-        .not_.is_("rating", "null")\
-        .gte("rated_at", thirty_days_ago.isoformat())\
-        .execute()
-
-    avg_rating = None
-    if rated_conversations.data:
-        positive_count = sum(1 for c in rated_conversations.data if c["rating"] == "positive")
-        total_ratings = len(rated_conversations.data)
-        avg_rating = round((positive_count / total_ratings) * 100) if total_ratings > 0 else None
-
-    # Get total conversations (all time)
-    total_convos = db.client.table("conversations")\
-        .select("id", count="exact")\
-        .eq("business_id", business_id)\
-        .execute()
-
-    total_conversations = total_convos.count if total_convos.count else 0
-
-    return {
-        "conversations_today": conversations_today,
-        "active_conversations": active_now,
-        "appointments_today": appointments_today,
-        "satisfaction_rate": avg_rating,
-        "total_conversations": total_conversations,
+    cached = stats_cache.get(business_id)
+    if cached is not None:
+        return cached
+
+    row = await async_db.get_dashboard_stats(business_id, datetime.now(timezone.utc))
+    stats = {
+        "conversations_today": row.get("conversations_today", 0),
+        "active_conversations": row.get("active_conversations", 0),
+        "appointments_today": row.get("appointments_today", 0),
+        "satisfaction_rate": row.get("satisfaction_rate"),
+        "total_conversations": row.get("total_conversations", 0),
     }
+    stats_cache.set(business_id, stats)
+    return stats
 
 
 @router.get("/businesses/{business_id}/dashboard/activity")
@@ -114,7 +73,7 @@ async def get_activity_feed(business_id: str, limit: int = 10, authorization: Op
     user_id = get_user_id_from_header(authorization)
 
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != user_id and not is_platform_admin(user_id):
@@ -124,13 +83,14 @@ async def get_activity_feed(business_id: str, limit: int = 10, authorization: Op
 
     # Get recent conversations (last 24 hours)
     yesterday = datetime.now(timezone.utc) - timedelta(days=1)
-    recent_conversations = db.client.table("conversations")\
-        .select("id, visitor_name, started_at, channel")\
-        .eq("business_id", business_id)\
-        .gte("started_at", yesterday.isoformat())\
-        .order("started_at", desc=True)\
-        .limit(5)\
-        .execute()
+    recent_conversations = await async_db.execute(
+        async_db.client.table("conversations")
+        .select("id, visitor_name, started_at, channel")
+        .eq("business_id", business_id)
+        .gte("started_at", yesterday.isoformat())
+        .order("started_at", desc=True)
+        .limit(5)
+    )
 
     for conv in (recent_conversations.data or []):
         activities.append({
@@ -141,13 +101,14 @@ async def get_activity_feed(business_id: str, limit: int = 10, authorization: Op
         })
 
     # Get recent appointments
-    recent_appointments = db.client.table("appointments")\
-        .select("id, customer_name, appointment_date, appointment_time, created_at")\
-        .eq("business_id", business_id)\
-        .gte("created_at", yesterday.isoformat())\
-        .order("created_at", desc=True)\
-        .limit(5)\
-        .execute()
+    recent_appointments = await async_db.execute(
+        async_db.client.table("appointments")
+        .select("id, customer_name, appointment_date, appointment_time, created_at")
+        .eq("business_id", business_id)
+        .gte("created_at", yesterday.isoformat())
+        .order("created_at", desc=True)
+        .limit(5)
+    )
 
     for appt in (recent_appointments.data or []):
         activities.append({
@@ -157,14 +118,15 @@ async def get_activity_feed(business_id: str, limit: int = 10, authorization: Op
         })
 
     # Get recent ratings
-    recent_ratings = db.client.table("conversations")\
-        .select("id, visitor_name, rating, rated_at")\
-        .eq("business_id", business_id)\
-        .not_.is_("rating", "null")\
-        .gte("rated_at", yesterday.isoformat())\
-        .order("rated_at", desc=True)\
-        .limit(5)\
-        .execute()
+    recent_ratings = await async_db.execute(
+        async_db.client.table("conversations")
+        .select("id, visitor_name, rating, rated_at")
+        .eq("business_id", business_id)
+        .not_.is_("rating", "null")
+        .gte("rated_at", yesterday.isoformat())
+        .order("rated_at", desc=True)
+        .limit(5)
+    )
 
     for rating in (recent_ratings.data or []):
         rating_emoji = "👍" if rating["rating"] == "positive" else "👎"
@@ -184,48 +146,30 @@ async def get_activity_feed(business_id: str, limit: int = 10, authorization: Op
 async def get_chart_data(business_id: str, days: int = 7, authorization: Optional[str] = Header(None)):
     """
     Get conversation data for the last N days for charting.
-    Returns daily conversation counts.
+    Returns daily conversation counts, read from the daily stats rollup.
     """
     user_id = get_user_id_from_header(authorization)
 
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != user_id and not is_platform_admin(user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Get conversations from last N days
-    start_date = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    # One business_daily_stats row per day and channel (see migration 022)
     end_date = datetime.now(timezone.utc).date()
+    start_date = end_date - timedelta(days=days - 1)
+    rows = await async_db.get_daily_stats(business_id, start_date, end_date)
 
-    conversations = db.client.table("conversations")\
-        .select("started_at")\
-        .eq("business_id", business_id)\
-        .gte("started_at", datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc).isoformat())\
-        .lte("started_at", datetime.combine(end_date, datetime.max.time()).replace(tzinfo=timezone.utc).isoformat())\
-        .execute()
-
-    # Group by date
     daily_counts = {}
     for i in range(days):
         date = start_date + timedelta(days=i)
         daily_counts[date.isoformat()] = 0
 
-    for conv in (conversations.data or []):
-        # Handle ISO format strings with varying microsecond precision
-        timestamp = conv["started_at"].replace('Z', '+00:00')
-        # Parse timestamp - handle edge case where microseconds have odd digit count
-        try:
-            conv_date = datetime.fromisoformat(timestamp).date()
-        except ValueError:
-            # Fallback: strip microseconds if parsing fails
-            timestamp = timestamp.split('.')[0] + '+00:00' if '.' in timestamp else timestamp
-            conv_date = datetime.fromisoformat(timestamp).date()
-
-        date_key = conv_date.isoformat()
-        if date_key in daily_counts:
-            daily_counts[date_key] += 1
+    for row in rows:
+        if row["day"] in daily_counts:
+            daily_counts[row["day"]] += row["conversations"]
 
     # Convert to list format for frontend
     chart_data = [
@@ -248,7 +192,7 @@ async def get_upcoming_appointments(business_id: str, days: int = 3, authorizati
     user_id = get_user_id_from_header(authorization)
 
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != user_id and not is_platform_admin(user_id):
@@ -257,15 +201,16 @@ async def get_upcoming_appointments(business_id: str, days: int = 3, authorizati
     today = datetime.now(timezone.utc).date()
     end_date = today + timedelta(days=days)
 
-    appointments = db.client.table("appointments")\
-        .select("*")\
-        .eq("business_id", business_id)\
-        .gte("appointment_date", today.isoformat())\
-        .lte("appointment_date", end_date.isoformat())\
-        .in_("status", ["pending", "confirmed"])\
-        .order("appointment_date")\
-        .order("appointment_time")\
-        .limit(10)\
-        .execute()
+    appointments = await async_db.execute(
+        async_db.client.table("appointments")
+        .select("*")
+        .eq("business_id", business_id)
+        .gte("appointment_date", today.isoformat())
+        .lte("appointment_date", end_date.isoformat())
+        .in_("status", ["pending", "confirmed"])
+        .order("appointment_date")
+        .order("appointment_time")
+        .limit(10)
+    )
 
     return appointments.data or []
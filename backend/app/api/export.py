@@ -5,7 +5,8 @@ Handles exporting conversation data in various formats.
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
 import csv
 import io
 import json
@@ -15,6 +16,77 @@ from app.services.database import db
 router = APIRouter()
 
 
+EXPORT_FIELDS = [
+    "conversation_id",
+    "channel",
+    "visitor_id",
+    "started_at",
+    "message_role",
+    "message_content",
+    "message_timestamp",
+]
+
+
+def _iter_export_rows(conversations: Iterable[dict]) -> Iterator[dict]:
+    """Yield one flat export row per message, paging through messages per conversation."""
+    for conv in conversations:
+        for msg in db.iter_conversation_messages(conv["id"]):
+            yield {
+                "conversation_id": conv["id"],
+                "channel": conv.get("channel", "widget"),
+                "visitor_id": conv.get("visitor_id", ""),
+                "started_at": conv.get("started_at", ""),
+                "message_role": msg.get("role", ""),
+                "message_content": msg.get("content", ""),
+                "message_timestamp": msg.get("created_at", ""),
+            }
+
+
+def _stream_csv(rows: Iterator[dict]) -> Iterator[str]:
+    """Encode rows as CSV, yielding one line at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+
+    def flush() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    wrote_header = False
+    for row in rows:
+        if not wrote_header:
+            writer.writeheader()
+            wrote_header = True
+        writer.writerow(row)
+        yield flush()
+
+    if not wrote_header:
+        csv.writer(buffer).writerow(["No conversations found"])
+        yield flush()
+
+
+def _stream_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON."""
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+def _stream_json(rows: Iterator[dict], business: dict) -> Iterator[str]:
+    """Encode rows as a single JSON document without holding them all in memory."""
+    header = {
+        "business_id": business["id"],
+        "business_name": business["name"],
+        "exported_at": datetime.utcnow().isoformat(),
+    }
+    yield json.dumps(header, ensure_ascii=False)[:-1] + ', "data": ['
+    total = 0
+    for row in rows:
+        yield ("," if total else "") + json.dumps(row, ensure_ascii=False, default=str)
+        total += 1
+    yield f'], "total_messages": {total}}}'
+
+
 @router.get("/{business_id}/conversations")
 async def export_conversations(
     business_id: str,
@@ -23,9 +95,16 @@ async def export_conversations(
 ):
     """
     Export conversations for a business.
-    Supports CSV and JSON formats.
+    Supports CSV, JSON and NDJSON formats.
     Can export all conversations or a specific one.
+
+    The export is streamed: conversations and messages are paged through with
+    keyset pagination and encoded as they arrive, so memory stays flat and
+    there is no cap on the number of conversations or messages.
     """
+    if format not in ("csv", "json", "ndjson"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'csv', 'json' or 'ndjson'")
+
     # Verify business exists
     business = db.get_business(business_id)
     if not business:
@@ -33,60 +112,37 @@ async def export_conversations(
 
     # Get conversations
     if conversation_id:
-        conversations = [db.get_conversation(conversation_id)]
-        if not conversations[0]:
+        conversation = db.get_conversation(conversation_id)
+        if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
+        conversations = [conversation]
     else:
-        conversations = db.get_business_conversations(business_id)
+        conversations = db.iter_business_conversations(business_id)
 
-    # Prepare export data
-    export_data = []
-    for conv in conversations:
-        messages = db.get_conversation_messages(conv["id"])
-        for msg in messages:
-            export_data.append({
-                "conversation_id": conv["id"],
-                "channel": conv.get("channel", "widget"),
-                "visitor_id": conv.get("visitor_id", ""),
-                "started_at": conv.get("started_at", ""),
-                "message_role": msg.get("role", ""),
-                "message_content": msg.get("content", ""),
-                "message_timestamp": msg.get("created_at", ""),
-            })
+    rows = _iter_export_rows(conversations)
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
 
     if format == "json":
-        # Return JSON
-        return {
-            "business_id": business_id,
-            "business_name": business["name"],
-            "exported_at": datetime.utcnow().isoformat(),
-            "total_messages": len(export_data),
-            "data": export_data
-        }
-
-    elif format == "csv":
-        # Generate CSV
-        output = io.StringIO()
-        if export_data:
-            writer = csv.DictWriter(output, fieldnames=export_data[0].keys())
-            writer.writeheader()
-            writer.writerows(export_data)
-        else:
-            writer = csv.writer(output)
-            writer.writerow(["No conversations found"])
-
-        output.seek(0)
-
-        filename = f"raven_export_{business['name']}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+        return StreamingResponse(
+            _stream_json(rows, business),
+            media_type="application/json",
+        )
 
+    elif format == "ndjson":
         return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            _stream_ndjson(rows),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f"attachment; filename=raven_export_{business['name']}_{timestamp}.ndjson"}
         )
 
-    else:
-        raise HTTPException(status_code=400, detail="Invalid format. Use 'csv' or 'json'")
+    # Generate CSV
+    filename = f"raven_export_{business['name']}_{timestamp}.csv"
+
+    return StreamingResponse(
+        _stream_csv(rows),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @router.get("/{business_id}/summary")
@@ -98,21 +154,12 @@ async def export_summary(business_id: str):
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
 
-    conversations = db.get_business_conversations(business_id)
-
-    # Calculate stats
-    total_conversations = len(conversations)
-    total_messages = 0
-    widget_count = 0
-    whatsapp_count = 0
-
-    for conv in conversations:
-        messages = db.get_conversation_messages(conv["id"])
-        total_messages += len(messages)
-        if conv.get("channel") == "whatsapp":
-            whatsapp_count += 1
-        else:
-            widget_count += 1
+    # Totals come from the per-conversation message counters in one aggregate query
+    stats = db.get_analytics_summary(business_id, datetime.now(timezone.utc).isoformat())
+    total_conversations = stats.get("total_conversations", 0)
+    total_messages = stats.get("total_messages", 0)
+    widget_count = stats.get("widget_total", 0)
+    whatsapp_count = stats.get("whatsapp_total", 0)
 
     return {
         "business_id": business_id,
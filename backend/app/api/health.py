@@ -5,6 +5,8 @@ Use this to verify the API is running.
 
 from fastapi import APIRouter
 
+from app.services.metrics import metrics
+
 router = APIRouter()
 
 
@@ -15,3 +17,9 @@ async def health_check():
         "status": "healthy",
         "service": "raven-api",
     }
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """In-process counters (FAQ fast path, caches) for this worker."""
+    return metrics.snapshot()
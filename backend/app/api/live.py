@@ -4,12 +4,14 @@ Allows business owners to view active conversations and take over from AI.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timezone
 
-from app.services.database import db
+from app.services.database import async_db
 from app.services.admin import is_platform_admin
+from app.services.live_events import live_events
 
 router = APIRouter()
 
@@ -46,31 +48,49 @@ async def get_live_conversations(business_id: str, user_id: str):
     Used for the live monitoring dashboard.
     """
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != user_id and not is_platform_admin(user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    conversations = db.get_active_conversations(business_id)
+    conversations = await async_db.get_active_conversations(business_id)
 
-    # Add last message preview to each conversation
+    # Message count and last message role are columns on the row (migration 021)
     for conv in conversations:
-        messages = db.get_conversation_messages(conv["id"], limit=1)
-        if messages:
-            conv["last_message"] = messages[-1]["content"][:100]
-            conv["last_message_role"] = messages[-1]["role"]
-        else:
-            conv["last_message"] = None
-            conv["last_message_role"] = None
-
-        # Get message count
-        all_messages = db.get_conversation_messages(conv["id"], limit=100)
-        conv["message_count"] = len(all_messages)
+        conv["last_message"] = conv.get("last_message_preview")
 
     return conversations
 
 
+@router.get("/{business_id}/events")
+async def stream_live_events(business_id: str, user_id: str):
+    """
+    Push feed for the live monitoring dashboard (Server-Sent Events).
+
+    Events:
+      - "ready": sent once the subscription is active
+      - "conversation": {"conversation": {...}} when a widget conversation starts
+      - "message": {"conversation_id", "message"} for every saved message
+      - "takeover" / "release": {"conversation_id", "is_human_takeover", "taken_over_by"}
+
+    Conversations not yet in the agent's list (e.g. a new WhatsApp thread)
+    first show up through their "message" event.
+    """
+    # Verify business ownership
+    business = await async_db.get_business(business_id)
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
+    if business["user_id"] != user_id and not is_platform_admin(user_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return StreamingResponse(
+        live_events.stream(business_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{business_id}/conversation/{conversation_id}")
 async def get_conversation_detail(business_id: str, conversation_id: str, user_id: str):
     """
@@ -78,13 +98,13 @@ async def get_conversation_detail(business_id: str, conversation_id: str, user_i
     Used for viewing conversation details in live mode.
     """
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != user_id and not is_platform_admin(user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    conversation = db.get_conversation_with_messages(conversation_id)
+    conversation = await async_db.get_conversation_with_messages(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     if conversation["business_id"] != business_id:
@@ -104,21 +124,21 @@ async def takeover_conversation(
     When taken over, AI responses are disabled and agent can respond manually.
     """
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != request.user_id and not is_platform_admin(request.user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Verify conversation belongs to business
-    conversation = db.get_conversation(conversation_id)
+    conversation = await async_db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     if conversation["business_id"] != business_id:
         raise HTTPException(status_code=403, detail="Conversation doesn't belong to this business")
 
     # Take over the conversation
-    updated = db.set_conversation_takeover(
+    updated = await async_db.set_conversation_takeover(
         conversation_id=conversation_id,
         is_taken_over=True,
         taken_over_by=request.user_id,
@@ -134,12 +154,18 @@ async def takeover_conversation(
     else:
         system_msg = "🙋 A support agent has joined the conversation. How can I help you?"
 
-    db.create_message(
+    message = await async_db.create_message(
         conversation_id=conversation_id,
         role="assistant",
         content=system_msg,
     )
-    db.update_conversation_timestamp(conversation_id)
+
+    live_events.publish(business_id, "takeover", {
+        "conversation_id": conversation_id,
+        "is_human_takeover": True,
+        "taken_over_by": request.user_id,
+    })
+    live_events.publish_message(business_id, conversation_id, message)
 
     return {"success": True, "message": "Conversation taken over", "conversation": updated}
 
@@ -154,21 +180,21 @@ async def release_conversation(
     Release a conversation back to AI.
     """
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != request.user_id and not is_platform_admin(request.user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Verify conversation
-    conversation = db.get_conversation(conversation_id)
+    conversation = await async_db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     if conversation["business_id"] != business_id:
         raise HTTPException(status_code=403, detail="Conversation doesn't belong to this business")
 
     # Release the conversation
-    updated = db.set_conversation_takeover(
+    updated = await async_db.set_conversation_takeover(
         conversation_id=conversation_id,
         is_taken_over=False,
     )
@@ -183,12 +209,18 @@ async def release_conversation(
     else:
         system_msg = "🤖 Our virtual assistant is back. Feel free to ask any questions!"
 
-    db.create_message(
+    message = await async_db.create_message(
         conversation_id=conversation_id,
         role="assistant",
         content=system_msg,
     )
-    db.update_conversation_timestamp(conversation_id)
+
+    live_events.publish(business_id, "release", {
+        "conversation_id": conversation_id,
+        "is_human_takeover": False,
+        "taken_over_by": None,
+    })
+    live_events.publish_message(business_id, conversation_id, message)
 
     return {"success": True, "message": "Conversation released to AI", "conversation": updated}
 
@@ -204,14 +236,14 @@ async def send_agent_message(
     Only works when conversation is in takeover mode.
     """
     # Verify business ownership
-    business = db.get_business(business_id)
+    business = await async_db.get_business(business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     if business["user_id"] != request.user_id and not is_platform_admin(request.user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Verify conversation
-    conversation = db.get_conversation(conversation_id)
+    conversation = await async_db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     if conversation["business_id"] != business_id:
@@ -225,12 +257,12 @@ async def send_agent_message(
         )
 
     # Send the message as assistant (from business perspective)
-    message = db.create_message(
+    message = await async_db.create_message(
         conversation_id=conversation_id,
         role="assistant",
         content=request.content,
     )
-    db.update_conversation_timestamp(conversation_id)
+    live_events.publish_message(business_id, conversation_id, message)
 
     return {
         "success": True,
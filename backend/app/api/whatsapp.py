@@ -3,16 +3,34 @@ WhatsApp webhook API endpoints.
 Handles incoming messages from Twilio WhatsApp.
 """
 
+import asyncio
+from functools import partial
 from fastapi import APIRouter, Request, Form, HTTPException
 from fastapi.responses import Response
+from postgrest.exceptions import APIError
 from typing import Optional
 
 from app.services.whatsapp import whatsapp_service
-from app.services.database import db
-from app.services.ai import get_ai_service
+from app.services.database import async_db
+from app.services.business_cache import (
+    get_business_context_for_whatsapp,
+    get_cached_system_prompt,
+    get_fallback_whatsapp_context,
+    get_faq_answer,
+    get_turn_knowledge,
+)
+from app.services.cache import TTLCache
+from app.services.conversation_queue import conversation_queue
+from app.services.summaries import schedule_summary_update
+from app.services.ai import AI_ERROR_MESSAGE, HISTORY_WINDOW, get_ai_service
+from app.services.live_events import live_events
 
 router = APIRouter()
 
+# MessageSids seen recently, so quick Twilio retries skip the database entirely.
+# The unique index on messages.external_id is the durable guard.
+recent_message_sids = TTLCache(max_size=10000, ttl_seconds=3600)
+
 
 @router.post("/webhook")
 async def whatsapp_webhook(
@@ -26,90 +44,133 @@ async def whatsapp_webhook(
     """
     Webhook endpoint for incoming WhatsApp messages from Twilio.
 
-    Twilio sends POST requests with form data when messages arrive.
+    Twilio sends POST requests with form data when messages arrive. The
+    message is persisted and acknowledged right away; the AI reply is
+    generated and sent by a per-conversation background worker so slow LLM
+    calls never trigger Twilio retries. Retried deliveries are dropped by
+    MessageSid.
     """
+    if recent_message_sids.get(MessageSid):
+        print(f"Duplicate WhatsApp delivery {MessageSid} - ignoring")
+        return Response(content="", media_type="text/xml")
+
     # Extract phone number (remove 'whatsapp:' prefix)
     visitor_phone = From.replace("whatsapp:", "")
-    business_phone = To.replace("whatsapp:", "")
-
-    # Find the business linked to this WhatsApp number
-    # For MVP, we'll use a default business or look up by phone
-    business = db.get_business_by_whatsapp(business_phone)
-
-    if not business:
-        # If no business found, try to get the first business (for testing)
-        businesses = db.get_all_businesses()
-        if businesses:
-            business = businesses[0]
-        else:
-            # No business configured, send error message
-            if whatsapp_service.is_configured():
-                whatsapp_service.send_message(
-                    From,
-                    "Sorry, this service is not yet configured. Please try again later."
-                )
-            return Response(content="", media_type="text/xml")
 
-    business_id = business["id"]
+    # Find the business linked to this WhatsApp number (cached in memory)
+    context = await get_business_context_for_whatsapp(To)
+
+    if not context:
+        # Number not linked to any business (e.g. the Twilio sandbox)
+        context = await get_fallback_whatsapp_context(To)
+
+    if not context:
+        # No business configured, send error message
+        if whatsapp_service.is_configured():
+            await asyncio.to_thread(
+                whatsapp_service.send_message,
+                From,
+                "Sorry, this service is not yet configured. Please try again later."
+            )
+        return Response(content="", media_type="text/xml")
+
+    business_id = context["business"]["id"]
 
     # Get or create conversation
-    conversation = db.get_or_create_whatsapp_conversation(
+    conversation = await async_db.get_or_create_whatsapp_conversation(
         business_id=business_id,
         visitor_id=visitor_phone,
     )
 
-    # Save the incoming message
-    db.add_message(
-        conversation_id=conversation["id"],
-        role="user",
-        content=Body
-    )
-
-    # Update timestamp
-    db.update_conversation_timestamp(conversation["id"])
+    # Save the incoming message - the unique MessageSid makes retries a no-op
+    try:
+        user_message = await async_db.add_message(
+            conversation_id=conversation["id"],
+            role="user",
+            content=Body,
+            external_id=MessageSid,
+        )
+    except APIError as e:
+        if e.code == "23505":  # unique_violation on external_id
+            recent_message_sids.set(MessageSid, True)
+            print(f"Duplicate WhatsApp delivery {MessageSid} - ignoring")
+            return Response(content="", media_type="text/xml")
+        raise
+    recent_message_sids.set(MessageSid, True)
+    live_events.publish_message(business_id, conversation["id"], user_message)
 
     # If conversation is in human takeover mode, skip AI — agent replies via dashboard
     if conversation.get("is_human_takeover"):
         print(f"🙋 WhatsApp conversation {conversation['id']} is in human takeover mode - skipping AI")
         return Response(content="", media_type="text/xml")
 
-    # Get conversation history
-    messages = db.get_conversation_messages(conversation["id"])
-
-    # Get business config for AI context
-    config = db.get_business_config(business_id)
-
-    # Build context for AI
-    business_context = {
-        "name": business["name"],
-        "description": business["description"],
-        "language": business.get("language", "en"),
-        "welcome_message": config.get("welcome_message", "") if config else "",
-        "faqs": config.get("faqs", []) if config else [],
-        "products": config.get("products", []) if config else [],
-        "custom_instructions": config.get("custom_instructions", "") if config else "",
-    }
+    # Reply in the background, in arrival order for this conversation
+    conversation_queue.enqueue(
+        conversation["id"],
+        partial(_send_ai_reply, context, conversation["id"], From),
+    )
+
+    # Return empty TwiML response (we send via API instead)
+    return Response(content="", media_type="text/xml")
 
-    # Generate AI response
+
+async def _send_ai_reply(context: dict, conversation_id: str, to: str) -> None:
+    """
+    Generate the AI reply for a WhatsApp conversation, save it and send it.
+
+    The job may have waited behind earlier replies and summary updates, so
+    the conversation is re-read here: an agent may have taken over since
+    the webhook ran, and the summary may have moved on.
+    """
+    business = context["business"]
+
+    # Get the conversation and the recent history the prompt uses
+    conversation, messages = await asyncio.gather(
+        async_db.get_conversation(conversation_id),
+        async_db.get_recent_messages(conversation_id, limit=HISTORY_WINDOW),
+    )
+
+    if not conversation or conversation.get("is_human_takeover"):
+        print(f"🙋 WhatsApp conversation {conversation_id} taken over before the AI reply - skipping AI")
+        return
+
+    # An earlier job already answered this message together with it
+    if not messages or messages[-1]["role"] != "user":
+        return
+
+    # A single new message that restates a FAQ is answered directly (no LLM call)
+    ai_response = None
+    if len(messages) < 2 or messages[-2]["role"] != "user":
+        ai_response = get_faq_answer(context, messages[-1]["content"] or "")
+
+    # Generate AI response (business carries its config for the prompt)
     chat_history = [{"role": m["role"], "content": m["content"]} for m in messages]
-    ai_response = get_ai_service().generate_response(chat_history, business_context)
+    try:
+        ai_response = ai_response or await get_ai_service().generate_response_async(
+            chat_history,
+            business,
+            system_prompt=get_cached_system_prompt(context, False, []),
+            summary=conversation.get("summary"),
+            knowledge=get_turn_knowledge(context, chat_history),
+        )
+    except Exception as e:
+        print(f"AI error: {e}")
+        ai_response = AI_ERROR_MESSAGE
 
     # Save AI response
-    db.add_message(
-        conversation_id=conversation["id"],
+    assistant_message = await async_db.add_message(
+        conversation_id=conversation_id,
         role="assistant",
         content=ai_response
     )
+    live_events.publish_message(business["id"], conversation_id, assistant_message)
 
-    # Update conversation timestamp
-    db.update_conversation_timestamp(conversation["id"])
+    # Fold messages that left the history window into the rolling summary
+    schedule_summary_update(conversation_id, messages, business.get("language", "en"))
 
-    # Send response via WhatsApp
+    # Send response via WhatsApp (Twilio client is blocking)
     if whatsapp_service.is_configured():
-        whatsapp_service.send_message(From, ai_response)
-
-    # Return empty TwiML response (we send via API instead)
-    return Response(content="", media_type="text/xml")
+        await asyncio.to_thread(whatsapp_service.send_message, to, ai_response)
 
 
 @router.get("/status")
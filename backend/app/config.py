@@ -14,17 +14,49 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_key: str = ""
 
+    # Thread pool size for the async database layer (concurrent Supabase calls per worker)
+    db_max_workers: int = 32
+
+    # Per-business chat context cache (business, config, availability, prompts)
+    business_cache_ttl_seconds: int = 300
+    business_cache_max_size: int = 1000
+
+    # Answer directly from a FAQ (no LLM call) when a message matches its question
+    # with at least this confidence (0-1); see GET /metrics for the hit rate
+    faq_fast_path_threshold: float = 0.85
+
+    # Cached AI replies to context-free questions, per business
+    response_cache_ttl_seconds: int = 3600
+    response_cache_max_size: int = 5000
+
+    # Longest browser/edge cache lifetime for the widget bootstrap (seconds);
+    # bounds how long a config change takes to reach already-cached embeds
+    widget_bootstrap_max_age_seconds: int = 300
+
+    # Dashboard home stats cache (seconds)
+    dashboard_stats_ttl_seconds: int = 30
+
     # Groq (Free AI - Llama 3)
     groq_api_key: str = ""
+    groq_timeout_seconds: float = 20.0  # Per-request timeout for LLM calls
+    groq_max_retries: int = 1
+    groq_max_connections: int = 20  # Pooled HTTP connections to Groq per worker
+    groq_max_concurrency: int = 8  # Concurrent LLM calls per worker
+    groq_queue_timeout_seconds: float = 5.0  # Max wait for a free LLM slot before falling back
 
     # Resend (Email)
     resend_api_key: str = ""
     resend_from_email: str = "onboarding@resend.dev"
 
+    # Notification dispatch (concurrent background sends per worker)
+    notification_max_workers: int = 4
+
     # Twilio (WhatsApp/SMS)
     twilio_account_sid: str = ""
     twilio_auth_token: str = ""
     twilio_whatsapp_number: str = ""  # e.g., "whatsapp:+14155238886" for sandbox
+    # Business that receives messages sent to a number no business owns (e.g. the sandbox)
+    whatsapp_default_business_id: str = ""
 
     # App settings
     app_name: str = "Raven Support"
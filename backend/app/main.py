@@ -14,6 +14,9 @@ from pathlib import Path
 from app.config import get_settings
 from app.api import health, chat, business, whatsapp, analytics, export, team, uploads, appointments, notifications, live, dashboard
 from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.ai import close_ai_service
+from app.services.notifications import shutdown_notification_service
+from app.services.conversation_queue import conversation_queue
 
 settings = get_settings()
 
@@ -26,6 +29,10 @@ async def lifespan(_app: FastAPI):
     yield
     # Shutdown
     stop_scheduler()
+    await chat.drain_stream_turns()
+    await conversation_queue.drain()
+    await close_ai_service()
+    shutdown_notification_service()
 
 # Create FastAPI app
 app = FastAPI(
@@ -44,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # The widget revalidates its bootstrap with If-None-Match
 )
 
 # Include routers
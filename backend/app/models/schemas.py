@@ -66,6 +66,7 @@ class BusinessUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=200)
     description: Optional[str] = Field(None, max_length=2000)
     language: Optional[Language] = None
+    whatsapp_number: Optional[str] = Field(None, max_length=32)  # "" to unlink
 
 
 class WidgetSettings(BaseModel):
@@ -132,6 +133,7 @@ class BusinessResponse(BaseModel):
     description: str
     language: Language
     is_system: bool = False
+    whatsapp_number: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -156,6 +158,7 @@ class ChatMessage(BaseModel):
     role: MessageRole
     content: str
     media: Optional[list[MediaAttachment]] = Field(None, description="Attached media")
+    created_at: Optional[datetime] = None
 
 
 class ChatRequest(BaseModel):
@@ -210,6 +213,9 @@ class ConversationResponse(BaseModel):
     started_at: datetime
     last_message_at: datetime
     message_count: Optional[int] = None
+    user_message_count: Optional[int] = None
+    last_message_preview: Optional[str] = None
+    last_message_role: Optional[str] = None
     visitor_name: Optional[str] = None
     visitor_email: Optional[str] = None
     visitor_phone: Optional[str] = None
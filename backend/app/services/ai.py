@@ -3,16 +3,59 @@ AI Service - Groq integration for generating chatbot responses.
 Uses Llama 3 model via Groq's free API.
 """
 
-from groq import Groq
+from groq import AsyncGroq
 from app.config import get_settings
-from typing import Optional
+from app.services.appointment_extraction import extract_appointment_info
+from app.services.response_cache import response_cache
+from typing import AsyncIterator, Optional
+import asyncio
 import base64
+import httpx
 import requests
 from pathlib import Path
 import mimetypes
 
 settings = get_settings()
 
+# Number of most recent messages sent to the model as conversation history
+HISTORY_WINDOW = 20
+
+# Messages that must fall out of the window before they are folded into the summary
+SUMMARY_BATCH = 4
+
+SUMMARY_PREFIX = "Summary of the earlier part of this conversation:"
+
+KNOWLEDGE_PREFIX = "FAQs and products relevant to the customer's latest message:"
+
+
+def format_faqs(faqs: list[dict]) -> str:
+    """Format FAQs for the prompt."""
+    if not faqs:
+        return ""
+    faq_text = "\n\nFAQs (Questions fréquentes):\n"
+    for faq in faqs:
+        faq_text += f"Q: {faq['question']}\nR: {faq['answer']}\n\n"
+    return faq_text
+
+
+def format_products(products: list[dict]) -> str:
+    """Format products/services for the prompt."""
+    if not products:
+        return ""
+    product_text = "\n\nProduits/Services:\n"
+    for p in products:
+        price_info = f" - {p['price']}" if p.get('price') else ""
+        product_text += f"- {p['name']}{price_info}: {p['description']}\n"
+    return product_text
+
+
+# Sent in place of a reply when the AI call fails or the backend is overloaded
+AI_ERROR_MESSAGE = "Désolé, je rencontre un problème technique. Veuillez réessayer ou contacter l'entreprise directement."
+
+
+class AIOverloadedError(Exception):
+    """Raised when no LLM slot frees up within the queue timeout."""
+
 
 class AIService:
     """Service for AI-powered chat responses using Groq (Llama 3)."""
@@ -20,9 +63,25 @@ class AIService:
     def __init__(self):
         if not settings.groq_api_key:
             raise ValueError("GROQ_API_KEY must be set in environment variables")
-        self.client = Groq(api_key=settings.groq_api_key)
+        # Pooled connections, bounded timeouts
+        self.async_client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            timeout=settings.groq_timeout_seconds,
+            max_retries=settings.groq_max_retries,
+            http_client=httpx.AsyncClient(
+                timeout=settings.groq_timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=settings.groq_max_connections,
+                    max_keepalive_connections=settings.groq_max_connections,
+                ),
+            ),
+        )
+        # Caps concurrent LLM calls per worker so bursts queue instead of
+        # exhausting sockets or hitting Groq rate limits all at once
+        self._llm_slots = asyncio.Semaphore(settings.groq_max_concurrency)
         self.model = "llama-3.3-70b-versatile"  # Fast and capable, free tier
         self.vision_model = "meta-llama/llama-4-scout-17b-16e-instruct"  # Llama 4 Scout vision model (460+ tokens/s)
+        self.summary_model = "llama-3.1-8b-instant"  # Small and fast, for conversation summaries
 
     def url_to_base64(self, url: str) -> Optional[str]:
         """Convert an image URL to a base64 data URL."""
@@ -96,20 +155,9 @@ class AIService:
         else:
             lang_instruction = "Always respond in English. If the customer writes in French, still respond in English but be welcoming."
 
-        # Format FAQs
-        faq_text = ""
-        if faqs:
-            faq_text = "\n\nFAQs (Questions fréquentes):\n"
-            for faq in faqs:
-                faq_text += f"Q: {faq['question']}\nR: {faq['answer']}\n\n"
-
-        # Format products/services
-        product_text = ""
-        if products:
-            product_text = "\n\nProduits/Services:\n"
-            for p in products:
-                price_info = f" - {p['price']}" if p.get('price') else ""
-                product_text += f"- {p['name']}{price_info}: {p['description']}\n"
+        # Format FAQs and products/services
+        faq_text = format_faqs(faqs)
+        product_text = format_products(products)
 
         # Custom instructions
         custom_text = f"\n\nInstructions spéciales:\n{custom_instructions}" if custom_instructions else ""
@@ -299,293 +347,67 @@ Règles importantes:
         """
         Extract appointment information from conversation history.
         Returns a dict with name, phone, email, date, time, service, notes.
-        Uses AI to extract structured data from natural conversation.
+        See app.services.appointment_extraction.
         """
-        import re
-        from datetime import datetime, timedelta
-
-        info = {
-            "name": None,
-            "phone": None,
-            "email": None,
-            "date": None,
-            "time": None,
-            "service": None,
-            "notes": None,
-        }
-
-        # Search all user messages in the conversation; the loop below iterates
-        # newest-first so the most recent value for each field wins automatically.
-        user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
-        conversation_text = " ".join(user_messages)
-
-        # Check for slot selection
-        # NEW: Check if message matches any slot's display text exactly (e.g., "Thursday 05 February at 11:30")
-        if available_slots:
-            slot_selected = False
-
-            # First, try to match the message against slot display strings
-            for i, slot in enumerate(available_slots):
-                # Build display strings from slot data (same format as chat.py response_slots)
-                display_en = f"{slot['display_date']} at {slot['time']}"
-                display_fr = f"{slot['display_date']} à {slot['time']}"
-
-                # Check both English and French formats
-                if display_en.lower() in conversation_text.lower() or display_fr.lower() in conversation_text.lower():
-                    info["date"] = slot["date"]
-                    info["time"] = slot["time"]
-                    slot_selected = True
-                    break
-
-            # Fallback: Check for old-style slot number selection (e.g., "slot 1", "option 2")
-            if not slot_selected:
-                slot_patterns = [
-                    r"(?:slot|option|créneau|creneau|choice|choix)\s*#?\s*(\d+)",  # slot 1, option #2
-                    r"(?:the\s+)?(?:first|1st|premier|première)\s*(?:one|slot|option)?",  # the first one
-                    r"(?:the\s+)?(?:second|2nd|deuxième|deuxieme)\s*(?:one|slot|option)?",  # the second
-                    r"(?:the\s+)?(?:third|3rd|troisième|troisieme)\s*(?:one|slot|option)?",  # the third
-                    r"(?:number|numéro|numero|#)\s*(\d+)",  # number 1, #2
-                    # Only match bare number if it's the ONLY content (not followed by time indicators)
-                    r"^(\d+)$",  # Just a number, nothing else (e.g., "2")
-                ]
-
-                for pattern in slot_patterns:
-                    match = re.search(pattern, conversation_text, re.IGNORECASE)
-                    if match:
-                        slot_num = None
-                        if match.groups() and match.group(1):
-                            try:
-                                slot_num = int(match.group(1))
-                            except (ValueError, IndexError):
-                                continue
-                        elif "first" in pattern or "1st" in pattern or "premier" in pattern:
-                            slot_num = 1
-                        elif "second" in pattern or "2nd" in pattern or "deuxième" in pattern:
-                            slot_num = 2
-                        elif "third" in pattern or "3rd" in pattern or "troisième" in pattern:
-                            slot_num = 3
-
-                        # Validate slot number: must be >= 1 and <= available slots
-                        if slot_num and slot_num >= 1 and slot_num <= len(available_slots):
-                            selected_slot = available_slots[slot_num - 1]
-                            info["date"] = selected_slot["date"]
-                            info["time"] = selected_slot["time"]
-                            break
-
-        # Search from NEWEST to oldest for ALL fields
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_patterns = [
-            r'\+\d{1,4}\s*\d{6,14}',  # International format +XX XXXXXXXXX
-            r'\+237\s*[6-9]\d{8}',  # Cameroon +237 format
-            r'\b[6-9]\d{8}\b',  # 9-digit format starting with 6-9
-            r'\b\d{10}\b',  # 10-digit format (US, etc.)
-            r'(?:number|phone|tel|num)[\s:]*(\d{7,15})',  # Labeled phone numbers
-        ]
-        # More flexible name patterns including typos like "my is X", "hi my is X"
-        # IMPORTANT: Patterns must NOT match greetings like "Hi Raven"
-        greeting_blacklist = r"(?!Hi\s|Hello\s|Hey\s|Bonjour\s|Salut\s)"  # Negative lookahead for greetings
-
-        name_patterns = [
-            r"(?:je m'appelle|mon nom est|je suis)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s|$|,|\.)",
-            r"(?:my name is|I am|I'm|my is|hi my is|hi i'm|hi i am)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s|$|,|\.)",
-            r"(?:name|nom)[:;]?\s*([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\n|$|\s|,|\.)",  # "Name James" or "name: James"
-            r"^(?:hi|hello|hey)\s+(?:my is|i'm|i am)\s+([a-zA-Z]+)(?:\s|$|,|\.)",  # "Hi my is Sean"
-            r"\bname\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b",  # "Name James" or "Name James Smith"
-            # NEW: Single name (any case) followed by comma and newline, then email/phone
-            rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?),\s*\n\s*[\w.+-]+@",  # name, \n email (not greeting)
-            rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?),\s*\n\s*\+?\d{{6,}}",  # name, \n phone (not greeting)
-            # Single name followed by newline and then email/phone (e.g., "Bambo\nemail@example.com")
-            rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?)\s*\n\s*[\w.+-]+@",  # Name followed by newline then email (not greeting)
-            rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?)\s*\n\s*\+?\d{{6,}}",  # Name followed by newline then phone (not greeting)
-            # Comma-separated names - TWO WORDS like "Jude Sean, email@example.com"
-            # Use negative lookahead to exclude greetings
-            rf"^{greeting_blacklist}([A-Z][a-z]+\s+[A-Z][a-z]+),\s*[\w.+-]+@",  # Two-word name before comma + email (not greeting)
-            rf"^{greeting_blacklist}([A-Z][a-z]+\s+[A-Z][a-z]+),\s*\+?\d{{6,}}",  # Two-word name before comma + phone (not greeting)
-            rf"^{greeting_blacklist}([A-Z][a-z]+\s+[A-Z][a-z]+),",  # Two-word name at start before comma (not greeting)
-            r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+)\s*$",  # Two-word name after comma at end
-            r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),\s*[\w.+-]+@",  # ..., Two-word Name, email@...
-            r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),\s*\+?\d{6,}",  # ..., Two-word Name, phone...
-            r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),",  # ..., Two-word Name, ... (between commas)
-            # Comma-separated names - SINGLE WORD like "Jamesborn, email@example.com"
-            rf"^{greeting_blacklist}([A-Z][a-z]{{2,}}),\s*[\w.+-]+@",  # Single name before comma + email (not greeting)
-            rf"^{greeting_blacklist}([A-Z][a-z]{{2,}}),\s*\+?\d{{6,}}",  # Single name before comma + phone (not greeting)
-            r",\s*([A-Z][a-z]{2,}),\s*[\w.+-]+@",  # ..., Single Name, email@...
-            r",\s*([A-Z][a-z]{2,}),\s*\+?\d{6,}",  # ..., Single Name, phone...
-        ]
-
-        # Search from newest to oldest
-        for msg in reversed(user_messages):
-            # Extract email from this message if not found yet
-            if not info["email"]:
-                email_match = re.search(email_pattern, msg)
-                if email_match:
-                    info["email"] = email_match.group()
-
-            # Extract phone from this message if not found yet
-            if not info["phone"]:
-                for pattern in phone_patterns:
-                    phone_match = re.search(pattern, msg)
-                    if phone_match:
-                        # Use group(1) if available (for patterns with capturing groups), else group()
-                        try:
-                            info["phone"] = phone_match.group(1).strip()
-                        except IndexError:
-                            info["phone"] = phone_match.group().strip()
-                        break
-
-            # Extract name from this message if not found yet
-            if not info["name"]:
-                for pattern in name_patterns:
-                    name_match = re.search(pattern, msg, re.IGNORECASE | re.MULTILINE)
-                    if name_match:
-                        potential_name = name_match.group(1).strip()
-                        words = potential_name.split()
-                        if 1 <= len(words) <= 4 and all('\n' not in w and len(w) >= 2 for w in words):
-                            info["name"] = " ".join(word.capitalize() for word in words)
-                            break
-
-        # Extract date (various formats) - ONLY if not already set by slot selection
-        if not info["date"]:
-            today = datetime.now()
-
-            # Check for relative dates
-            if re.search(r"\b(aujourd'hui|today)\b", conversation_text, re.IGNORECASE):
-                info["date"] = today.strftime("%Y-%m-%d")
-            elif re.search(r"\b(demain|tomorrow)\b", conversation_text, re.IGNORECASE):
-                info["date"] = (today + timedelta(days=1)).strftime("%Y-%m-%d")
-            # Check for day of week (Monday, Tuesday, etc.)
-            elif re.search(r"\b(monday|lundi)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (0 - today.weekday()) % 7
-                if days_ahead == 0:  # If today is Monday, schedule for next Monday
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            elif re.search(r"\b(tuesday|mardi)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (1 - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            elif re.search(r"\b(wednesday|mercredi)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (2 - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            elif re.search(r"\b(thursday|jeudi)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (3 - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            elif re.search(r"\b(friday|vendredi)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (4 - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            elif re.search(r"\b(saturday|samedi)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (5 - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            elif re.search(r"\b(sunday|dimanche)\b", conversation_text, re.IGNORECASE):
-                days_ahead = (6 - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-            else:
-                # Try to extract specific dates (DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD)
-                date_patterns = [
-                    r"\b(\d{4}[-/]\d{1,2}[-/]\d{1,2})\b",  # YYYY-MM-DD
-                    r"\b(\d{1,2}[-/]\d{1,2}[-/]\d{4})\b",  # DD-MM-YYYY or MM-DD-YYYY
-                ]
-                for pattern in date_patterns:
-                    date_match = re.search(pattern, conversation_text)
-                    if date_match:
-                        date_str = date_match.group(1)
-                        # Try to parse it
-                        for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y"]:
-                            try:
-                                parsed_date = datetime.strptime(date_str, fmt)
-                                info["date"] = parsed_date.strftime("%Y-%m-%d")
-                                break
-                            except:
-                                continue
-                        if info["date"]:
-                            break
-
-        # Extract time (HH:MM format or simple hour) - ONLY if not already set by slot selection
-        if not info["time"]:
-            time_pattern = r"\b(\d{1,2})[h:](\d{2})\b"
-            time_match = re.search(time_pattern, conversation_text)
-            if time_match:
-                hour = int(time_match.group(1))
-                minute = time_match.group(2)
-
-                # Check for PM/AM suffix even for HH:MM format (e.g., "2:30pm")
-                # Look for PM/AM within 5 characters after the time match
-                match_end = time_match.end()
-                nearby_text = conversation_text[max(0, match_end):match_end + 5].lower()
-
-                if "pm" in nearby_text and hour < 12:
-                    hour += 12
-                elif "am" in nearby_text and hour == 12:
-                    hour = 0  # 12am = 00:00
-
-                info["time"] = f"{hour:02d}:{minute}"
-            else:
-                # Try simple hour format like "14h" or "2pm"
-                time_pattern_simple = r"\b(\d{1,2})\s*(?:h|heures?|pm|am)\b"
-                time_match_simple = re.search(time_pattern_simple, conversation_text, re.IGNORECASE)
-                if time_match_simple:
-                    hour = int(time_match_simple.group(1))
-
-                    # Adjust for PM if needed
-                    if "pm" in conversation_text.lower() and hour < 12:
-                        hour += 12
-                    # Handle 12am (midnight) edge case
-                    elif "am" in conversation_text.lower() and hour == 12:
-                        hour = 0
-
-                    info["time"] = f"{hour:02d}:00"
+        return extract_appointment_info(messages, available_slots)
 
-        return info
-
-    def generate_response(
+    def build_business_prompt(
         self,
-        messages: list[dict],
         business_context: dict,
         has_appointments: bool = False,
         available_slots: list[dict] = None,
+        include_catalog: bool = True,
     ) -> str:
         """
-        Generate a response using Groq (Llama 3) with vision support.
+        Build the system prompt from a business dict with its "config" attached.
 
-        Args:
-            messages: List of previous messages in the conversation (with optional media)
-            business_context: Dict with business info (name, description, config, etc.)
-            has_appointments: Whether the business has appointment booking enabled
-            available_slots: List of available appointment slots
-
-        Returns:
-            The AI-generated response text
+        With include_catalog=False, FAQs and products are left out; the
+        caller sends the relevant ones per turn as `knowledge` instead.
         """
-        # Build system prompt with business context
         config = business_context.get("config", {}) or {}
-        system_prompt = self.build_system_prompt(
+        return self.build_system_prompt(
             business_name=business_context["name"],
             business_description=business_context["description"],
             language=business_context.get("language", "fr"),
             welcome_message=config.get("welcome_message", "Bonjour! Comment puis-je vous aider?"),
-            faqs=config.get("faqs", []),
-            products=config.get("products", []),
+            faqs=config.get("faqs", []) if include_catalog else [],
+            products=config.get("products", []) if include_catalog else [],
             custom_instructions=config.get("custom_instructions"),
             has_appointments=has_appointments,
             available_slots=available_slots or [],
         )
 
-        # Limit conversation history to recent messages (last 15 pairs = 30 messages max)
+    def _build_chat_request(
+        self,
+        messages: list[dict],
+        business_context: dict,
+        has_appointments: bool = False,
+        available_slots: list[dict] = None,
+        system_prompt: Optional[str] = None,
+        summary: Optional[str] = None,
+        knowledge: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        Build the Groq message list and pick the model for a chat turn.
+
+        Returns:
+            (groq_messages, selected_model)
+        """
+        # Build system prompt with business context (unless the caller has a cached one)
+        if system_prompt is None:
+            system_prompt = self.build_business_prompt(business_context, has_appointments, available_slots)
+
+        # Limit conversation history to recent messages
         # This prevents context overflow and keeps responses faster
-        recent_messages = messages[-20:] if len(messages) > 20 else messages
+        recent_messages = messages[-HISTORY_WINDOW:]
 
         # Format messages for Groq API with vision support
         groq_messages = [{"role": "system", "content": system_prompt}]
+        if summary:
+            # Context from messages that fell out of the window
+            groq_messages.append({"role": "system", "content": f"{SUMMARY_PREFIX}\n{summary}"})
+        if knowledge:
+            groq_messages.append({"role": "system", "content": f"{KNOWLEDGE_PREFIX}\n{knowledge}"})
         has_images = False
 
         # Only use vision for the LAST 3 messages (to detect current image uploads)
@@ -645,28 +467,200 @@ Règles importantes:
         # Use vision model if images are present, otherwise use regular model
         selected_model = self.vision_model if has_images else self.model
 
-        # Call Groq API
-        response = self.client.chat.completions.create(
-            model=selected_model,
-            max_tokens=500,  # Keep responses concise
-            messages=groq_messages,
+        return groq_messages, selected_model
+
+    def _fallback_response(self, business_context: dict) -> str:
+        """Simple, helpful reply used when the model returns nothing."""
+        print("⚠️ Empty response from AI, using fallback")
+        lang = business_context.get("language", "fr")
+        business_name = business_context.get("name", "")
+
+        if lang == "fr":
+            return f"Bonjour! Comment puis-je vous aider avec les services de {business_name}?"
+        return f"Hello! How can I help you with {business_name}'s services?"
+
+    async def _acquire_llm_slot(self) -> None:
+        """Wait for a free LLM slot, giving up after the queue timeout."""
+        try:
+            await asyncio.wait_for(
+                self._llm_slots.acquire(),
+                timeout=settings.groq_queue_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            print("⚠️ AI backend saturated, shedding request")
+            raise AIOverloadedError("No LLM slot available")
+
+    async def _build_chat_request_async(
+        self,
+        messages: list[dict],
+        business_context: dict,
+        has_appointments: bool = False,
+        available_slots: list[dict] = None,
+        system_prompt: Optional[str] = None,
+        summary: Optional[str] = None,
+        knowledge: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """Build the chat request, moving image downloads off the event loop."""
+        args = (messages, business_context, has_appointments, available_slots, system_prompt, summary, knowledge)
+        if any(m.get("media") for m in messages[-3:]):
+            return await asyncio.to_thread(self._build_chat_request, *args)
+        return self._build_chat_request(*args)
+
+    async def generate_response_async(
+        self,
+        messages: list[dict],
+        business_context: dict,
+        has_appointments: bool = False,
+        available_slots: list[dict] = None,
+        system_prompt: Optional[str] = None,
+        summary: Optional[str] = None,
+        knowledge: Optional[str] = None,
+    ) -> str:
+        """
+        Generate a response using Groq (Llama 3) with vision support.
+
+        Args:
+            messages: List of previous messages in the conversation (with optional media)
+            business_context: Dict with business info (name, description, config, etc.)
+            has_appointments: Whether the business has appointment booking enabled
+            available_slots: List of available appointment slots
+            system_prompt: Pre-rendered system prompt (built from business_context if omitted)
+            summary: Rolling summary of messages older than the history window
+            knowledge: FAQs/products retrieved for this turn (large catalogs only)
+
+        Returns:
+            The AI-generated response text (from the response cache for
+            context-free questions already answered for this business)
+
+        Waits for a free LLM slot first. Raises AIOverloadedError when the
+        backend is saturated, and Groq errors (including timeouts) as-is, so
+        callers fall back to their usual error reply.
+        """
+        groq_messages, selected_model = await self._build_chat_request_async(
+            messages, business_context, has_appointments, available_slots, system_prompt, summary, knowledge
         )
+        cache_key = response_cache.key(business_context.get("id"), groq_messages, selected_model)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        await self._acquire_llm_slot()
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=selected_model,
+                max_tokens=500,  # Keep responses concise
+                messages=groq_messages,
+            )
+        finally:
+            self._llm_slots.release()
 
         # Handle empty responses
         ai_response = response.choices[0].message.content
         if not ai_response or ai_response.strip() == "":
-            print("⚠️ Empty response from AI, using fallback")
-            lang = business_context.get("language", "fr")
-            business_name = business_context.get("name", "")
-
-            # Simple, helpful fallback
-            if lang == "fr":
-                ai_response = f"Bonjour! Comment puis-je vous aider avec les services de {business_name}?"
-            else:
-                ai_response = f"Hello! How can I help you with {business_name}'s services?"
+            return self._fallback_response(business_context)
 
+        response_cache.set(cache_key, ai_response)
         return ai_response
 
+    async def stream_response_async(
+        self,
+        messages: list[dict],
+        business_context: dict,
+        has_appointments: bool = False,
+        available_slots: list[dict] = None,
+        system_prompt: Optional[str] = None,
+        summary: Optional[str] = None,
+        knowledge: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from Groq token by token.
+
+        Takes the same arguments as generate_response_async and yields text
+        deltas as soon as Groq produces them. If the model produces no text
+        at all, the fallback reply is yielded instead. Holds an LLM slot for
+        the duration of the stream. A cached reply is yielded as a single delta.
+        """
+        groq_messages, selected_model = await self._build_chat_request_async(
+            messages, business_context, has_appointments, available_slots, system_prompt, summary, knowledge
+        )
+        cache_key = response_cache.key(business_context.get("id"), groq_messages, selected_model)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        await self._acquire_llm_slot()
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=selected_model,
+                max_tokens=500,  # Keep responses concise
+                messages=groq_messages,
+                stream=True,
+            )
+
+            deltas = []
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    deltas.append(delta)
+                    yield delta
+        finally:
+            self._llm_slots.release()
+
+        ai_response = "".join(deltas)
+        if not ai_response.strip():
+            yield self._fallback_response(business_context)
+            return
+
+        response_cache.set(cache_key, ai_response)
+
+    async def summarize_async(
+        self,
+        previous_summary: Optional[str],
+        messages: list[dict],
+        language: str = "fr",
+    ) -> str:
+        """
+        Fold messages into a conversation's rolling summary.
+
+        Uses the small model with a short output cap, so the summary (and the
+        prompts it is prepended to) stays bounded however long the
+        conversation gets.
+        """
+        transcript = "\n".join(
+            f"{'Customer' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
+            for m in messages
+        )
+        target_language = "French" if language == "fr" else "English"
+        prompt = (
+            "You maintain a running summary of a customer support conversation.\n"
+            "Update the summary with the new messages. Keep facts the assistant needs later: "
+            "the customer's name and contact details, what they asked for, products or services "
+            "discussed, prices quoted, appointment details and anything still unresolved.\n"
+            f"Write at most 120 words in {target_language}, as plain sentences.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\n"
+            f"New messages:\n{transcript}"
+        )
+
+        await self._acquire_llm_slot()
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.summary_model,
+                max_tokens=250,
+                temperature=0.2,
+                messages=[{"role": "user", "content": prompt}],
+            )
+        finally:
+            self._llm_slots.release()
+
+        return (response.choices[0].message.content or "").strip() or (previous_summary or "")
+
+    async def aclose(self) -> None:
+        """Close the pooled async HTTP client."""
+        await self.async_client.close()
+
 
 # Singleton instance - created lazily to avoid errors at import time
 _ai_service = None
@@ -678,5 +672,12 @@ def get_ai_service() -> AIService:
         _ai_service = AIService()
     return _ai_service
 
+
+async def close_ai_service() -> None:
+    """Release the AI service's pooled connections (called on shutdown)."""
+    if _ai_service is not None:
+        await _ai_service.aclose()
+
+
 # For backward compatibility
 ai_service = None  # Will be initialized on first use
@@ -0,0 +1,268 @@
+"""
+Appointment info extraction - pulls name, phone, email, date and time out of
+a booking conversation with regexes.
+
+Every pattern is compiled once at import. Each user message is scanned in a
+single pass for all fields, and scans are memoized by message text, so on
+each booking-flow turn only the newest message is actually scanned. Slot
+numbers and simple hours ("option 2", "3 pm") can span two messages, so those
+are searched in the joined conversation, and only when needed.
+Benchmark: backend/benchmark_appointment_extraction.py
+"""
+
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+# Scanned messages kept in memory (a booking flow re-reads the same few messages every turn)
+SCAN_CACHE_SIZE = 4096
+
+# Slot references, tried in order. Each entry is (pattern, slot number);
+# a None slot number means the pattern captures it.
+SLOT_PATTERNS = [
+    (re.compile(r"(?:slot|option|créneau|creneau|choice|choix)\s*#?\s*(\d+)", re.IGNORECASE), None),  # slot 1, option #2
+    (re.compile(r"(?:the\s+)?(?:first|1st|premier|première)\s*(?:one|slot|option)?", re.IGNORECASE), 1),  # the first one
+    (re.compile(r"(?:the\s+)?(?:second|2nd|deuxième|deuxieme)\s*(?:one|slot|option)?", re.IGNORECASE), 2),  # the second
+    (re.compile(r"(?:the\s+)?(?:third|3rd|troisième|troisieme)\s*(?:one|slot|option)?", re.IGNORECASE), 3),  # the third
+    (re.compile(r"(?:number|numéro|numero|#)\s*(\d+)", re.IGNORECASE), None),  # number 1, #2
+    # Only a bare number ("2") when it is the whole conversation
+    (re.compile(r"^(\d+)$", re.IGNORECASE), None),
+]
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+PHONE_PATTERNS = [
+    re.compile(r'\+\d{1,4}\s*\d{6,14}'),  # International format +XX XXXXXXXXX
+    re.compile(r'\+237\s*[6-9]\d{8}'),  # Cameroon +237 format
+    re.compile(r'\b[6-9]\d{8}\b'),  # 9-digit format starting with 6-9
+    re.compile(r'\b\d{10}\b'),  # 10-digit format (US, etc.)
+    re.compile(r'(?:number|phone|tel|num)[\s:]*(\d{7,15})'),  # Labeled phone numbers
+]
+
+# More flexible name patterns including typos like "my is X", "hi my is X"
+# IMPORTANT: Patterns must NOT match greetings like "Hi Raven"
+_GREETING_BLACKLIST = r"(?!Hi\s|Hello\s|Hey\s|Bonjour\s|Salut\s)"  # Negative lookahead for greetings
+
+NAME_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+    r"(?:je m'appelle|mon nom est|je suis)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s|$|,|\.)",
+    r"(?:my name is|I am|I'm|my is|hi my is|hi i'm|hi i am)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s|$|,|\.)",
+    r"(?:name|nom)[:;]?\s*([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\n|$|\s|,|\.)",  # "Name James" or "name: James"
+    r"^(?:hi|hello|hey)\s+(?:my is|i'm|i am)\s+([a-zA-Z]+)(?:\s|$|,|\.)",  # "Hi my is Sean"
+    r"\bname\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b",  # "Name James" or "Name James Smith"
+    # Single name (any case) followed by comma and newline, then email/phone
+    rf"^{_GREETING_BLACKLIST}([a-zA-Z]+(?:\s+[a-zA-Z]+)?),\s*\n\s*[\w.+-]+@",  # name, \n email (not greeting)
+    rf"^{_GREETING_BLACKLIST}([a-zA-Z]+(?:\s+[a-zA-Z]+)?),\s*\n\s*\+?\d{{6,}}",  # name, \n phone (not greeting)
+    # Single name followed by newline and then email/phone (e.g., "Bambo\nemail@example.com")
+    rf"^{_GREETING_BLACKLIST}([a-zA-Z]+(?:\s+[a-zA-Z]+)?)\s*\n\s*[\w.+-]+@",  # Name, newline, email (not greeting)
+    rf"^{_GREETING_BLACKLIST}([a-zA-Z]+(?:\s+[a-zA-Z]+)?)\s*\n\s*\+?\d{{6,}}",  # Name, newline, phone (not greeting)
+    # Comma-separated names - TWO WORDS like "Jude Sean, email@example.com"
+    rf"^{_GREETING_BLACKLIST}([A-Z][a-z]+\s+[A-Z][a-z]+),\s*[\w.+-]+@",  # Two-word name before comma + email
+    rf"^{_GREETING_BLACKLIST}([A-Z][a-z]+\s+[A-Z][a-z]+),\s*\+?\d{{6,}}",  # Two-word name before comma + phone
+    rf"^{_GREETING_BLACKLIST}([A-Z][a-z]+\s+[A-Z][a-z]+),",  # Two-word name at start before comma
+    r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+)\s*$",  # Two-word name after comma at end
+    r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),\s*[\w.+-]+@",  # ..., Two-word Name, email@...
+    r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),\s*\+?\d{6,}",  # ..., Two-word Name, phone...
+    r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),",  # ..., Two-word Name, ... (between commas)
+    # Comma-separated names - SINGLE WORD like "Jamesborn, email@example.com"
+    rf"^{_GREETING_BLACKLIST}([A-Z][a-z]{{2,}}),\s*[\w.+-]+@",  # Single name before comma + email
+    rf"^{_GREETING_BLACKLIST}([A-Z][a-z]{{2,}}),\s*\+?\d{{6,}}",  # Single name before comma + phone
+    r",\s*([A-Z][a-z]{2,}),\s*[\w.+-]+@",  # ..., Single Name, email@...
+    r",\s*([A-Z][a-z]{2,}),\s*\+?\d{6,}",  # ..., Single Name, phone...
+]]
+
+RELATIVE_DAY_PATTERN = re.compile(r"\b(aujourd'hui|today|demain|tomorrow)\b", re.IGNORECASE)
+RELATIVE_DAYS = {"aujourd'hui": 0, "today": 0, "demain": 1, "tomorrow": 1}
+
+WEEKDAY_PATTERN = re.compile(
+    r"\b(monday|lundi|tuesday|mardi|wednesday|mercredi|thursday|jeudi|friday|vendredi|saturday|samedi|sunday|dimanche)\b",
+    re.IGNORECASE,
+)
+WEEKDAYS = {
+    "monday": 0, "lundi": 0,
+    "tuesday": 1, "mardi": 1,
+    "wednesday": 2, "mercredi": 2,
+    "thursday": 3, "jeudi": 3,
+    "friday": 4, "vendredi": 4,
+    "saturday": 5, "samedi": 5,
+    "sunday": 6, "dimanche": 6,
+}
+
+# Specific dates, tried in order: YYYY-MM-DD, then DD-MM-YYYY or MM-DD-YYYY
+DATE_PATTERNS = [
+    re.compile(r"\b(\d{4}[-/]\d{1,2}[-/]\d{1,2})\b"),
+    re.compile(r"\b(\d{1,2}[-/]\d{1,2}[-/]\d{4})\b"),
+]
+DATE_FORMATS = ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y"]
+
+CLOCK_TIME_PATTERN = re.compile(r"\b(\d{1,2})[h:](\d{2})\b")  # 14:30, 14h30
+HOUR_PATTERN = re.compile(r"\b(\d{1,2})\s*(?:h|heures?|pm|am)\b", re.IGNORECASE)  # 14h, 2pm
+
+
+@lru_cache(maxsize=SCAN_CACHE_SIZE)
+def scan_message(text: str) -> dict:
+    """
+    Scan one user message for every appointment field in a single pass.
+
+    Returns the first match of each pattern in the message; the caller
+    combines scans across the conversation. The result is cached and shared,
+    so it must not be modified.
+    """
+    email = EMAIL_PATTERN.search(text)
+
+    phone = None
+    for pattern in PHONE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            # Use the captured number for labeled patterns, else the whole match
+            phone = (match.group(1) if pattern.groups else match.group()).strip()
+            break
+
+    name = None
+    for pattern in NAME_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            words = match.group(1).strip().split()
+            if 1 <= len(words) <= 4 and all(len(w) >= 2 for w in words):
+                name = " ".join(word.capitalize() for word in words)
+                break
+
+    relative_days = {RELATIVE_DAYS[m.lower()] for m in RELATIVE_DAY_PATTERN.findall(text)}
+    clock = CLOCK_TIME_PATTERN.search(text)
+    dates = []
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        dates.append(match.group(1) if match else None)
+
+    return {
+        "lower": text.lower(),
+        "email": email.group() if email else None,
+        "phone": phone,
+        "name": name,
+        "relative_days": relative_days,
+        "weekdays": {WEEKDAYS[m.lower()] for m in WEEKDAY_PATTERN.findall(text)},
+        "dates": dates,
+        "clock": (int(clock.group(1)), clock.group(2), clock.end()) if clock else None,
+    }
+
+
+def _select_slot(conversation_text: str, available_slots: list[dict]) -> Optional[dict]:
+    """Find the slot the customer picked, by its display text or by number."""
+    conversation_lower = conversation_text.lower()
+
+    # Message matches a slot's display text (e.g., "Thursday 05 February at 11:30")
+    for slot in available_slots:
+        display_en = f"{slot['display_date']} at {slot['time']}".lower()
+        display_fr = f"{slot['display_date']} à {slot['time']}".lower()
+        if display_en in conversation_lower or display_fr in conversation_lower:
+            return slot
+
+    # Fallback: slot number selection ("slot 1", "the second one"); only the
+    # earliest mention of each pattern counts
+    for pattern, slot_num in SLOT_PATTERNS:
+        match = pattern.search(conversation_text)
+        if not match:
+            continue
+        if slot_num is None:
+            slot_num = int(match.group(1))
+        if 1 <= slot_num <= len(available_slots):
+            return available_slots[slot_num - 1]
+    return None
+
+
+def _extract_date(scans: list[dict]) -> Optional[str]:
+    """Resolve the requested date: today/tomorrow, then a weekday, then an explicit date."""
+    today = datetime.now()
+
+    relative_days = set().union(*(scan["relative_days"] for scan in scans))
+    if relative_days:
+        return (today + timedelta(days=min(relative_days))).strftime("%Y-%m-%d")
+
+    weekdays = set().union(*(scan["weekdays"] for scan in scans))
+    if weekdays:
+        # Earliest day of the week mentioned, always in the future (next week if it's today)
+        days_ahead = (min(weekdays) - today.weekday()) % 7 or 7
+        return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+
+    for i in range(len(DATE_PATTERNS)):
+        date_str = next((scan["dates"][i] for scan in scans if scan["dates"][i]), None)
+        if not date_str:
+            continue
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+    return None
+
+
+def _extract_time(user_messages: list[str], scans: list[dict], conversation_text: str) -> Optional[str]:
+    """Resolve the requested time from the earliest HH:MM or simple hour mention."""
+    for i, scan in enumerate(scans):
+        if not scan["clock"]:
+            continue
+        hour, minute, end = scan["clock"]
+
+        # Check for PM/AM suffix even for HH:MM format (e.g., "2:30pm"),
+        # within 5 characters after the time (possibly in the next message)
+        nearby_text = " ".join([user_messages[i][end:]] + user_messages[i + 1:])[:5].lower()
+        if "pm" in nearby_text and hour < 12:
+            hour += 12
+        elif "am" in nearby_text and hour == 12:
+            hour = 0  # 12am = 00:00
+        return f"{hour:02d}:{minute}"
+
+    # Simple hour format like "14h" or "2pm"
+    match = HOUR_PATTERN.search(conversation_text)
+    if not match:
+        return None
+    hour = int(match.group(1))
+    if any("pm" in scan["lower"] for scan in scans) and hour < 12:
+        hour += 12
+    elif any("am" in scan["lower"] for scan in scans) and hour == 12:
+        hour = 0  # 12am = 00:00
+    return f"{hour:02d}:00"
+
+
+def extract_appointment_info(messages: list[dict], available_slots: list[dict] = None) -> dict:
+    """
+    Extract appointment information from conversation history.
+    Returns a dict with name, phone, email, date, time, service, notes.
+
+    Name, phone and email come from the newest message that has them; date
+    and time from their earliest mention, unless a slot was selected.
+    """
+    info = {
+        "name": None,
+        "phone": None,
+        "email": None,
+        "date": None,
+        "time": None,
+        "service": None,
+        "notes": None,
+    }
+
+    user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
+    scans = [scan_message(text) for text in user_messages]
+    if not scans:
+        return info
+    conversation_text = " ".join(user_messages)
+
+    if available_slots:
+        slot = _select_slot(conversation_text, available_slots)
+        if slot:
+            info["date"] = slot["date"]
+            info["time"] = slot["time"]
+
+    # Newest to oldest so the most recent value for each field wins
+    for scan in reversed(scans):
+        for field in ("email", "phone", "name"):
+            if not info[field]:
+                info[field] = scan[field]
+
+    if not info["date"]:
+        info["date"] = _extract_date(scans)
+    if not info["time"]:
+        info["time"] = _extract_time(user_messages, scans, conversation_text)
+
+    return info
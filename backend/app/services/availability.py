@@ -0,0 +1,185 @@
+"""
+Availability engine - computes bookable appointment slots and whether a
+business is open right now. Shared by the chat flow, the public slots
+endpoint and the widget bootstrap.
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+# Statuses that block a time range
+BLOCKING_STATUSES = ["pending", "confirmed"]
+
+DEFAULT_TIMEZONE = "Africa/Douala"
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def parse_minutes(time_str: str) -> int:
+    """Convert "HH:MM" or "HH:MM:SS" into minutes since midnight."""
+    hours, minutes = time_str.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    """Convert minutes since midnight into "HH:MM"."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class BookingIndex:
+    """
+    Per-day sorted interval index of booked time ranges.
+
+    Overlapping bookings are merged, so for each day both the start and end
+    lists are sorted and a slot can be checked with a single binary search.
+    """
+
+    def __init__(self, appointments: list[dict]):
+        by_day: dict[str, list[tuple[int, int]]] = {}
+        for appt in appointments:
+            start = parse_minutes(appt["appointment_time"])
+            end = start + (appt.get("duration_minutes") or 60)
+            by_day.setdefault(appt["appointment_date"], []).append((start, end))
+
+        self._starts: dict[str, list[int]] = {}
+        self._ends: dict[str, list[int]] = {}
+        for day, intervals in by_day.items():
+            intervals.sort()
+            merged = [list(intervals[0])]
+            for start, end in intervals[1:]:
+                if start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self._starts[day] = [start for start, _ in merged]
+            self._ends[day] = [end for _, end in merged]
+
+    def is_free(self, day: str, start: int, end: int) -> bool:
+        """Check whether [start, end) on `day` overlaps no booking."""
+        ends = self._ends.get(day)
+        if not ends:
+            return True
+        # First booking that ends after the slot starts is the only candidate
+        i = bisect_right(ends, start)
+        return i == len(ends) or self._starts[day][i] >= end
+
+
+def find_available_slots(
+    availability: dict,
+    appointments: list[dict],
+    start: date,
+    days: int,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """
+    Compute free slots for `days` days starting at `start`.
+
+    Args:
+        availability: business_availability row (weekly_schedule, durations)
+        appointments: booked appointments in the range (pending/confirmed)
+        start: first day to consider
+        days: number of days to scan
+        limit: stop after this many slots
+
+    Returns:
+        List of dicts with date, time, duration_minutes and display_date
+    """
+    index = BookingIndex(appointments)
+    weekly_schedule = availability["weekly_schedule"]
+    duration = availability["default_duration_minutes"]
+    step = duration + availability["buffer_minutes"]
+
+    available_slots = []
+    for day_offset in range(days):
+        current_date = start + timedelta(days=day_offset)
+        day_schedule = weekly_schedule.get(WEEKDAYS[current_date.weekday()])
+        if not day_schedule or not day_schedule["enabled"]:
+            continue
+
+        date_str = current_date.isoformat()
+        display_date = current_date.strftime("%A %d %B")  # e.g., "Monday 04 February"
+
+        for slot in day_schedule.get("slots", []):
+            slot_start = parse_minutes(slot["start"])
+            slot_end = parse_minutes(slot["end"])
+
+            current = slot_start
+            while current + duration <= slot_end:
+                if index.is_free(date_str, current, current + duration):
+                    available_slots.append({
+                        "date": date_str,
+                        "time": format_minutes(current),
+                        "duration_minutes": duration,
+                        "display_date": display_date,
+                    })
+                    if limit and len(available_slots) >= limit:
+                        return available_slots
+                current += step
+
+    return available_slots
+
+
+def business_timezone(availability: dict) -> tzinfo:
+    """The business's timezone, falling back to the default for unknown names."""
+    try:
+        return ZoneInfo(availability.get("timezone") or DEFAULT_TIMEZONE)
+    except Exception:
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def _is_open_at(weekly_schedule: dict, weekday: int, minute: int) -> bool:
+    """
+    Check the weekly schedule at a local weekday/minute. Days default to
+    enabled, and an enabled day without slots is open all day.
+    """
+    day_schedule = weekly_schedule.get(WEEKDAYS[weekday], {})
+    if not day_schedule.get("enabled", True):
+        return False
+    slots = day_schedule.get("slots", [])
+    if not slots:
+        return True
+    return any(
+        parse_minutes(slot.get("start", "00:00")) <= minute <= parse_minutes(slot.get("end", "23:59"))
+        for slot in slots
+    )
+
+
+def get_online_status(availability: Optional[dict], now: Optional[datetime] = None) -> tuple[bool, Optional[datetime]]:
+    """
+    Whether the business is open now according to its weekly schedule, and
+    when that next changes.
+
+    Returns (is_online, next_change). next_change is an aware datetime, or
+    None if the status stays the same for the coming week (or there is no
+    schedule, in which case the business is always online).
+    """
+    if not availability:
+        return True, None
+
+    tz = business_timezone(availability)
+    now = (now or datetime.now(tz)).astimezone(tz)
+    weekly_schedule = availability.get("weekly_schedule") or {}
+    is_online = _is_open_at(weekly_schedule, now.weekday(), now.hour * 60 + now.minute)
+
+    # Status can only change at midnight, a slot start or the minute after a slot end
+    for day_offset in range(8):
+        day = now.date() + timedelta(days=day_offset)
+        day_schedule = weekly_schedule.get(WEEKDAYS[day.weekday()], {})
+        boundaries = {0}
+        for slot in day_schedule.get("slots", []):
+            boundaries.add(parse_minutes(slot.get("start", "00:00")))
+            boundaries.add(parse_minutes(slot.get("end", "23:59")) + 1)
+        for minute in sorted(b for b in boundaries if b < 24 * 60):
+            boundary = datetime.combine(day, time(minute // 60, minute % 60), tzinfo=tz)
+            if boundary <= now:
+                continue
+            if _is_open_at(weekly_schedule, day.weekday(), minute) != is_online:
+                return is_online, boundary
+
+    return is_online, None
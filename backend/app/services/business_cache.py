@@ -0,0 +1,196 @@
+"""
+Business context cache.
+Keeps each business's chat context (business row, config, availability and
+rendered system prompts) in memory so chat turns don't re-read it from
+Supabase and rebuild the prompt on every message. Also maps WhatsApp numbers
+to businesses for webhook routing.
+"""
+
+import asyncio
+from typing import Optional
+
+from app.config import get_settings
+from app.services.ai import get_ai_service
+from app.services.cache import TTLCache
+from app.services.database import async_db
+from app.services.metrics import metrics
+from app.services.response_cache import response_cache
+from app.services.retrieval import FAQMatcher, KnowledgeIndex
+
+settings = get_settings()
+
+
+# Singleton instance - endpoints that modify a business, its config or its
+# availability must call business_cache.invalidate(business_id)
+business_cache = TTLCache(
+    max_size=settings.business_cache_max_size,
+    ttl_seconds=settings.business_cache_ttl_seconds,
+)
+
+# WhatsApp number -> business id. Entries are checked against the cached
+# business row on every hit, so a number moved to another business is re-resolved.
+whatsapp_routes = TTLCache(
+    max_size=settings.business_cache_max_size,
+    ttl_seconds=settings.business_cache_ttl_seconds,
+)
+
+
+async def get_business_context(business_id: str) -> Optional[dict]:
+    """
+    Get the chat context for a business, loading it on a cache miss.
+
+    Returns a dict with "business" (with "config" attached), "config",
+    "availability", "knowledge" (the FAQ/product retrieval index) and
+    "faq_matcher" (for the FAQ fast path), or None
+    if the business does not exist. Callers must treat it as read-only since
+    it is shared between requests.
+    """
+    context = business_cache.get(business_id)
+    if context:
+        return context
+
+    business, config, availability = await asyncio.gather(
+        async_db.get_business(business_id),
+        async_db.get_business_config(business_id),
+        async_db.get_business_availability(business_id),
+    )
+    if not business:
+        return None
+
+    business["config"] = config
+    context = {
+        "business": business,
+        "config": config,
+        "availability": availability,
+        "knowledge": KnowledgeIndex.from_config(config),
+        "faq_matcher": FAQMatcher.from_config(config),
+        "prompts": {},
+        "widget_bootstrap": None,
+    }
+    business_cache.set(business_id, context)
+    return context
+
+
+def get_cached_system_prompt(
+    context: dict,
+    has_appointments: bool,
+    available_slots: list[dict],
+) -> str:
+    """
+    Get the rendered system prompt for a business, building it once per variant.
+
+    The prompt only depends on the business context, whether booking is
+    enabled and whether any slot is available, so those form the cache key.
+    Large catalogs are left out of it and retrieved per turn instead
+    (see get_turn_knowledge).
+    """
+    key = (has_appointments, bool(available_slots))
+    prompt = context["prompts"].get(key)
+    if prompt is None:
+        prompt = get_ai_service().build_business_prompt(
+            context["business"],
+            has_appointments=has_appointments,
+            available_slots=available_slots,
+            include_catalog=not context["knowledge"].enabled,
+        )
+        context["prompts"][key] = prompt
+    return prompt
+
+
+def get_turn_knowledge(context: dict, messages: list[dict]) -> Optional[str]:
+    """
+    Retrieve the FAQs and products relevant to the latest customer messages.
+
+    Uses the last two user messages so short follow-ups ("how much is it?")
+    still match what they refer to. Returns None for small catalogs, which
+    are already in the system prompt.
+    """
+    user_messages = [m["content"] for m in messages if m["role"] == "user" and m.get("content")]
+    return context["knowledge"].render(" ".join(user_messages[-2:]))
+
+
+def get_faq_answer(context: dict, message: str) -> Optional[str]:
+    """
+    FAQ fast path: the configured answer when `message` restates one of the
+    business's FAQs with at least settings.faq_fast_path_threshold confidence,
+    otherwise None (generate the reply with the LLM).
+
+    Lookups, hits and a histogram of best-match scores are counted under
+    "faq_fast_path" in GET /metrics to help tune the threshold.
+    """
+    faq, score = context["faq_matcher"].match(message)
+    metrics.incr("faq_fast_path", "lookups")
+    metrics.incr("faq_fast_path", f"score_{min(int(score * 10), 9) / 10:.1f}")
+    if faq is None or score < settings.faq_fast_path_threshold:
+        return None
+
+    metrics.incr("faq_fast_path", "hits")
+    print(f"⚡ FAQ fast path hit ({score:.2f}): {faq['question'][:50]}")
+    return faq["answer"]
+
+
+def normalize_whatsapp_number(number: str) -> str:
+    """Strip the "whatsapp:" prefix and spaces, e.g. "whatsapp:+1 415..." -> "+1415..."."""
+    return number.replace("whatsapp:", "").replace(" ", "").strip()
+
+
+async def get_business_context_for_whatsapp(whatsapp_number: str) -> Optional[dict]:
+    """
+    Resolve the business that owns a WhatsApp number and return its chat context.
+
+    Served from memory after the first message; falls back to the indexed
+    businesses.whatsapp_number lookup on a miss. Returns None if no business
+    owns the number.
+    """
+    number = normalize_whatsapp_number(whatsapp_number)
+
+    business_id = whatsapp_routes.get(number)
+    if business_id:
+        context = await get_business_context(business_id)
+        if context and context["business"].get("whatsapp_number") == number:
+            return context
+        whatsapp_routes.invalidate(number)
+
+    business = await async_db.get_business_by_whatsapp(number)
+    if not business:
+        return None
+
+    whatsapp_routes.set(number, business["id"])
+    return await get_business_context(business["id"])
+
+
+# whatsapp_routes key for the sole business found by the platform-number fallback
+# ("" when there isn't exactly one business)
+FALLBACK_ROUTE = "__fallback__"
+
+
+async def get_fallback_whatsapp_context(whatsapp_number: str) -> Optional[dict]:
+    """
+    Chat context for a message to a number no business owns.
+
+    Goes to settings.whatsapp_default_business_id when set. Otherwise a
+    message to the platform's own number (settings.twilio_whatsapp_number)
+    goes to the only business when exactly one exists, so single-tenant
+    deploys keep working before a number is linked. Returns None otherwise.
+    """
+    if settings.whatsapp_default_business_id:
+        return await get_business_context(settings.whatsapp_default_business_id)
+
+    platform_number = normalize_whatsapp_number(settings.twilio_whatsapp_number)
+    if not platform_number or normalize_whatsapp_number(whatsapp_number) != platform_number:
+        return None
+
+    business_id = whatsapp_routes.get(FALLBACK_ROUTE)
+    if business_id is None:
+        business_id = await async_db.get_only_business_id() or ""
+        whatsapp_routes.set(FALLBACK_ROUTE, business_id)
+    return await get_business_context(business_id) if business_id else None
+
+
+def invalidate_business(business: dict) -> None:
+    """Drop a business's cached context, AI replies and WhatsApp route (call after any update)."""
+    business_cache.invalidate(business["id"])
+    response_cache.invalidate(business["id"])
+    if business.get("whatsapp_number"):
+        whatsapp_routes.invalidate(business["whatsapp_number"])
+    whatsapp_routes.invalidate(FALLBACK_ROUTE)
@@ -0,0 +1,56 @@
+"""
+Per-conversation background work queue.
+Runs jobs in the background while keeping them strictly ordered within a
+conversation, so replies go out in the order the messages arrived.
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+
+
+class ConversationQueue:
+    """
+    One lazy worker task per conversation with pending work.
+
+    Jobs for the same conversation run one after another; different
+    conversations run concurrently. A worker exits as soon as its queue is
+    empty, so idle conversations cost nothing.
+    """
+
+    def __init__(self):
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._workers: set[asyncio.Task] = set()
+
+    def enqueue(self, conversation_id: str, job: Callable[[], Awaitable[None]]) -> None:
+        """Schedule `job()` to run after any pending jobs of the conversation."""
+        queue = self._queues.get(conversation_id)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[conversation_id] = queue
+            worker = asyncio.create_task(self._run(conversation_id, queue))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+        queue.put_nowait(job)
+
+    async def _run(self, conversation_id: str, queue: asyncio.Queue) -> None:
+        """Drain one conversation's queue, then retire the worker."""
+        while not queue.empty():
+            job = queue.get_nowait()
+            try:
+                await job()
+            except Exception as e:
+                print(f"Background job failed for conversation {conversation_id}: {e}")
+        del self._queues[conversation_id]
+
+    def pending(self) -> int:
+        """Number of conversations with queued or running work."""
+        return len(self._queues)
+
+    async def drain(self, timeout: float = 30.0) -> None:
+        """Wait for in-flight work to finish (called on shutdown)."""
+        if self._workers:
+            await asyncio.wait(set(self._workers), timeout=timeout)
+
+
+# Singleton instance
+conversation_queue = ConversationQueue()
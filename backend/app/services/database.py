@@ -3,9 +3,11 @@ Supabase database service.
 Handles all database operations through the Supabase client.
 """
 
-from datetime import datetime, timedelta, timezone
-from functools import lru_cache
-from typing import Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache, partial
+from typing import Any, Callable, Iterator, Optional
 from supabase import create_client, Client
 from app.config import get_settings
 
@@ -94,22 +96,29 @@ class DatabaseService:
         result = self.client.table("conversations").select("*").eq("id", conversation_id).execute()
         return result.data[0] if result.data else None
 
-    def get_conversations_by_business(self, business_id: str, limit: int = 50) -> list[dict]:
-        """Get recent conversations for a business."""
-        result = (
+    def get_conversations_by_business(
+        self,
+        business_id: str,
+        limit: int = 50,
+        started_after: str = None,
+    ) -> list[dict]:
+        """Get recent conversations for a business, optionally only those started after a timestamp."""
+        query = (
             self.client.table("conversations")
             .select("*")
             .eq("business_id", business_id)
-            .order("last_message_at", desc=True)
-            .limit(limit)
-            .execute()
         )
+        if started_after:
+            query = query.gte("started_at", started_after)
+
+        result = query.order("last_message_at", desc=True).limit(limit).execute()
         return result.data or []
 
-    def update_conversation_timestamp(self, conversation_id: str) -> None:
-        """Update the last_message_at timestamp."""
+    def update_conversation_summary(self, conversation_id: str, summary: str, summarized_until: str) -> None:
+        """Store a conversation's rolling summary and how far it reaches (see migration 019)."""
         self.client.table("conversations").update({
-            "last_message_at": "now()"
+            "summary": summary,
+            "summarized_until": summarized_until,
         }).eq("id", conversation_id).execute()
 
     def set_conversation_takeover(
@@ -158,23 +167,58 @@ class DatabaseService:
             return None
 
         conversation = result.data[0]
-        messages = self.get_conversation_messages(conversation_id, limit=100)
+        messages = self.get_recent_messages(conversation_id, limit=100)
         conversation["messages"] = messages
         return conversation
 
     # --- Message Operations ---
 
-    def create_message(self, conversation_id: str, role: str, content: str, media: list = None) -> dict:
-        """Create a new message with optional media attachments."""
-        data = {
-            "conversation_id": conversation_id,
+    def create_message(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        media: list = None,
+        external_id: str = None,
+    ) -> dict:
+        """
+        Create a new message with optional media attachments.
+
+        The insert also bumps the conversation's last_message_at (trigger from
+        migration 020). `external_id` is the provider message id (e.g. Twilio
+        MessageSid); inserting one that already exists raises a unique
+        violation (23505).
+        """
+        messages = self.create_messages(conversation_id, [{
             "role": role,
             "content": content,
-        }
-        if media:
-            data["media"] = media
-        result = self.client.table("messages").insert(data).execute()
-        return result.data[0] if result.data else None
+            "media": media,
+            "external_id": external_id,
+        }])
+        return messages[0] if messages else None
+
+    def create_messages(self, conversation_id: str, messages: list[dict]) -> list[dict]:
+        """
+        Insert several messages in one write, in order.
+
+        Each dict has role and content, plus optional media and external_id.
+        Rows get increasing created_at values and the conversation's
+        last_message_at is bumped in the same statement (migration 020).
+        """
+        rows = []
+        for message in messages:
+            data = {
+                "conversation_id": conversation_id,
+                "role": message["role"],
+                "content": message["content"],
+            }
+            if message.get("media"):
+                data["media"] = message["media"]
+            if message.get("external_id"):
+                data["external_id"] = message["external_id"]
+            rows.append(data)
+        result = self.client.table("messages").insert(rows).execute()
+        return result.data or []
 
     def get_conversation_messages(self, conversation_id: str, limit: int = 50) -> list[dict]:
         """Get messages for a conversation."""
@@ -188,10 +232,59 @@ class DatabaseService:
         )
         return result.data or []
 
+    def get_recent_messages(
+        self,
+        conversation_id: str,
+        limit: int = 20,
+        before: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Get the newest `limit` messages of a conversation, oldest first.
+
+        Reads from the tail (created_at DESC, see the index from migration 012)
+        and reverses, so long conversations return their recent context.
+        Pass the created_at of the oldest message returned as `before` to page
+        further back.
+        """
+        query = (
+            self.client.table("messages")
+            .select("*")
+            .eq("conversation_id", conversation_id)
+        )
+        if before:
+            query = query.lt("created_at", before)
+
+        result = query.order("created_at", desc=True).limit(limit).execute()
+        return list(reversed(result.data or []))
+
+    def get_messages_between(
+        self,
+        conversation_id: str,
+        after: Optional[str],
+        before: str,
+        limit: int = 40,
+    ) -> list[dict]:
+        """Get messages created after `after` (exclusive, None for the start) and before `before`, oldest first."""
+        query = (
+            self.client.table("messages")
+            .select("role, content, created_at")
+            .eq("conversation_id", conversation_id)
+            .lt("created_at", before)
+        )
+        if after:
+            query = query.gt("created_at", after)
+
+        result = query.order("created_at", desc=False).limit(limit).execute()
+        return result.data or []
+
+    def iter_conversation_messages(self, conversation_id: str, page_size: int = 500) -> Iterator[dict]:
+        """Yield every message of a conversation, oldest first, one page at a time."""
+        yield from self._keyset_scan("messages", "conversation_id", conversation_id, "created_at", page_size)
+
     # Alias for create_message
-    def add_message(self, conversation_id: str, role: str, content: str) -> dict:
+    def add_message(self, conversation_id: str, role: str, content: str, external_id: str = None) -> dict:
         """Add a message to a conversation (alias for create_message)."""
-        return self.create_message(conversation_id, role, content)
+        return self.create_message(conversation_id, role, content, external_id=external_id)
 
     # --- WhatsApp-specific Operations ---
 
@@ -220,14 +313,36 @@ class DatabaseService:
                 own.append(sb)
         return own
 
+    def iter_business_ids(self, page_size: int = 500) -> Iterator[str]:
+        """Yield the id of every business, one page at a time."""
+        last_id = None
+        while True:
+            query = self.client.table("businesses").select("id")
+            if last_id:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(page_size).execute().data or []
+            for row in rows:
+                yield row["id"]
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def get_only_business_id(self) -> Optional[str]:
+        """Get the id of the only business, or None if there are none or several."""
+        result = self.client.table("businesses").select("id").limit(2).execute()
+        rows = result.data or []
+        return rows[0]["id"] if len(rows) == 1 else None
+
     def get_business_by_whatsapp(self, whatsapp_number: str) -> Optional[dict]:
-        """
-        Get a business by its WhatsApp number.
-        For MVP, returns None as we haven't added whatsapp_number field yet.
-        """
-        # TODO: Add whatsapp_number field to businesses table
-        # For now, return None and let the webhook use the first business
-        return None
+        """Get a business by its WhatsApp number (unique index, see migration 017)."""
+        result = (
+            self.client.table("businesses")
+            .select("*")
+            .eq("whatsapp_number", whatsapp_number)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
 
     def get_or_create_whatsapp_conversation(self, business_id: str, visitor_id: str) -> dict:
         """
@@ -462,6 +577,96 @@ class DatabaseService:
         """Get all conversations for a business (alias for get_conversations_by_business)."""
         return self.get_conversations_by_business(business_id, limit=1000)
 
+    def iter_business_conversations(self, business_id: str, page_size: int = 500) -> Iterator[dict]:
+        """Yield every conversation of a business, oldest first, one page at a time."""
+        yield from self._keyset_scan("conversations", "business_id", business_id, "started_at", page_size)
+
+    def _keyset_scan(
+        self,
+        table: str,
+        key_column: str,
+        key_value: str,
+        order_column: str,
+        page_size: int,
+    ) -> Iterator[dict]:
+        """
+        Scan all rows of `table` matching `key_column = key_value` using keyset
+        pagination on (order_column, id). Unlike OFFSET paging, each page is an
+        index seek, so memory and per-page cost stay flat however many rows exist.
+        """
+        cursor = None
+        while True:
+            query = self.client.table(table).select("*").eq(key_column, key_value)
+            if cursor:
+                last_value, last_id = cursor
+                query = query.or_(
+                    f'{order_column}.gt."{last_value}",'
+                    f'and({order_column}.eq."{last_value}",id.gt.{last_id})'
+                )
+            result = query.order(order_column).order("id").limit(page_size).execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1][order_column], rows[-1]["id"])
+
+    # --- Analytics Operations ---
+
+    def get_analytics_summary(self, business_id: str, since: str) -> dict:
+        """
+        Get conversation, channel, rating and message totals for a business
+        in one aggregate query (see migration 013).
+        """
+        result = self.client.rpc(
+            "get_analytics_summary",
+            {"p_business_id": business_id, "p_since": since},
+        ).execute()
+        return result.data[0] if result.data else {}
+
+    def get_daily_stats(self, business_id: str, start_date: date, end_date: date) -> list[dict]:
+        """
+        Get the business_daily_stats rollup rows (one per UTC day and channel)
+        between two dates, inclusive (see migration 022).
+        Days without activity have no row.
+        """
+        result = (
+            self.client.table("business_daily_stats")
+            .select("day, channel, conversations, messages, user_messages, positive_ratings, negative_ratings, appointments")
+            .eq("business_id", business_id)
+            .gte("day", start_date.isoformat())
+            .lte("day", end_date.isoformat())
+            .order("day")
+            .execute()
+        )
+        return result.data or []
+
+    def reconcile_daily_stats(self, business_id: str, since: date) -> int:
+        """
+        Recompute a business's business_daily_stats rows from `since` onwards
+        from the source tables, correcting any drift in the trigger-maintained
+        counts. Runs in its own short transaction and doesn't block the
+        triggers (see migration 022).
+        Returns the number of rows that had to be corrected.
+        """
+        result = self.client.rpc(
+            "reconcile_business_daily_stats",
+            {"p_business_id": business_id, "p_since": since.isoformat()},
+        ).execute()
+        return result.data or 0
+
+    def get_dashboard_stats(self, business_id: str, now: datetime) -> dict:
+        """
+        Get the dashboard home counters in a single query (see migration 016).
+
+        Returns a dict with conversations_today, active_conversations,
+        appointments_today, satisfaction_rate (or None) and total_conversations.
+        """
+        result = self.client.rpc(
+            "get_dashboard_stats",
+            {"p_business_id": business_id, "p_now": now.isoformat()},
+        ).execute()
+        return result.data[0] if result.data else {}
+
     # --- Appointment Operations ---
 
     def create_appointment(
@@ -545,6 +750,19 @@ class DatabaseService:
         result = query.order("appointment_date", desc=False).order("appointment_time", desc=False).limit(limit).execute()
         return result.data or []
 
+    def get_booked_appointments(self, business_id: str, start_date: str, end_date: str) -> list[dict]:
+        """Get pending and confirmed appointments in a date range (used for slot availability)."""
+        result = (
+            self.client.table("appointments")
+            .select("appointment_date, appointment_time, duration_minutes")
+            .eq("business_id", business_id)
+            .in_("status", ["pending", "confirmed"])
+            .gte("appointment_date", start_date)
+            .lte("appointment_date", end_date)
+            .execute()
+        )
+        return result.data or []
+
     def get_appointments_by_phone(self, business_id: str, phone: str) -> list[dict]:
         """Get appointments for a customer by phone number."""
         result = (
@@ -647,6 +865,7 @@ class DatabaseService:
         status: str,
         error_message: Optional[str] = None,
         provider_id: Optional[str] = None,
+        latency_ms: Optional[int] = None,
     ) -> Optional[dict]:
         """Log a sent notification to the database."""
         data = {
@@ -661,6 +880,8 @@ class DatabaseService:
             data["error_message"] = error_message
         if provider_id:
             data["provider_id"] = provider_id
+        if latency_ms is not None:
+            data["latency_ms"] = latency_ms
         if status == "sent":
             data["sent_at"] = "now()"
 
@@ -686,6 +907,68 @@ class DatabaseService:
         result = query.order("created_at", desc=True).limit(limit).execute()
         return result.data or []
 
+    def get_due_reminders(self, now: datetime) -> list[dict]:
+        """
+        Get every appointment due a 24h or 1h reminder across all businesses
+        in a single query (see migration 014).
+
+        Reminders already logged as sent and reminder types disabled in the
+        business's notification settings are excluded server-side.
+        """
+        result = self.client.rpc(
+            "get_due_reminders",
+            {"p_now": now.isoformat()},
+        ).execute()
+        return result.data or []
+
+
+class AsyncDatabaseService:
+    """
+    Async variant of DatabaseService with the same method surface.
+
+    The Supabase client is synchronous, so each call is run on a dedicated
+    thread pool instead of the event loop. Route handlers simply await the
+    same methods they used to call directly:
+
+        business = await async_db.get_business(business_id)
+    """
+
+    def __init__(self, sync_db: DatabaseService, max_workers: int = 32):
+        self._db = sync_db
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="supabase",
+        )
+
+    @property
+    def client(self) -> Client:
+        """The underlying (synchronous) Supabase client, for building raw queries."""
+        return self._db.client
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the database thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def execute(self, query) -> Any:
+        """Execute a raw Supabase query builder without blocking the event loop."""
+        return await self.run(query.execute)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = attr.__doc__
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, method)
+        return method
+
 
-# Singleton instance
+# Singleton instances
 db = DatabaseService()
+async_db = AsyncDatabaseService(db, max_workers=settings.db_max_workers)
@@ -0,0 +1,93 @@
+"""
+Live events - in-process pub/sub for the live conversations dashboard.
+Message and takeover producers publish here; agents subscribe per business
+over Server-Sent Events (GET /api/live/{business_id}/events).
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+# Events buffered per subscriber before it is considered too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Seconds between keep-alive comments so proxies don't close idle streams
+KEEPALIVE_SECONDS = 15
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class LiveEventBroker:
+    """
+    Fans out live events to the agents watching a business.
+
+    Each subscriber gets a bounded queue. Publishing never blocks: a
+    subscriber whose queue is full is disconnected, and its dashboard
+    reconnects and reloads the conversation list.
+
+    Subscriptions live in this process only, so events published by one
+    worker reach only the agents connected to that worker.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def subscribe(self, business_id: str) -> asyncio.Queue:
+        """Register a new subscriber queue for a business."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(business_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, business_id: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber queue."""
+        queues = self._subscribers.get(business_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[business_id]
+
+    def publish(self, business_id: str, event: str, data: dict) -> None:
+        """Send an event to every agent watching the business."""
+        for queue in list(self._subscribers.get(business_id, ())):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Slow consumer - close its stream instead of buffering forever
+                self.unsubscribe(business_id, queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    def publish_message(self, business_id: str, conversation_id: str, message: dict) -> None:
+        """Publish a newly saved message."""
+        if message:
+            self.publish(business_id, "message", {"conversation_id": conversation_id, "message": message})
+
+    def subscriber_count(self, business_id: str) -> int:
+        """Number of agents currently watching a business."""
+        return len(self._subscribers.get(business_id, ()))
+
+    async def stream(self, business_id: str) -> AsyncIterator[str]:
+        """Yield SSE frames for a business until the client disconnects."""
+        queue = self.subscribe(business_id)
+        try:
+            yield sse_event("ready", {"business_id": business_id})
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                event, data = item
+                yield sse_event(event, data)
+        finally:
+            self.unsubscribe(business_id, queue)
+
+
+# Singleton instance
+live_events = LiveEventBroker()
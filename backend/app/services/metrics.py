@@ -0,0 +1,37 @@
+"""
+In-process counters for cache and fast-path tuning.
+Exposed at GET /metrics; values are per worker and reset on restart.
+"""
+
+from collections import defaultdict
+from threading import Lock
+
+
+class Metrics:
+    """Thread-safe named counters, grouped by feature."""
+
+    def __init__(self):
+        self._counters: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = Lock()
+
+    def incr(self, group: str, name: str, amount: int = 1) -> None:
+        """Increment a counter, e.g. incr("faq_fast_path", "hits")."""
+        with self._lock:
+            self._counters[group][name] += amount
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Copy of all counters. Groups that count "lookups" and "hits" also get
+        a derived "hit_rate".
+        """
+        with self._lock:
+            snapshot = {group: dict(counters) for group, counters in self._counters.items()}
+        for counters in snapshot.values():
+            lookups = counters.get("lookups")
+            if lookups:
+                counters["hit_rate"] = round(counters.get("hits", 0) / lookups, 4)
+        return snapshot
+
+
+# Singleton instance
+metrics = Metrics()
@@ -3,13 +3,18 @@ Notification Service - Main orchestrator for email and SMS notifications.
 Coordinates email and SMS services, manages settings, and logs notifications.
 """
 
-from typing import Optional, Literal
-from datetime import datetime
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, Literal
 
+from app.config import get_settings
 from app.services.email import get_email_service
 from app.services.sms import get_sms_service
 from app.services.database import db
 
+settings = get_settings()
+
 
 NotificationType = Literal["confirmation", "reminder_24h", "reminder_1h", "cancellation", "update"]
 NotificationChannel = Literal["email", "sms"]
@@ -19,11 +24,46 @@ class NotificationService:
     """
     Main notification service that coordinates email and SMS notifications.
     Handles settings retrieval, notification sending, and logging.
+
+    Email and SMS for a notification are sent concurrently on a bounded
+    channel pool. Request handlers should use `send_in_background()` so the
+    whole send runs on a separate bounded pool and never blocks the response.
     """
 
     def __init__(self):
         self.email_service = get_email_service()
         self.sms_service = get_sms_service()
+        # Two pools so a background send waiting on its channels can never
+        # starve the channel sends it is waiting on
+        self._background_pool = ThreadPoolExecutor(
+            max_workers=settings.notification_max_workers,
+            thread_name_prefix="notify",
+        )
+        self._channel_pool = ThreadPoolExecutor(
+            max_workers=settings.notification_max_workers * 2,
+            thread_name_prefix="notify-channel",
+        )
+
+    def send_in_background(self, send: Callable[..., dict], **kwargs) -> Future:
+        """
+        Run one of the send_* methods on the background pool.
+
+        Returns immediately; failures are printed, and per-channel outcomes
+        are recorded in notification_log as usual.
+        """
+        def run() -> dict:
+            try:
+                return send(**kwargs)
+            except Exception as e:
+                print(f"Failed to send notifications for {kwargs.get('appointment_id')}: {e}")
+                return {"email": None, "sms": None}
+
+        return self._background_pool.submit(run)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, optionally waiting for queued sends to finish."""
+        self._background_pool.shutdown(wait=wait)
+        self._channel_pool.shutdown(wait=wait)
 
     def send_appointment_confirmation(
         self,
@@ -49,8 +89,6 @@ class NotificationService:
         print(f"📧 Starting confirmation notification for appointment {appointment_id}")
         print(f"📧 Customer email: {customer_email}, phone: {customer_phone}")
 
-        results = {"email": None, "sms": None}
-
         # Get notification settings for this business
         settings = db.get_notification_settings(business_id)
         print(f"📧 Notification settings: {settings}")
@@ -67,13 +105,16 @@ class NotificationService:
         # Check if we should send confirmation
         if not settings.get("send_confirmation", True):
             print("📧 send_confirmation is disabled, skipping")
-            return results
+            return {"email": None, "sms": None}
+
+        deliveries = []
 
         # Send email if enabled and customer has email
         print(f"📧 Email enabled: {settings.get('email_enabled', True)}, has email: {bool(customer_email)}")
         if settings.get("email_enabled", True) and customer_email:
             print(f"📧 Sending confirmation email to {customer_email}")
-            email_result = self.email_service.send_confirmation_email(
+            deliveries.append(("email", customer_email, partial(
+                self.email_service.send_confirmation_email,
                 to_email=customer_email,
                 customer_name=customer_name,
                 business_name=business_name,
@@ -85,48 +126,22 @@ class NotificationService:
                 language=language,
                 from_name=settings.get("email_from_name"),
                 from_email=settings.get("email_from_address"),
-            )
-            print(f"📧 Email result: {email_result}")
-
-            results["email"] = email_result
-
-            # Log to database
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type="confirmation",
-                channel="email",
-                recipient=customer_email,
-                status="sent" if email_result.get("success") else "failed",
-                error_message=email_result.get("error"),
-                provider_id=email_result.get("message_id"),
-            )
+            )))
 
         # Send SMS if enabled
         if settings.get("sms_enabled", False):
-            sms_result = self.sms_service.send_confirmation_sms(
+            deliveries.append(("sms", customer_phone, partial(
+                self.sms_service.send_confirmation_sms,
                 to_phone=customer_phone,
                 business_name=business_name,
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
                 language=language,
                 from_phone=settings.get("twilio_phone_number"),
-            )
-
-            results["sms"] = sms_result
-
-            # Log to database
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type="confirmation",
-                channel="sms",
-                recipient=customer_phone,
-                status="sent" if sms_result.get("success") else "failed",
-                error_message=sms_result.get("error"),
-                provider_id=sms_result.get("message_id"),
-            )
+            )))
 
+        results = self._deliver(appointment_id, business_id, "confirmation", deliveries)
+        print(f"📧 Email result: {results['email']}")
         return results
 
     def send_appointment_reminder(
@@ -158,10 +173,12 @@ class NotificationService:
             return results
 
         notification_type = f"reminder_{hours_before}h"
+        deliveries = []
 
         # Send email reminder
         if settings.get("email_enabled") and customer_email:
-            email_result = self.email_service.send_reminder_email(
+            deliveries.append(("email", customer_email, partial(
+                self.email_service.send_reminder_email,
                 to_email=customer_email,
                 customer_name=customer_name,
                 business_name=business_name,
@@ -173,24 +190,12 @@ class NotificationService:
                 language=language,
                 from_name=settings.get("email_from_name"),
                 from_email=settings.get("email_from_address"),
-            )
-
-            results["email"] = email_result
-
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type=notification_type,
-                channel="email",
-                recipient=customer_email,
-                status="sent" if email_result.get("success") else "failed",
-                error_message=email_result.get("error"),
-                provider_id=email_result.get("message_id"),
-            )
+            )))
 
         # Send SMS reminder
         if settings.get("sms_enabled"):
-            sms_result = self.sms_service.send_reminder_sms(
+            deliveries.append(("sms", customer_phone, partial(
+                self.sms_service.send_reminder_sms,
                 to_phone=customer_phone,
                 business_name=business_name,
                 appointment_date=appointment_date,
@@ -198,22 +203,9 @@ class NotificationService:
                 hours_before=hours_before,
                 language=language,
                 from_phone=settings.get("twilio_phone_number"),
-            )
-
-            results["sms"] = sms_result
-
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type=notification_type,
-                channel="sms",
-                recipient=customer_phone,
-                status="sent" if sms_result.get("success") else "failed",
-                error_message=sms_result.get("error"),
-                provider_id=sms_result.get("message_id"),
-            )
+            )))
 
-        return results
+        return self._deliver(appointment_id, business_id, notification_type, deliveries)
 
     def send_appointment_cancellation(
         self,
@@ -228,15 +220,16 @@ class NotificationService:
         language: str = "fr",
     ) -> dict:
         """Send appointment cancellation notification via email and/or SMS."""
-        results = {"email": None, "sms": None}
-
         settings = db.get_notification_settings(business_id)
         if not settings or not settings.get("send_cancellation", True):
-            return results
+            return {"email": None, "sms": None}
+
+        deliveries = []
 
         # Send cancellation email
         if settings.get("email_enabled") and customer_email:
-            email_result = self.email_service.send_cancellation_email(
+            deliveries.append(("email", customer_email, partial(
+                self.email_service.send_cancellation_email,
                 to_email=customer_email,
                 customer_name=customer_name,
                 business_name=business_name,
@@ -245,46 +238,21 @@ class NotificationService:
                 language=language,
                 from_name=settings.get("email_from_name"),
                 from_email=settings.get("email_from_address"),
-            )
-
-            results["email"] = email_result
-
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type="cancellation",
-                channel="email",
-                recipient=customer_email,
-                status="sent" if email_result.get("success") else "failed",
-                error_message=email_result.get("error"),
-                provider_id=email_result.get("message_id"),
-            )
+            )))
 
         # Send cancellation SMS
         if settings.get("sms_enabled"):
-            sms_result = self.sms_service.send_cancellation_sms(
+            deliveries.append(("sms", customer_phone, partial(
+                self.sms_service.send_cancellation_sms,
                 to_phone=customer_phone,
                 business_name=business_name,
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
                 language=language,
                 from_phone=settings.get("twilio_phone_number"),
-            )
-
-            results["sms"] = sms_result
-
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type="cancellation",
-                channel="sms",
-                recipient=customer_phone,
-                status="sent" if sms_result.get("success") else "failed",
-                error_message=sms_result.get("error"),
-                provider_id=sms_result.get("message_id"),
-            )
+            )))
 
-        return results
+        return self._deliver(appointment_id, business_id, "cancellation", deliveries)
 
     def send_appointment_update(
         self,
@@ -302,15 +270,16 @@ class NotificationService:
         language: str = "fr",
     ) -> dict:
         """Send appointment update/reschedule notification via email and/or SMS."""
-        results = {"email": None, "sms": None}
-
         settings = db.get_notification_settings(business_id)
         if not settings or not settings.get("send_update", True):
-            return results
+            return {"email": None, "sms": None}
+
+        deliveries = []
 
         # Send update email
         if settings.get("email_enabled") and customer_email:
-            email_result = self.email_service.send_update_email(
+            deliveries.append(("email", customer_email, partial(
+                self.email_service.send_update_email,
                 to_email=customer_email,
                 customer_name=customer_name,
                 business_name=business_name,
@@ -322,47 +291,75 @@ class NotificationService:
                 language=language,
                 from_name=settings.get("email_from_name"),
                 from_email=settings.get("email_from_address"),
-            )
-
-            results["email"] = email_result
-
-            self._log_notification(
-                appointment_id=appointment_id,
-                business_id=business_id,
-                notification_type="update",
-                channel="email",
-                recipient=customer_email,
-                status="sent" if email_result.get("success") else "failed",
-                error_message=email_result.get("error"),
-                provider_id=email_result.get("message_id"),
-            )
+            )))
 
         # Send update SMS
         if settings.get("sms_enabled"):
-            sms_result = self.sms_service.send_update_sms(
+            deliveries.append(("sms", customer_phone, partial(
+                self.sms_service.send_update_sms,
                 to_phone=customer_phone,
                 business_name=business_name,
                 new_date=new_date,
                 new_time=new_time,
                 language=language,
                 from_phone=settings.get("twilio_phone_number"),
-            )
+            )))
+
+        return self._deliver(appointment_id, business_id, "update", deliveries)
+
+    def _deliver(
+        self,
+        appointment_id: str,
+        business_id: str,
+        notification_type: NotificationType,
+        deliveries: list[tuple[NotificationChannel, str, Callable[[], dict]]],
+    ) -> dict:
+        """
+        Send all channels of a notification concurrently and log each one.
 
-            results["sms"] = sms_result
+        Args:
+            deliveries: (channel, recipient, send) tuples, where send() returns
+                the provider result dict ('success', 'message_id', 'error')
+
+        Returns:
+            dict with 'email' and 'sms' keys containing send results
+        """
+        results = {"email": None, "sms": None}
+        pending = [
+            (channel, recipient, self._channel_pool.submit(self._timed_send, send))
+            for channel, recipient, send in deliveries
+        ]
+
+        for channel, recipient, future in pending:
+            result, latency_ms = future.result()
+            results[channel] = result
+            print(f"📨 {notification_type} {channel} to {recipient}: "
+                  f"{'sent' if result.get('success') else 'failed'} in {latency_ms}ms")
 
             self._log_notification(
                 appointment_id=appointment_id,
                 business_id=business_id,
-                notification_type="update",
-                channel="sms",
-                recipient=customer_phone,
-                status="sent" if sms_result.get("success") else "failed",
-                error_message=sms_result.get("error"),
-                provider_id=sms_result.get("message_id"),
+                notification_type=notification_type,
+                channel=channel,
+                recipient=recipient,
+                status="sent" if result.get("success") else "failed",
+                error_message=result.get("error"),
+                provider_id=result.get("message_id"),
+                latency_ms=latency_ms,
             )
 
         return results
 
+    @staticmethod
+    def _timed_send(send: Callable[[], dict]) -> tuple[dict, int]:
+        """Run a provider call, returning its result and latency in milliseconds."""
+        started = time.perf_counter()
+        try:
+            result = send()
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        return result, int((time.perf_counter() - started) * 1000)
+
     def _log_notification(
         self,
         appointment_id: str,
@@ -373,6 +370,7 @@ class NotificationService:
         status: str,
         error_message: Optional[str] = None,
         provider_id: Optional[str] = None,
+        latency_ms: Optional[int] = None,
     ) -> None:
         """Log notification to database."""
         try:
@@ -385,6 +383,7 @@ class NotificationService:
                 status=status,
                 error_message=error_message,
                 provider_id=provider_id,
+                latency_ms=latency_ms,
             )
         except Exception as e:
             print(f"Failed to log notification: {e}")
@@ -399,3 +398,9 @@ def get_notification_service() -> NotificationService:
     if _notification_service is None:
         _notification_service = NotificationService()
     return _notification_service
+
+
+def shutdown_notification_service():
+    """Wait for queued notifications to go out (called on shutdown)."""
+    if _notification_service is not None:
+        _notification_service.shutdown(wait=True)
@@ -0,0 +1,83 @@
+"""
+Response cache - reuses AI replies to context-free questions.
+Visitors across a business ask the same opening questions ("what are your
+hours", "prix ?"); a reply generated once is served from memory until the
+business's prompt or config changes.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+from app.config import get_settings
+from app.services.cache import TTLCache
+from app.services.metrics import metrics
+from app.services.text import normalize_text
+
+settings = get_settings()
+
+
+class ResponseCache:
+    """
+    Per-business cache of AI replies, keyed by the normalized question plus a
+    digest of everything sent to the model before it (system prompt, retrieved
+    knowledge, welcome message) and a per-business config version.
+
+    Only turns whose single user message is the latest one are cached, so the
+    reply cannot depend on earlier exchanges. Hits, misses and lookups are
+    counted under "response_cache" in GET /metrics.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._versions: dict[str, int] = {}
+
+    def key(self, business_id: Optional[str], groq_messages: list[dict], model: str) -> Optional[tuple]:
+        """
+        Cache key for a chat request, or None if the reply depends on the
+        conversation (earlier user messages, images) and must not be cached.
+        """
+        if not business_id or not groq_messages:
+            return None
+        question = groq_messages[-1]
+        if question["role"] != "user" or not isinstance(question["content"], str):
+            return None
+        if any(m["role"] == "user" for m in groq_messages[:-1]):
+            return None
+        text = normalize_text(question["content"])
+        if not text:
+            return None
+
+        digest = hashlib.sha256(
+            json.dumps([model, groq_messages[:-1]], ensure_ascii=False, sort_keys=True).encode()
+        ).hexdigest()
+        return (business_id, self._versions.get(business_id, 0), digest, text)
+
+    def get(self, key: Optional[tuple]) -> Optional[str]:
+        """Return the cached reply for a key from key(), counting the hit or miss."""
+        if key is None:
+            return None
+        reply = self._entries.get(key)
+        metrics.incr("response_cache", "lookups")
+        metrics.incr("response_cache", "hits" if reply is not None else "misses")
+        return reply
+
+    def set(self, key: Optional[tuple], reply: str) -> None:
+        """Store a generated reply."""
+        if key is not None:
+            self._entries.set(key, reply)
+
+    def invalidate(self, business_id: str) -> None:
+        """
+        Stop serving a business's cached replies (call after any config change).
+        Old entries become unreachable and age out of the LRU.
+        """
+        self._versions[business_id] = self._versions.get(business_id, 0) + 1
+        metrics.incr("response_cache", "invalidations")
+
+
+# Singleton instance
+response_cache = ResponseCache(
+    max_size=settings.response_cache_max_size,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+)
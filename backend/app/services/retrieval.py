@@ -0,0 +1,154 @@
+"""
+Knowledge retrieval - BM25 index over a business's FAQs and products.
+Lets chat turns send only the entries relevant to the customer's message
+instead of the whole catalog. Also matches messages that restate a
+configured FAQ so they can be answered without the LLM.
+"""
+
+import math
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Optional
+
+from app.services.ai import format_faqs, format_products
+from app.services.text import normalize_text, tokenize
+
+# Catalogs up to this many entries are still sent in full with the system prompt
+RETRIEVAL_MIN_ENTRIES = 12
+
+# Entries of each kind included per turn when retrieval is active
+TOP_K_FAQS = 4
+TOP_K_PRODUCTS = 5
+
+# FAQ matches scoring below this are not refined with the (slower) character
+# comparison, so reported scores are exact only from here up
+FAQ_MATCH_FLOOR = 0.5
+
+
+class BM25Index:
+    """Okapi BM25 over a small in-memory document collection."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_freqs = [Counter(tokenize(doc)) for doc in documents]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+        doc_freqs = Counter()
+        for tf in self._term_freqs:
+            doc_freqs.update(tf.keys())
+        n = len(documents)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Return up to k (document index, score) pairs with a positive score, best first."""
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        if not terms:
+            return []
+
+        scores = []
+        for i, tf in enumerate(self._term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((i, score))
+
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:k]
+
+
+class KnowledgeIndex:
+    """
+    Retrieval index for one business's FAQs and products.
+
+    Small catalogs are left in the system prompt (`enabled` is False); larger
+    ones are searched per message and only the top matches are sent.
+    """
+
+    def __init__(self, faqs: list[dict], products: list[dict]):
+        self.faqs = faqs or []
+        self.products = products or []
+        self.enabled = len(self.faqs) + len(self.products) > RETRIEVAL_MIN_ENTRIES
+        if self.enabled:
+            self._faq_index = BM25Index([f"{f['question']} {f['question']} {f['answer']}" for f in self.faqs])
+            self._product_index = BM25Index([
+                f"{p['name']} {p['name']} {p.get('description', '')} {p.get('price') or ''}"
+                for p in self.products
+            ])
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "KnowledgeIndex":
+        """Build the index from a business_configs row."""
+        config = config or {}
+        return cls(config.get("faqs") or [], config.get("products") or [])
+
+    def search(self, query: str) -> tuple[list[dict], list[dict]]:
+        """Get the FAQs and products most relevant to a query."""
+        faqs = [self.faqs[i] for i, _ in self._faq_index.search(query, TOP_K_FAQS)]
+        products = [self.products[i] for i, _ in self._product_index.search(query, TOP_K_PRODUCTS)]
+        return faqs, products
+
+    def render(self, query: str) -> Optional[str]:
+        """
+        Format the entries relevant to `query` for the prompt.
+        Returns None when retrieval is disabled or nothing matches.
+        """
+        if not self.enabled:
+            return None
+        faqs, products = self.search(query)
+        text = (format_faqs(faqs) + format_products(products)).strip()
+        return text or None
+
+
+class FAQMatcher:
+    """
+    Finds the FAQ a customer message restates, e.g. "opening hours?" for
+    "What are your opening hours?".
+
+    Each question is scored with the best of two measures on normalized
+    text: term overlap (Jaccard over the tokenize() terms) and character
+    similarity (difflib ratio), which tolerates typos and word order.
+    Matching a message against a few dozen FAQs takes well under a millisecond.
+    """
+
+    def __init__(self, faqs: list[dict]):
+        self._entries = [
+            (normalize_text(f["question"]), set(tokenize(f["question"])), f)
+            for f in faqs or []
+            if f.get("question") and f.get("answer")
+        ]
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "FAQMatcher":
+        """Build the matcher from a business_configs row."""
+        return cls((config or {}).get("faqs") or [])
+
+    def match(self, message: str) -> tuple[Optional[dict], float]:
+        """Return the closest FAQ and its confidence (0-1), or (None, 0.0)."""
+        text = normalize_text(message)
+        if not text or not self._entries:
+            return None, 0.0
+        terms = set(tokenize(message))
+
+        best, best_score = None, 0.0
+        for question, question_terms, faq in self._entries:
+            score = 0.0
+            if terms and question_terms:
+                score = len(terms & question_terms) / len(terms | question_terms)
+            matcher = SequenceMatcher(None, text, question)
+            # real_quick_ratio and quick_ratio are cheap upper bounds on ratio,
+            # so skip the full comparison when it can't win
+            floor = max(score, best_score, FAQ_MATCH_FLOOR)
+            if matcher.real_quick_ratio() > floor and matcher.quick_ratio() > floor:
+                score = max(score, matcher.ratio())
+            if score > best_score:
+                best, best_score = faq, score
+        return best, best_score
@@ -1,19 +1,23 @@
 """
 Scheduler Service - Background job scheduler for appointment reminders.
-Uses APScheduler to run periodic checks and send reminders.
+Uses APScheduler to run periodic checks and send reminders, and to
+reconcile the daily stats rollup.
 """
 
 import os
 from datetime import datetime, timedelta
-from typing import Optional
 import pytz
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.services.database import db
 from app.services.notifications import get_notification_service
 
+# Trailing UTC days of business_daily_stats recomputed by the nightly reconcile
+STATS_RECONCILE_DAYS = 7
+
 
 class ReminderScheduler:
     """
@@ -41,6 +45,15 @@ class ReminderScheduler:
             replace_existing=True,
         )
 
+        # Correct drift in the trigger-maintained daily stats once a night
+        self.scheduler.add_job(
+            self._reconcile_daily_stats,
+            trigger=CronTrigger(hour=3, minute=30, timezone=pytz.UTC),
+            id="daily_stats_reconcile",
+            name="Reconcile business daily stats",
+            replace_existing=True,
+        )
+
         self.scheduler.start()
         print("Reminder scheduler started - checking every 15 minutes")
 
@@ -54,204 +67,72 @@ class ReminderScheduler:
         """
         Check for appointments that need reminders and send them.
         Called every 15 minutes by the scheduler.
+
+        Due reminders for all businesses are selected in a single query
+        (windowed on appointment start, joined with notification settings and
+        excluding reminders already sent), so a tick costs one round-trip plus
+        one send per due reminder.
         """
         try:
             now = datetime.now(pytz.UTC)
-
-            # Get all businesses
-            businesses = db.get_all_businesses()
-
-            for business in businesses:
-                business_id = business["id"]
-                business_name = business["name"]
-                language = business.get("language", "fr")
-
-                # Get notification settings
-                settings = db.get_notification_settings(business_id)
-                if not settings:
-                    continue
-
-                # Check 24-hour reminders
-                if settings.get("send_reminder_24h", True):
-                    self._send_24h_reminders(
-                        business_id=business_id,
-                        business_name=business_name,
-                        language=language,
-                        now=now,
-                    )
-
-                # Check 1-hour reminders
-                if settings.get("send_reminder_1h", False):
-                    self._send_1h_reminders(
-                        business_id=business_id,
-                        business_name=business_name,
-                        language=language,
-                        now=now,
-                    )
-
+            due_reminders = db.get_due_reminders(now)
         except Exception as e:
             print(f"Error in reminder check: {e}")
+            return
 
-    def _send_24h_reminders(
-        self,
-        business_id: str,
-        business_name: str,
-        language: str,
-        now: datetime,
-    ):
-        """Send 24-hour reminders for appointments tomorrow."""
-        try:
-            # Calculate tomorrow's date range (23-25 hours from now)
-            tomorrow_start = now + timedelta(hours=23)
-            tomorrow_end = now + timedelta(hours=25)
-
-            # Get appointments for tomorrow
-            start_date = tomorrow_start.strftime("%Y-%m-%d")
-            end_date = tomorrow_end.strftime("%Y-%m-%d")
-
-            appointments = db.get_appointments_by_business(
-                business_id=business_id,
-                start_date=start_date,
-                end_date=end_date,
-            )
-
-            for appt in appointments:
-                # Skip if already cancelled or completed
-                if appt.get("status") in ["cancelled", "completed", "no_show"]:
-                    continue
-
-                # Check if we already sent a 24h reminder for this appointment
-                logs = db.get_notification_logs(business_id, appt["id"])
-                already_sent = any(
-                    log.get("type") == "reminder_24h" and log.get("status") == "sent"
-                    for log in logs
-                )
-
-                if already_sent:
-                    continue
-
-                # Check if appointment is actually ~24 hours away
-                appt_datetime = self._parse_appointment_datetime(
-                    appt["appointment_date"],
-                    appt["appointment_time"],
-                )
-                if not appt_datetime:
-                    continue
+        for reminder in due_reminders:
+            self._send_reminder(reminder)
 
-                hours_until = (appt_datetime - now).total_seconds() / 3600
-                if not (23 <= hours_until <= 25):
-                    continue
+    def _reconcile_daily_stats(self):
+        """
+        Recompute the last STATS_RECONCILE_DAYS days of business_daily_stats
+        from the source tables. The triggers keep the rollup current; this
+        catches anything they miss (e.g. rows removed by cascading deletes).
 
-                # Send reminder
+        Businesses are reconciled one at a time, each in its own short
+        transaction, so chat and WhatsApp writes are never held up.
+        """
+        since = datetime.now(pytz.UTC).date() - timedelta(days=STATS_RECONCILE_DAYS - 1)
+        checked = corrected = 0
+        try:
+            for business_id in db.iter_business_ids():
                 try:
-                    self.notification_service.send_appointment_reminder(
-                        appointment_id=appt["id"],
-                        business_id=business_id,
-                        customer_name=appt["customer_name"],
-                        customer_email=appt.get("customer_email"),
-                        customer_phone=appt["customer_phone"],
-                        business_name=business_name,
-                        appointment_date=appt["appointment_date"],
-                        appointment_time=appt["appointment_time"],
-                        duration_minutes=appt.get("duration_minutes", 60),
-                        service_type=appt.get("service_type"),
-                        hours_before=24,
-                        language=language,
-                    )
-                    print(f"Sent 24h reminder for appointment {appt['id']}")
+                    rows = db.reconcile_daily_stats(business_id, since)
                 except Exception as e:
-                    print(f"Failed to send 24h reminder for {appt['id']}: {e}")
-
+                    print(f"Error reconciling daily stats for business {business_id}: {e}")
+                    continue
+                checked += 1
+                if rows:
+                    corrected += rows
+                    print(f"⚠️ Daily stats drift for business {business_id}: corrected {rows} rows since {since}")
         except Exception as e:
-            print(f"Error sending 24h reminders for business {business_id}: {e}")
+            print(f"Error reconciling daily stats: {e}")
+            return
 
-    def _send_1h_reminders(
-        self,
-        business_id: str,
-        business_name: str,
-        language: str,
-        now: datetime,
-    ):
-        """Send 1-hour reminders for appointments soon."""
-        try:
-            # Calculate 1-hour window (45 min to 75 min from now)
-            soon_start = now + timedelta(minutes=45)
-            soon_end = now + timedelta(minutes=75)
+        print(f"Daily stats reconciled for {checked} businesses since {since} - {corrected} rows corrected")
 
-            # Get today's appointments
-            today = now.strftime("%Y-%m-%d")
-            appointments = db.get_appointments_by_business(
-                business_id=business_id,
-                start_date=today,
-                end_date=today,
+    def _send_reminder(self, reminder: dict):
+        """Send one reminder row returned by get_due_reminders."""
+        appointment_id = reminder["appointment_id"]
+        label = "24h" if reminder["reminder_type"] == "reminder_24h" else "1h"
+        try:
+            self.notification_service.send_appointment_reminder(
+                appointment_id=appointment_id,
+                business_id=reminder["business_id"],
+                customer_name=reminder["customer_name"],
+                customer_email=reminder.get("customer_email"),
+                customer_phone=reminder["customer_phone"],
+                business_name=reminder["business_name"],
+                appointment_date=reminder["appointment_date"],
+                appointment_time=reminder["appointment_time"],
+                duration_minutes=reminder.get("duration_minutes") or 60,
+                service_type=reminder.get("service_type"),
+                hours_before=reminder["hours_before"],
+                language=reminder.get("language") or "fr",
             )
-
-            for appt in appointments:
-                # Skip if already cancelled or completed
-                if appt.get("status") in ["cancelled", "completed", "no_show"]:
-                    continue
-
-                # Check if we already sent a 1h reminder
-                logs = db.get_notification_logs(business_id, appt["id"])
-                already_sent = any(
-                    log.get("type") == "reminder_1h" and log.get("status") == "sent"
-                    for log in logs
-                )
-
-                if already_sent:
-                    continue
-
-                # Check if appointment is actually ~1 hour away
-                appt_datetime = self._parse_appointment_datetime(
-                    appt["appointment_date"],
-                    appt["appointment_time"],
-                )
-                if not appt_datetime:
-                    continue
-
-                minutes_until = (appt_datetime - now).total_seconds() / 60
-                if not (45 <= minutes_until <= 75):
-                    continue
-
-                # Send reminder
-                try:
-                    self.notification_service.send_appointment_reminder(
-                        appointment_id=appt["id"],
-                        business_id=business_id,
-                        customer_name=appt["customer_name"],
-                        customer_email=appt.get("customer_email"),
-                        customer_phone=appt["customer_phone"],
-                        business_name=business_name,
-                        appointment_date=appt["appointment_date"],
-                        appointment_time=appt["appointment_time"],
-                        duration_minutes=appt.get("duration_minutes", 60),
-                        service_type=appt.get("service_type"),
-                        hours_before=1,
-                        language=language,
-                    )
-                    print(f"Sent 1h reminder for appointment {appt['id']}")
-                except Exception as e:
-                    print(f"Failed to send 1h reminder for {appt['id']}: {e}")
-
+            print(f"Sent {label} reminder for appointment {appointment_id}")
         except Exception as e:
-            print(f"Error sending 1h reminders for business {business_id}: {e}")
-
-    def _parse_appointment_datetime(
-        self,
-        date_str: str,
-        time_str: str,
-    ) -> Optional[datetime]:
-        """Parse appointment date and time into a datetime object."""
-        try:
-            # Handle time format with or without seconds
-            if len(time_str) == 5:  # HH:MM
-                time_str = f"{time_str}:00"
-
-            dt_str = f"{date_str} {time_str}"
-            dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-            return pytz.UTC.localize(dt)
-        except Exception:
-            return None
+            print(f"Failed to send {label} reminder for {appointment_id}: {e}")
 
 
 # Singleton instance
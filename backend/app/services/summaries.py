@@ -0,0 +1,53 @@
+"""
+Rolling conversation summaries.
+Keeps prompts bounded for long conversations: once messages fall out of the
+history window they are folded, a batch at a time, into a summary stored on
+the conversation, which is sent to the model ahead of the recent messages.
+"""
+
+from functools import partial
+
+from app.services.ai import HISTORY_WINDOW, SUMMARY_BATCH, get_ai_service
+from app.services.conversation_queue import conversation_queue
+from app.services.database import async_db
+
+# Upper bound on messages folded in one summarization call
+SUMMARY_MAX_FOLD = 40
+
+
+async def update_conversation_summary(conversation_id: str, window_start: str, language: str) -> None:
+    """
+    Fold messages older than `window_start` that aren't summarized yet into
+    the conversation summary, once at least SUMMARY_BATCH of them pile up.
+    """
+    conversation = await async_db.get_conversation(conversation_id)
+    if not conversation:
+        return
+
+    pending = await async_db.get_messages_between(
+        conversation_id,
+        after=conversation.get("summarized_until"),
+        before=window_start,
+        limit=SUMMARY_MAX_FOLD,
+    )
+    if len(pending) < SUMMARY_BATCH:
+        return
+
+    summary = await get_ai_service().summarize_async(conversation.get("summary"), pending, language)
+    await async_db.update_conversation_summary(conversation_id, summary, pending[-1]["created_at"])
+    print(f"📝 Summarized {len(pending)} messages of conversation {conversation_id}")
+
+
+def schedule_summary_update(conversation_id: str, window: list[dict], language: str) -> None:
+    """
+    Queue a summary update after a turn, if the history window is full.
+
+    Args:
+        window: The message rows (with created_at) sent to the model, oldest first
+    """
+    if len(window) < HISTORY_WINDOW:
+        return
+    conversation_queue.enqueue(
+        conversation_id,
+        partial(update_conversation_summary, conversation_id, window[0]["created_at"], language),
+    )
@@ -0,0 +1,32 @@
+"""
+Text normalization shared by FAQ/product retrieval and the response cache.
+"""
+
+import re
+import unicodedata
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it me my of on or our the this to
+we what when where which who why with you your
+au aux avec ce ces dans de des du elle en est et il je la le les leur lui ma mais me mes
+moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton
+tu un une vos votre vous
+""".split())
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, strip accents and split into terms, dropping stopwords."""
+    return [t for t in _TOKEN_RE.findall(_fold(text)) if t not in STOPWORDS and len(t) > 1]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    return " ".join(_TOKEN_RE.findall(_fold(text)))
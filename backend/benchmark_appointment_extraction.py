@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the appointment info extractor.
+
+Replays a corpus of FR/EN booking conversations turn by turn, the way the
+chat endpoint calls extract_appointment_info on every booking-flow turn, and
+compares the precompiled single-pass extractor against the previous
+implementation (kept below as the reference). Exits non-zero if any result
+differs from the reference, the memoized speedup drops below --min-speedup
+or the cold (precompiled patterns only) speedup drops below
+--min-cold-speedup.
+
+Usage:
+    python benchmark_appointment_extraction.py [--rounds 200] [--min-speedup 1.5] [--min-cold-speedup 1.2]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.appointment_extraction import extract_appointment_info, scan_message
+
+SLOTS = [
+    {"date": "2026-02-05", "time": "11:30", "display_date": "Thursday 05 February"},
+    {"date": "2026-02-05", "time": "14:00", "display_date": "Thursday 05 February"},
+    {"date": "2026-02-06", "time": "09:00", "display_date": "Friday 06 February"},
+]
+
+CONVERSATIONS = [
+    # English - details spread over several messages
+    [
+        "Hi, I'd like to book an appointment",
+        "My name is James Carter",
+        "james.carter@example.com",
+        "tomorrow at 2:30pm please",
+    ],
+    # English - everything in one message, comma separated
+    [
+        "Can I schedule a haircut?",
+        "Jude Sean, jude.sean@example.com, +237 677889900",
+        "Thursday 05 February at 11:30",
+    ],
+    # English - slot picked by number
+    [
+        "I need an appointment for a consultation",
+        "I'm Sarah Lee",
+        "sarah@example.org",
+        "option 2",
+    ],
+    # English - name on its own line before the email
+    [
+        "booking please",
+        "Bambo\nbambo@example.com",
+        "friday 10am",
+    ],
+    # English - explicit date and 12h clock
+    [
+        "Do you have availability next week?",
+        "name: Michael",
+        "michael.b@example.com 5551234567",
+        "2026-02-10 at 12:15am",
+    ],
+    # English - greeting that must not be taken as a name
+    [
+        "Hi Raven, can I book a slot?",
+        "Hello my name is Anna Smith",
+        "anna.smith@example.com",
+        "the first one",
+    ],
+    # French - details spread over several messages
+    [
+        "Bonjour, je voudrais prendre un rendez-vous",
+        "Je m'appelle Marie Dubois",
+        "marie.dubois@example.fr",
+        "demain à 14h30",
+    ],
+    # French - weekday and simple hour
+    [
+        "Je souhaite réserver pour une coupe",
+        "mon nom est Paul Martin",
+        "paul.martin@example.fr, 699887766",
+        "mardi vers 15 heures",
+    ],
+    # French - slot picked by display text
+    [
+        "rdv svp",
+        "Claire Petit, claire.petit@example.fr",
+        "Friday 06 February à 09:00",
+    ],
+    # French - explicit date, DD/MM/YYYY
+    [
+        "Avez-vous des disponibilités ?",
+        "je suis Luc Bernard",
+        "luc@example.com",
+        "le 12/03/2026 à 10h00",
+    ],
+    # French - slot by ordinal, phone labeled
+    [
+        "Je veux un rendez-vous",
+        "nom: Sophie",
+        "sophie@example.fr tel: 0612345678",
+        "la deuxième",
+    ],
+    # Mixed - bare slot number only
+    [
+        "2",
+    ],
+]
+
+
+def legacy_extract_appointment_info(messages: list[dict], available_slots: list[dict] = None) -> dict:
+    """Previous implementation (regexes rebuilt per call, several passes), kept as the reference."""
+    import re
+    from datetime import datetime, timedelta
+
+    info = {
+        "name": None,
+        "phone": None,
+        "email": None,
+        "date": None,
+        "time": None,
+        "service": None,
+        "notes": None,
+    }
+
+    # Search all user messages in the conversation; the loop below iterates
+    # newest-first so the most recent value for each field wins automatically.
+    user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
+    conversation_text = " ".join(user_messages)
+
+    # Check for slot selection
+    # NEW: Check if message matches any slot's display text exactly (e.g., "Thursday 05 February at 11:30")
+    if available_slots:
+        slot_selected = False
+
+        # First, try to match the message against slot display strings
+        for i, slot in enumerate(available_slots):
+            # Build display strings from slot data (same format as chat.py response_slots)
+            display_en = f"{slot['display_date']} at {slot['time']}"
+            display_fr = f"{slot['display_date']} à {slot['time']}"
+
+            # Check both English and French formats
+            if display_en.lower() in conversation_text.lower() or display_fr.lower() in conversation_text.lower():
+                info["date"] = slot["date"]
+                info["time"] = slot["time"]
+                slot_selected = True
+                break
+
+        # Fallback: Check for old-style slot number selection (e.g., "slot 1", "option 2")
+        if not slot_selected:
+            slot_patterns = [
+                r"(?:slot|option|créneau|creneau|choice|choix)\s*#?\s*(\d+)",  # slot 1, option #2
+                r"(?:the\s+)?(?:first|1st|premier|première)\s*(?:one|slot|option)?",  # the first one
+                r"(?:the\s+)?(?:second|2nd|deuxième|deuxieme)\s*(?:one|slot|option)?",  # the second
+                r"(?:the\s+)?(?:third|3rd|troisième|troisieme)\s*(?:one|slot|option)?",  # the third
+                r"(?:number|numéro|numero|#)\s*(\d+)",  # number 1, #2
+                # Only match bare number if it's the ONLY content (not followed by time indicators)
+                r"^(\d+)$",  # Just a number, nothing else (e.g., "2")
+            ]
+
+            for pattern in slot_patterns:
+                match = re.search(pattern, conversation_text, re.IGNORECASE)
+                if match:
+                    slot_num = None
+                    if match.groups() and match.group(1):
+                        try:
+                            slot_num = int(match.group(1))
+                        except (ValueError, IndexError):
+                            continue
+                    elif "first" in pattern or "1st" in pattern or "premier" in pattern:
+                        slot_num = 1
+                    elif "second" in pattern or "2nd" in pattern or "deuxième" in pattern:
+                        slot_num = 2
+                    elif "third" in pattern or "3rd" in pattern or "troisième" in pattern:
+                        slot_num = 3
+
+                    # Validate slot number: must be >= 1 and <= available slots
+                    if slot_num and slot_num >= 1 and slot_num <= len(available_slots):
+                        selected_slot = available_slots[slot_num - 1]
+                        info["date"] = selected_slot["date"]
+                        info["time"] = selected_slot["time"]
+                        break
+
+    # Search from NEWEST to oldest for ALL fields
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    phone_patterns = [
+        r'\+\d{1,4}\s*\d{6,14}',  # International format +XX XXXXXXXXX
+        r'\+237\s*[6-9]\d{8}',  # Cameroon +237 format
+        r'\b[6-9]\d{8}\b',  # 9-digit format starting with 6-9
+        r'\b\d{10}\b',  # 10-digit format (US, etc.)
+        r'(?:number|phone|tel|num)[\s:]*(\d{7,15})',  # Labeled phone numbers
+    ]
+    # More flexible name patterns including typos like "my is X", "hi my is X"
+    # IMPORTANT: Patterns must NOT match greetings like "Hi Raven"
+    greeting_blacklist = r"(?!Hi\s|Hello\s|Hey\s|Bonjour\s|Salut\s)"  # Negative lookahead for greetings
+
+    name_patterns = [
+        r"(?:je m'appelle|mon nom est|je suis)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s|$|,|\.)",
+        r"(?:my name is|I am|I'm|my is|hi my is|hi i'm|hi i am)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s|$|,|\.)",
+        r"(?:name|nom)[:;]?\s*([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\n|$|\s|,|\.)",  # "Name James" or "name: James"
+        r"^(?:hi|hello|hey)\s+(?:my is|i'm|i am)\s+([a-zA-Z]+)(?:\s|$|,|\.)",  # "Hi my is Sean"
+        r"\bname\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b",  # "Name James" or "Name James Smith"
+        # NEW: Single name (any case) followed by comma and newline, then email/phone
+        rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?),\s*\n\s*[\w.+-]+@",  # name, \n email (not greeting)
+        rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?),\s*\n\s*\+?\d{{6,}}",  # name, \n phone (not greeting)
+        # Single name followed by newline and then email/phone (e.g., "Bambo\nemail@example.com")
+        rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?)\s*\n\s*[\w.+-]+@",  # Name followed by newline then email (not greeting)
+        rf"^{greeting_blacklist}([a-zA-Z]+(?:\s+[a-zA-Z]+)?)\s*\n\s*\+?\d{{6,}}",  # Name followed by newline then phone (not greeting)
+        # Comma-separated names - TWO WORDS like "Jude Sean, email@example.com"
+        # Use negative lookahead to exclude greetings
+        rf"^{greeting_blacklist}([A-Z][a-z]+\s+[A-Z][a-z]+),\s*[\w.+-]+@",  # Two-word name before comma + email (not greeting)
+        rf"^{greeting_blacklist}([A-Z][a-z]+\s+[A-Z][a-z]+),\s*\+?\d{{6,}}",  # Two-word name before comma + phone (not greeting)
+        rf"^{greeting_blacklist}([A-Z][a-z]+\s+[A-Z][a-z]+),",  # Two-word name at start before comma (not greeting)
+        r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+)\s*$",  # Two-word name after comma at end
+        r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),\s*[\w.+-]+@",  # ..., Two-word Name, email@...
+        r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),\s*\+?\d{6,}",  # ..., Two-word Name, phone...
+        r",\s*([A-Z][a-z]+\s+[A-Z][a-z]+),",  # ..., Two-word Name, ... (between commas)
+        # Comma-separated names - SINGLE WORD like "Jamesborn, email@example.com"
+        rf"^{greeting_blacklist}([A-Z][a-z]{{2,}}),\s*[\w.+-]+@",  # Single name before comma + email (not greeting)
+        rf"^{greeting_blacklist}([A-Z][a-z]{{2,}}),\s*\+?\d{{6,}}",  # Single name before comma + phone (not greeting)
+        r",\s*([A-Z][a-z]{2,}),\s*[\w.+-]+@",  # ..., Single Name, email@...
+        r",\s*([A-Z][a-z]{2,}),\s*\+?\d{6,}",  # ..., Single Name, phone...
+    ]
+
+    # Search from newest to oldest
+    for msg in reversed(user_messages):
+        # Extract email from this message if not found yet
+        if not info["email"]:
+            email_match = re.search(email_pattern, msg)
+            if email_match:
+                info["email"] = email_match.group()
+
+        # Extract phone from this message if not found yet
+        if not info["phone"]:
+            for pattern in phone_patterns:
+                phone_match = re.search(pattern, msg)
+                if phone_match:
+                    # Use group(1) if available (for patterns with capturing groups), else group()
+                    try:
+                        info["phone"] = phone_match.group(1).strip()
+                    except IndexError:
+                        info["phone"] = phone_match.group().strip()
+                    break
+
+        # Extract name from this message if not found yet
+        if not info["name"]:
+            for pattern in name_patterns:
+                name_match = re.search(pattern, msg, re.IGNORECASE | re.MULTILINE)
+                if name_match:
+                    potential_name = name_match.group(1).strip()
+                    words = potential_name.split()
+                    if 1 <= len(words) <= 4 and all('\n' not in w and len(w) >= 2 for w in words):
+                        info["name"] = " ".join(word.capitalize() for word in words)
+                        break
+
+    # Extract date (various formats) - ONLY if not already set by slot selection
+    if not info["date"]:
+        today = datetime.now()
+
+        # Check for relative dates
+        if re.search(r"\b(aujourd'hui|today)\b", conversation_text, re.IGNORECASE):
+            info["date"] = today.strftime("%Y-%m-%d")
+        elif re.search(r"\b(demain|tomorrow)\b", conversation_text, re.IGNORECASE):
+            info["date"] = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+        # Check for day of week (Monday, Tuesday, etc.)
+        elif re.search(r"\b(monday|lundi)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (0 - today.weekday()) % 7
+            if days_ahead == 0:  # If today is Monday, schedule for next Monday
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        elif re.search(r"\b(tuesday|mardi)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (1 - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        elif re.search(r"\b(wednesday|mercredi)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (2 - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        elif re.search(r"\b(thursday|jeudi)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (3 - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        elif re.search(r"\b(friday|vendredi)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (4 - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        elif re.search(r"\b(saturday|samedi)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (5 - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        elif re.search(r"\b(sunday|dimanche)\b", conversation_text, re.IGNORECASE):
+            days_ahead = (6 - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            info["date"] = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        else:
+            # Try to extract specific dates (DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD)
+            date_patterns = [
+                r"\b(\d{4}[-/]\d{1,2}[-/]\d{1,2})\b",  # YYYY-MM-DD
+                r"\b(\d{1,2}[-/]\d{1,2}[-/]\d{4})\b",  # DD-MM-YYYY or MM-DD-YYYY
+            ]
+            for pattern in date_patterns:
+                date_match = re.search(pattern, conversation_text)
+                if date_match:
+                    date_str = date_match.group(1)
+                    # Try to parse it
+                    for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y"]:
+                        try:
+                            parsed_date = datetime.strptime(date_str, fmt)
+                            info["date"] = parsed_date.strftime("%Y-%m-%d")
+                            break
+                        except:
+                            continue
+                    if info["date"]:
+                        break
+
+    # Extract time (HH:MM format or simple hour) - ONLY if not already set by slot selection
+    if not info["time"]:
+        time_pattern = r"\b(\d{1,2})[h:](\d{2})\b"
+        time_match = re.search(time_pattern, conversation_text)
+        if time_match:
+            hour = int(time_match.group(1))
+            minute = time_match.group(2)
+
+            # Check for PM/AM suffix even for HH:MM format (e.g., "2:30pm")
+            # Look for PM/AM within 5 characters after the time match
+            match_end = time_match.end()
+            nearby_text = conversation_text[max(0, match_end):match_end + 5].lower()
+
+            if "pm" in nearby_text and hour < 12:
+                hour += 12
+            elif "am" in nearby_text and hour == 12:
+                hour = 0  # 12am = 00:00
+
+            info["time"] = f"{hour:02d}:{minute}"
+        else:
+            # Try simple hour format like "14h" or "2pm"
+            time_pattern_simple = r"\b(\d{1,2})\s*(?:h|heures?|pm|am)\b"
+            time_match_simple = re.search(time_pattern_simple, conversation_text, re.IGNORECASE)
+            if time_match_simple:
+                hour = int(time_match_simple.group(1))
+
+                # Adjust for PM if needed
+                if "pm" in conversation_text.lower() and hour < 12:
+                    hour += 12
+                # Handle 12am (midnight) edge case
+                elif "am" in conversation_text.lower() and hour == 12:
+                    hour = 0
+
+                info["time"] = f"{hour:02d}:00"
+
+    return info
+
+
+def booking_turns() -> list[list[dict]]:
+    """Every conversation prefix, with assistant replies in between, as seen turn by turn."""
+    turns = []
+    for conversation in CONVERSATIONS:
+        history = []
+        for text in conversation:
+            history.append({"role": "user", "content": text})
+            turns.append(list(history))
+            history.append({"role": "assistant", "content": "Merci ! / Thanks!"})
+    return turns
+
+
+def check_parity(turns: list[list[dict]]) -> int:
+    """Compare both extractors on every turn, with and without slots. Returns the mismatch count."""
+    mismatches = 0
+    for messages in turns:
+        for slots in (SLOTS, None):
+            expected = legacy_extract_appointment_info(messages, slots)
+            actual = extract_appointment_info(messages, slots)
+            if actual != expected:
+                mismatches += 1
+                print(f"❌ Mismatch on {[m['content'] for m in messages if m['role'] == 'user']}")
+                print(f"   expected: {expected}")
+                print(f"   actual:   {actual}")
+    return mismatches
+
+
+def time_per_turn(extract, turns: list[list[dict]], rounds: int, cold: bool = False) -> float:
+    """Average microseconds per extraction over all turns (cold: memoized scans cleared before each)."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for messages in turns:
+            if cold:
+                scan_message.cache_clear()
+            extract(messages, SLOTS)
+    return (time.perf_counter() - start) / (rounds * len(turns)) * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200, help="passes over the corpus per measurement")
+    parser.add_argument("--min-speedup", type=float, default=1.5, help="fail if the memoized speedup is lower")
+    parser.add_argument("--min-cold-speedup", type=float, default=1.2, help="fail if the cold speedup is lower")
+    args = parser.parse_args()
+
+    turns = booking_turns()
+    print(f"📋 {len(CONVERSATIONS)} conversations, {len(turns)} booking-flow turns")
+
+    mismatches = check_parity(turns)
+    if mismatches:
+        print(f"❌ {mismatches} result(s) differ from the reference implementation")
+        return 1
+    print("✅ Results match the reference implementation")
+
+    legacy_us = time_per_turn(legacy_extract_appointment_info, turns, args.rounds)
+    cold_us = time_per_turn(extract_appointment_info, turns, args.rounds, cold=True)
+    warm_us = time_per_turn(extract_appointment_info, turns, args.rounds)
+
+    print(f"   reference:            {legacy_us:8.1f} µs/turn")
+    print(f"   precompiled (cold):   {cold_us:8.1f} µs/turn  ({legacy_us / cold_us:.1f}x)")
+    print(f"   precompiled (memo):   {warm_us:8.1f} µs/turn  ({legacy_us / warm_us:.1f}x)")
+
+    if legacy_us / cold_us < args.min_cold_speedup:
+        print(f"❌ Cold speedup below {args.min_cold_speedup}x")
+        return 1
+    if legacy_us / warm_us < args.min_speedup:
+        print(f"❌ Memoized speedup below {args.min_speedup}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
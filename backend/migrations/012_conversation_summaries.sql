@@ -0,0 +1,39 @@
+-- Migration 012: Batched conversation summaries for live monitoring
+-- Returns message count, last message preview and last role for many conversations in one call
+-- Run this in the Supabase SQL Editor
+
+-- Composite index so "latest message per conversation" is a single index probe
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_created
+ON messages(conversation_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION get_conversation_summaries(conversation_ids UUID[])
+RETURNS TABLE (
+    conversation_id UUID,
+    message_count BIGINT,
+    last_message TEXT,
+    last_message_role TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        ids.id AS conversation_id,
+        counts.message_count,
+        last_msg.content AS last_message,
+        last_msg.role AS last_message_role
+    FROM unnest(conversation_ids) AS ids(id)
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS message_count
+        FROM messages m
+        WHERE m.conversation_id = ids.id
+    ) counts
+    LEFT JOIN LATERAL (
+        SELECT LEFT(m.content, 100) AS content, m.role
+        FROM messages m
+        WHERE m.conversation_id = ids.id
+        ORDER BY m.created_at DESC
+        LIMIT 1
+    ) last_msg ON TRUE;
+$$;
+
+COMMENT ON FUNCTION get_conversation_summaries(UUID[]) IS 'Message count and last message preview/role for a batch of conversations (live monitoring)';
@@ -0,0 +1,87 @@
+-- Migration 013: Server-side analytics aggregates
+-- Grouped SQL aggregates for /api/analytics so the endpoint runs a constant number of queries
+-- Run this in the Supabase SQL Editor
+
+CREATE INDEX IF NOT EXISTS idx_conversations_business_started
+ON conversations(business_id, started_at);
+
+-- Conversation, channel, message and satisfaction totals in one row
+CREATE OR REPLACE FUNCTION get_analytics_summary(p_business_id UUID, p_since TIMESTAMPTZ)
+RETURNS TABLE (
+    total_conversations BIGINT,
+    recent_conversations BIGINT,
+    widget_total BIGINT,
+    whatsapp_total BIGINT,
+    widget_recent BIGINT,
+    whatsapp_recent BIGINT,
+    total_rated BIGINT,
+    positive_ratings BIGINT,
+    negative_ratings BIGINT,
+    total_messages BIGINT,
+    user_messages BIGINT,
+    assistant_messages BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH conv AS (
+        SELECT
+            COUNT(*) AS total_conversations,
+            COUNT(*) FILTER (WHERE c.started_at >= p_since) AS recent_conversations,
+            COUNT(*) FILTER (WHERE c.channel = 'widget') AS widget_total,
+            COUNT(*) FILTER (WHERE c.channel = 'whatsapp') AS whatsapp_total,
+            COUNT(*) FILTER (WHERE c.channel = 'widget' AND c.started_at >= p_since) AS widget_recent,
+            COUNT(*) FILTER (WHERE c.channel = 'whatsapp' AND c.started_at >= p_since) AS whatsapp_recent,
+            COUNT(c.rating) AS total_rated,
+            COUNT(*) FILTER (WHERE c.rating = 'positive') AS positive_ratings,
+            COUNT(*) FILTER (WHERE c.rating = 'negative') AS negative_ratings
+        FROM conversations c
+        WHERE c.business_id = p_business_id
+    ),
+    msg AS (
+        SELECT
+            COUNT(*) AS total_messages,
+            COUNT(*) FILTER (WHERE m.role = 'user') AS user_messages,
+            COUNT(*) FILTER (WHERE m.role = 'assistant') AS assistant_messages
+        FROM messages m
+        JOIN conversations c ON c.id = m.conversation_id
+        WHERE c.business_id = p_business_id
+    )
+    SELECT
+        conv.total_conversations,
+        conv.recent_conversations,
+        conv.widget_total,
+        conv.whatsapp_total,
+        conv.widget_recent,
+        conv.whatsapp_recent,
+        conv.total_rated,
+        conv.positive_ratings,
+        conv.negative_ratings,
+        msg.total_messages,
+        msg.user_messages,
+        msg.assistant_messages
+    FROM conv CROSS JOIN msg;
+$$;
+
+-- New conversations per UTC day and channel since p_since
+CREATE OR REPLACE FUNCTION get_daily_conversation_counts(p_business_id UUID, p_since TIMESTAMPTZ)
+RETURNS TABLE (
+    day DATE,
+    channel TEXT,
+    conversation_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        (c.started_at AT TIME ZONE 'UTC')::date AS day,
+        c.channel,
+        COUNT(*) AS conversation_count
+    FROM conversations c
+    WHERE c.business_id = p_business_id
+      AND c.started_at >= p_since
+    GROUP BY 1, 2;
+$$;
+
+COMMENT ON FUNCTION get_analytics_summary(UUID, TIMESTAMPTZ) IS 'Conversation, channel, rating and message totals for the analytics dashboard';
+COMMENT ON FUNCTION get_daily_conversation_counts(UUID, TIMESTAMPTZ) IS 'Per-day, per-channel conversation counts for analytics charts';
@@ -0,0 +1,77 @@
+-- Migration 014: Set-based reminder selection
+-- Selects every appointment due a reminder, across all businesses, in one query
+-- Run this in the Supabase SQL Editor
+
+-- Appointment start as a timestamp so reminder windows are index range scans
+CREATE INDEX IF NOT EXISTS idx_appointments_active_start
+ON appointments((appointment_date + appointment_time))
+WHERE status IN ('pending', 'confirmed');
+
+-- Dedup lookup for reminders that already went out
+CREATE INDEX IF NOT EXISTS idx_notification_log_sent_reminders
+ON notification_log(appointment_id, type)
+WHERE status = 'sent';
+
+-- Appointments inside a reminder window whose reminder type is enabled and
+-- has not been sent yet. Appointment date/time are interpreted as UTC.
+--   reminder_24h: starts between 23h and 25h from p_now
+--   reminder_1h:  starts between 45min and 75min from p_now
+CREATE OR REPLACE FUNCTION get_due_reminders(p_now TIMESTAMPTZ)
+RETURNS TABLE (
+    reminder_type TEXT,
+    hours_before INTEGER,
+    appointment_id UUID,
+    business_id UUID,
+    business_name TEXT,
+    language TEXT,
+    customer_name TEXT,
+    customer_email TEXT,
+    customer_phone TEXT,
+    appointment_date DATE,
+    appointment_time TIME,
+    duration_minutes INTEGER,
+    service_type TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH windows (reminder_type, hours_before, window_start, window_end) AS (
+        VALUES
+            ('reminder_24h', 24, (p_now AT TIME ZONE 'UTC') + INTERVAL '23 hours', (p_now AT TIME ZONE 'UTC') + INTERVAL '25 hours'),
+            ('reminder_1h', 1, (p_now AT TIME ZONE 'UTC') + INTERVAL '45 minutes', (p_now AT TIME ZONE 'UTC') + INTERVAL '75 minutes')
+    )
+    SELECT
+        w.reminder_type,
+        w.hours_before,
+        a.id AS appointment_id,
+        a.business_id,
+        b.name AS business_name,
+        COALESCE(b.language, 'fr') AS language,
+        a.customer_name,
+        a.customer_email,
+        a.customer_phone,
+        a.appointment_date,
+        a.appointment_time,
+        a.duration_minutes,
+        a.service_type
+    FROM windows w
+    JOIN appointments a
+        ON a.status IN ('pending', 'confirmed')
+       AND (a.appointment_date + a.appointment_time) BETWEEN w.window_start AND w.window_end
+    JOIN notification_settings ns ON ns.business_id = a.business_id
+    JOIN businesses b ON b.id = a.business_id
+    WHERE CASE w.reminder_type
+              WHEN 'reminder_24h' THEN COALESCE(ns.send_reminder_24h, true)
+              ELSE COALESCE(ns.send_reminder_1h, false)
+          END
+      AND NOT EXISTS (
+          SELECT 1
+          FROM notification_log nl
+          WHERE nl.appointment_id = a.id
+            AND nl.type = w.reminder_type
+            AND nl.status = 'sent'
+      )
+    ORDER BY a.appointment_date, a.appointment_time;
+$$;
+
+COMMENT ON FUNCTION get_due_reminders(TIMESTAMPTZ) IS 'Appointments due a 24h or 1h reminder that has not been sent yet, across all businesses';
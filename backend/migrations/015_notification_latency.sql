@@ -0,0 +1,8 @@
+-- Migration 015: Per-channel notification latency
+-- Records how long each email/SMS provider call took
+-- Run this in the Supabase SQL Editor
+
+ALTER TABLE notification_log
+ADD COLUMN IF NOT EXISTS latency_ms INTEGER;
+
+COMMENT ON COLUMN notification_log.latency_ms IS 'Provider call duration in milliseconds (Resend or Twilio)';
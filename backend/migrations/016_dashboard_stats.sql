@@ -0,0 +1,59 @@
+-- Migration 016: Single-query dashboard stats
+-- All dashboard home counters computed server-side in one round-trip
+-- Run this in the Supabase SQL Editor
+
+CREATE INDEX IF NOT EXISTS idx_conversations_business_last_message
+ON conversations(business_id, last_message_at);
+
+CREATE INDEX IF NOT EXISTS idx_appointments_business_date
+ON appointments(business_id, appointment_date);
+
+-- Today's conversations, conversations active in the last hour, today's
+-- appointments, 30-day satisfaction (% positive, NULL when unrated) and the
+-- all-time conversation total. "Today" is the UTC day containing p_now.
+CREATE OR REPLACE FUNCTION get_dashboard_stats(p_business_id UUID, p_now TIMESTAMPTZ)
+RETURNS TABLE (
+    conversations_today BIGINT,
+    active_conversations BIGINT,
+    appointments_today BIGINT,
+    satisfaction_rate INTEGER,
+    total_conversations BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH bounds AS (
+        SELECT date_trunc('day', p_now AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS day_start
+    ),
+    conv AS (
+        SELECT
+            COUNT(*) FILTER (
+                WHERE c.started_at >= b.day_start AND c.started_at < b.day_start + INTERVAL '1 day'
+            ) AS conversations_today,
+            COUNT(*) FILTER (WHERE c.last_message_at >= p_now - INTERVAL '1 hour') AS active_conversations,
+            COUNT(*) FILTER (
+                WHERE c.rating = 'positive' AND c.rated_at >= p_now - INTERVAL '30 days'
+            ) AS positive_ratings,
+            COUNT(*) FILTER (
+                WHERE c.rating IS NOT NULL AND c.rated_at >= p_now - INTERVAL '30 days'
+            ) AS total_ratings,
+            COUNT(*) AS total_conversations
+        FROM conversations c, bounds b
+        WHERE c.business_id = p_business_id
+    ),
+    appt AS (
+        SELECT COUNT(*) AS appointments_today
+        FROM appointments a
+        WHERE a.business_id = p_business_id
+          AND a.appointment_date = (p_now AT TIME ZONE 'UTC')::date
+    )
+    SELECT
+        conv.conversations_today,
+        conv.active_conversations,
+        appt.appointments_today,
+        ROUND(100.0 * conv.positive_ratings / NULLIF(conv.total_ratings, 0))::INTEGER AS satisfaction_rate,
+        conv.total_conversations
+    FROM conv CROSS JOIN appt;
+$$;
+
+COMMENT ON FUNCTION get_dashboard_stats(UUID, TIMESTAMPTZ) IS 'Dashboard home counters for a business in a single query';
@@ -0,0 +1,13 @@
+-- Migration 017: WhatsApp number routing
+-- Each business can own one WhatsApp number; inbound webhooks are routed by it
+-- Run this in the Supabase SQL Editor
+
+-- E.164 number without the "whatsapp:" prefix, e.g. +14155238886
+ALTER TABLE businesses
+ADD COLUMN IF NOT EXISTS whatsapp_number TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_businesses_whatsapp_number
+ON businesses(whatsapp_number)
+WHERE whatsapp_number IS NOT NULL;
+
+COMMENT ON COLUMN businesses.whatsapp_number IS 'WhatsApp number (E.164, no whatsapp: prefix) that routes inbound messages to this business';
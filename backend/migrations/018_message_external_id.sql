@@ -0,0 +1,13 @@
+-- Migration 018: Provider message ids for idempotent webhooks
+-- Twilio retries a webhook when it doesn't get a fast response; storing the
+-- MessageSid with a unique index makes each inbound message persist only once
+-- Run this in the Supabase SQL Editor
+
+ALTER TABLE messages
+ADD COLUMN IF NOT EXISTS external_id TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_external_id
+ON messages(external_id)
+WHERE external_id IS NOT NULL;
+
+COMMENT ON COLUMN messages.external_id IS 'Provider message id (Twilio MessageSid) used to drop retried deliveries';
@@ -0,0 +1,11 @@
+-- Migration 019: Rolling conversation summaries
+-- Messages that fall out of the prompt history window are folded into a
+-- per-conversation summary that is sent to the model instead
+-- Run this in the Supabase SQL Editor
+
+ALTER TABLE conversations
+ADD COLUMN IF NOT EXISTS summary TEXT,
+ADD COLUMN IF NOT EXISTS summarized_until TIMESTAMPTZ;
+
+COMMENT ON COLUMN conversations.summary IS 'Rolling AI summary of messages older than the prompt history window';
+COMMENT ON COLUMN conversations.summarized_until IS 'created_at of the newest message folded into summary';
@@ -0,0 +1,36 @@
+-- Migration 020: Bump conversations.last_message_at from message inserts
+-- A message insert and its conversation timestamp update become one atomic
+-- write, so callers no longer update last_message_at separately
+-- Run this in the Supabase SQL Editor
+
+-- Per-row timestamps so messages inserted together (welcome + first message)
+-- keep their order when sorted by created_at
+ALTER TABLE messages
+ALTER COLUMN created_at SET DEFAULT clock_timestamp();
+
+-- One conversation update per insert statement, however many rows it adds
+CREATE OR REPLACE FUNCTION touch_conversation_last_message_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE conversations c
+    SET last_message_at = GREATEST(c.last_message_at, m.last_created_at)
+    FROM (
+        SELECT conversation_id, MAX(created_at) AS last_created_at
+        FROM new_messages
+        GROUP BY conversation_id
+    ) m
+    WHERE c.id = m.conversation_id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_messages_touch_conversation ON messages;
+CREATE TRIGGER trg_messages_touch_conversation
+AFTER INSERT ON messages
+REFERENCING NEW TABLE AS new_messages
+FOR EACH STATEMENT
+EXECUTE FUNCTION touch_conversation_last_message_at();
+
+COMMENT ON FUNCTION touch_conversation_last_message_at() IS 'Sets conversations.last_message_at to the newest message inserted by a statement';
@@ -0,0 +1,126 @@
+-- Migration 021: Denormalized per-conversation message counters
+-- message_count, user_message_count and the last message preview/role live on
+-- conversations, kept current by the messages insert trigger, so analytics,
+-- export and live monitoring read a column instead of counting messages
+-- Run this in the Supabase SQL Editor
+
+BEGIN;
+
+ALTER TABLE conversations
+ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS user_message_count INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS last_message_preview TEXT,
+ADD COLUMN IF NOT EXISTS last_message_role TEXT;
+
+-- Block message inserts until the trigger is in place and the backfill is done
+LOCK TABLE messages IN SHARE MODE;
+
+-- Replaces touch_conversation_last_message_at (migration 020): one
+-- conversation update per insert statement, however many rows it adds
+CREATE OR REPLACE FUNCTION apply_message_inserts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE conversations c
+    SET message_count = c.message_count + m.inserted,
+        user_message_count = c.user_message_count + m.inserted_user,
+        last_message_preview = CASE WHEN m.last_created_at >= c.last_message_at THEN l.preview ELSE c.last_message_preview END,
+        last_message_role = CASE WHEN m.last_created_at >= c.last_message_at THEN l.role ELSE c.last_message_role END,
+        last_message_at = GREATEST(c.last_message_at, m.last_created_at)
+    FROM (
+        SELECT
+            conversation_id,
+            COUNT(*) AS inserted,
+            COUNT(*) FILTER (WHERE role = 'user') AS inserted_user,
+            MAX(created_at) AS last_created_at
+        FROM new_messages
+        GROUP BY conversation_id
+    ) m
+    JOIN (
+        SELECT DISTINCT ON (conversation_id)
+            conversation_id,
+            LEFT(content, 100) AS preview,
+            role
+        FROM new_messages
+        ORDER BY conversation_id, created_at DESC
+    ) l ON l.conversation_id = m.conversation_id
+    WHERE c.id = m.conversation_id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_messages_touch_conversation ON messages;
+DROP TRIGGER IF EXISTS trg_messages_conversation_counters ON messages;
+CREATE TRIGGER trg_messages_conversation_counters
+AFTER INSERT ON messages
+REFERENCING NEW TABLE AS new_messages
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_message_inserts();
+
+DROP FUNCTION IF EXISTS touch_conversation_last_message_at();
+
+-- Replaced by the counter columns (migration 012); its
+-- idx_messages_conversation_created index stays for get_recent_messages
+DROP FUNCTION IF EXISTS get_conversation_summaries(UUID[]);
+
+-- Backfill existing conversations
+UPDATE conversations c
+SET message_count = s.message_count,
+    user_message_count = s.user_message_count,
+    last_message_preview = s.last_message_preview,
+    last_message_role = s.last_message_role
+FROM (
+    SELECT
+        m.conversation_id,
+        COUNT(*) AS message_count,
+        COUNT(*) FILTER (WHERE m.role = 'user') AS user_message_count,
+        (ARRAY_AGG(LEFT(m.content, 100) ORDER BY m.created_at DESC))[1] AS last_message_preview,
+        (ARRAY_AGG(m.role ORDER BY m.created_at DESC))[1] AS last_message_role
+    FROM messages m
+    GROUP BY m.conversation_id
+) s
+WHERE c.id = s.conversation_id;
+
+-- Analytics message totals from the counters instead of scanning messages
+CREATE OR REPLACE FUNCTION get_analytics_summary(p_business_id UUID, p_since TIMESTAMPTZ)
+RETURNS TABLE (
+    total_conversations BIGINT,
+    recent_conversations BIGINT,
+    widget_total BIGINT,
+    whatsapp_total BIGINT,
+    widget_recent BIGINT,
+    whatsapp_recent BIGINT,
+    total_rated BIGINT,
+    positive_ratings BIGINT,
+    negative_ratings BIGINT,
+    total_messages BIGINT,
+    user_messages BIGINT,
+    assistant_messages BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*) AS total_conversations,
+        COUNT(*) FILTER (WHERE c.started_at >= p_since) AS recent_conversations,
+        COUNT(*) FILTER (WHERE c.channel = 'widget') AS widget_total,
+        COUNT(*) FILTER (WHERE c.channel = 'whatsapp') AS whatsapp_total,
+        COUNT(*) FILTER (WHERE c.channel = 'widget' AND c.started_at >= p_since) AS widget_recent,
+        COUNT(*) FILTER (WHERE c.channel = 'whatsapp' AND c.started_at >= p_since) AS whatsapp_recent,
+        COUNT(c.rating) AS total_rated,
+        COUNT(*) FILTER (WHERE c.rating = 'positive') AS positive_ratings,
+        COUNT(*) FILTER (WHERE c.rating = 'negative') AS negative_ratings,
+        COALESCE(SUM(c.message_count), 0)::BIGINT AS total_messages,
+        COALESCE(SUM(c.user_message_count), 0)::BIGINT AS user_messages,
+        COALESCE(SUM(c.message_count - c.user_message_count), 0)::BIGINT AS assistant_messages
+    FROM conversations c
+    WHERE c.business_id = p_business_id;
+$$;
+
+COMMIT;
+
+COMMENT ON COLUMN conversations.message_count IS 'Messages in the conversation (maintained by trg_messages_conversation_counters)';
+COMMENT ON COLUMN conversations.user_message_count IS 'Customer messages in the conversation (maintained by trg_messages_conversation_counters)';
+COMMENT ON COLUMN conversations.last_message_preview IS 'First 100 characters of the newest message';
+COMMENT ON COLUMN conversations.last_message_role IS 'Role of the newest message';
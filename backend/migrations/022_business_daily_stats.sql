@@ -0,0 +1,290 @@
+-- Migration 022: Per-business daily stats rollup
+-- One row per business, UTC day and channel with conversation, message, rating
+-- and appointment counts, kept current by insert/update triggers so charts read
+-- at most one row per day and channel instead of scanning conversations.
+-- reconcile_business_daily_stats() recomputes one business's window from the
+-- source tables and is run by the scheduler, business by business, to
+-- correct any drift.
+-- Run this in the Supabase SQL Editor
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS business_daily_stats (
+    business_id UUID NOT NULL REFERENCES businesses(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    channel TEXT NOT NULL DEFAULT 'widget',
+    conversations INTEGER NOT NULL DEFAULT 0,
+    messages INTEGER NOT NULL DEFAULT 0,
+    user_messages INTEGER NOT NULL DEFAULT 0,
+    positive_ratings INTEGER NOT NULL DEFAULT 0,
+    negative_ratings INTEGER NOT NULL DEFAULT 0,
+    appointments INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_id, day, channel)
+);
+
+ALTER TABLE business_daily_stats ENABLE ROW LEVEL SECURITY;
+
+-- Block writes to the source tables until the triggers are in place and the backfill is done
+LOCK TABLE conversations, messages, appointments IN SHARE MODE;
+
+-- New conversations, counted on their start day
+CREATE OR REPLACE FUNCTION daily_stats_conversation_inserts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO business_daily_stats AS s (business_id, day, channel, conversations)
+    SELECT business_id, (started_at AT TIME ZONE 'UTC')::date, channel, COUNT(*)
+    FROM new_conversations
+    GROUP BY 1, 2, 3
+    ON CONFLICT (business_id, day, channel)
+    DO UPDATE SET conversations = s.conversations + EXCLUDED.conversations;
+    RETURN NULL;
+END;
+$$;
+
+-- New messages, counted on their creation day under their conversation's channel
+CREATE OR REPLACE FUNCTION daily_stats_message_inserts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO business_daily_stats AS s (business_id, day, channel, messages, user_messages)
+    SELECT
+        c.business_id,
+        (m.created_at AT TIME ZONE 'UTC')::date,
+        c.channel,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE m.role = 'user')
+    FROM new_messages m
+    JOIN conversations c ON c.id = m.conversation_id
+    GROUP BY 1, 2, 3
+    ON CONFLICT (business_id, day, channel)
+    DO UPDATE SET messages = s.messages + EXCLUDED.messages,
+                  user_messages = s.user_messages + EXCLUDED.user_messages;
+    RETURN NULL;
+END;
+$$;
+
+-- Ratings, counted on the day they were given; a changed rating moves between buckets
+CREATE OR REPLACE FUNCTION daily_stats_rating_update()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF OLD.rating IS NOT NULL AND OLD.rated_at IS NOT NULL THEN
+        UPDATE business_daily_stats
+        SET positive_ratings = positive_ratings - (OLD.rating = 'positive')::int,
+            negative_ratings = negative_ratings - (OLD.rating = 'negative')::int
+        WHERE business_id = OLD.business_id
+          AND day = (OLD.rated_at AT TIME ZONE 'UTC')::date
+          AND channel = OLD.channel;
+    END IF;
+
+    IF NEW.rating IS NOT NULL AND NEW.rated_at IS NOT NULL THEN
+        INSERT INTO business_daily_stats AS s (business_id, day, channel, positive_ratings, negative_ratings)
+        VALUES (
+            NEW.business_id,
+            (NEW.rated_at AT TIME ZONE 'UTC')::date,
+            NEW.channel,
+            (NEW.rating = 'positive')::int,
+            (NEW.rating = 'negative')::int
+        )
+        ON CONFLICT (business_id, day, channel)
+        DO UPDATE SET positive_ratings = s.positive_ratings + EXCLUDED.positive_ratings,
+                      negative_ratings = s.negative_ratings + EXCLUDED.negative_ratings;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Booked appointments, counted on the day they were made under the
+-- channel of the conversation that booked them ('widget' for manual bookings)
+CREATE OR REPLACE FUNCTION daily_stats_appointment_inserts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO business_daily_stats AS s (business_id, day, channel, appointments)
+    SELECT a.business_id, (a.created_at AT TIME ZONE 'UTC')::date, COALESCE(c.channel, 'widget'), COUNT(*)
+    FROM new_appointments a
+    LEFT JOIN conversations c ON c.id = a.conversation_id
+    GROUP BY 1, 2, 3
+    ON CONFLICT (business_id, day, channel)
+    DO UPDATE SET appointments = s.appointments + EXCLUDED.appointments;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION daily_stats_appointment_deletes()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE business_daily_stats s
+    SET appointments = GREATEST(s.appointments - d.deleted, 0)
+    FROM (
+        SELECT a.business_id, (a.created_at AT TIME ZONE 'UTC')::date AS day, COALESCE(c.channel, 'widget') AS channel, COUNT(*) AS deleted
+        FROM old_appointments a
+        LEFT JOIN conversations c ON c.id = a.conversation_id
+        GROUP BY 1, 2, 3
+    ) d
+    WHERE s.business_id = d.business_id
+      AND s.day = d.day
+      AND s.channel = d.channel;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_conversations_daily_stats ON conversations;
+CREATE TRIGGER trg_conversations_daily_stats
+AFTER INSERT ON conversations
+REFERENCING NEW TABLE AS new_conversations
+FOR EACH STATEMENT
+EXECUTE FUNCTION daily_stats_conversation_inserts();
+
+DROP TRIGGER IF EXISTS trg_messages_daily_stats ON messages;
+CREATE TRIGGER trg_messages_daily_stats
+AFTER INSERT ON messages
+REFERENCING NEW TABLE AS new_messages
+FOR EACH STATEMENT
+EXECUTE FUNCTION daily_stats_message_inserts();
+
+-- Row-level: transition tables can't be combined with an UPDATE OF column list,
+-- and ratings change one conversation at a time
+DROP TRIGGER IF EXISTS trg_conversations_rating_daily_stats ON conversations;
+CREATE TRIGGER trg_conversations_rating_daily_stats
+AFTER UPDATE OF rating, rated_at ON conversations
+FOR EACH ROW
+WHEN (OLD.rating IS DISTINCT FROM NEW.rating OR OLD.rated_at IS DISTINCT FROM NEW.rated_at)
+EXECUTE FUNCTION daily_stats_rating_update();
+
+DROP TRIGGER IF EXISTS trg_appointments_daily_stats ON appointments;
+CREATE TRIGGER trg_appointments_daily_stats
+AFTER INSERT ON appointments
+REFERENCING NEW TABLE AS new_appointments
+FOR EACH STATEMENT
+EXECUTE FUNCTION daily_stats_appointment_inserts();
+
+DROP TRIGGER IF EXISTS trg_appointments_delete_daily_stats ON appointments;
+CREATE TRIGGER trg_appointments_delete_daily_stats
+AFTER DELETE ON appointments
+REFERENCING OLD TABLE AS old_appointments
+FOR EACH STATEMENT
+EXECUTE FUNCTION daily_stats_appointment_deletes();
+
+CREATE INDEX IF NOT EXISTS idx_appointments_business_created
+ON appointments(business_id, created_at);
+
+-- Recompute one business's rows from p_since (UTC day) onwards from the
+-- source tables and add the difference (actual minus stored) to every row
+-- that is off; returns how many rows were corrected.
+-- Actual and stored counts are read in one statement, from one snapshot, and
+-- the correction is applied as a delta to the current row, so increments
+-- that triggers commit while it runs are kept and no table lock is needed.
+-- The advisory lock stops two reconciles of the same business from applying
+-- the same correction twice.
+DROP FUNCTION IF EXISTS reconcile_business_daily_stats(DATE);
+CREATE OR REPLACE FUNCTION reconcile_business_daily_stats(p_business_id UUID, p_since DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_since TIMESTAMPTZ := p_since::timestamp AT TIME ZONE 'UTC';
+    v_corrected INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(p_business_id::text));
+
+    WITH events AS (
+        SELECT c.started_at AS at, c.channel,
+               1 AS conversations, 0 AS messages, 0 AS user_messages,
+               0 AS positive_ratings, 0 AS negative_ratings, 0 AS appointments
+        FROM conversations c
+        WHERE c.business_id = p_business_id AND c.started_at >= v_since
+        UNION ALL
+        SELECT m.created_at, c.channel,
+               0, 1, (m.role = 'user')::int, 0, 0, 0
+        FROM messages m
+        JOIN conversations c ON c.id = m.conversation_id
+        WHERE c.business_id = p_business_id AND m.created_at >= v_since
+        UNION ALL
+        SELECT c.rated_at, c.channel,
+               0, 0, 0, (c.rating = 'positive')::int, (c.rating = 'negative')::int, 0
+        FROM conversations c
+        WHERE c.business_id = p_business_id AND c.rating IS NOT NULL AND c.rated_at >= v_since
+        UNION ALL
+        SELECT a.created_at, COALESCE(c.channel, 'widget'),
+               0, 0, 0, 0, 0, 1
+        FROM appointments a
+        LEFT JOIN conversations c ON c.id = a.conversation_id
+        WHERE a.business_id = p_business_id AND a.created_at >= v_since
+    ),
+    actual AS (
+        SELECT
+            (at AT TIME ZONE 'UTC')::date AS day,
+            channel,
+            SUM(conversations)::int AS conversations,
+            SUM(messages)::int AS messages,
+            SUM(user_messages)::int AS user_messages,
+            SUM(positive_ratings)::int AS positive_ratings,
+            SUM(negative_ratings)::int AS negative_ratings,
+            SUM(appointments)::int AS appointments
+        FROM events
+        GROUP BY 1, 2
+    ),
+    stored AS (
+        SELECT day, channel, conversations, messages, user_messages,
+               positive_ratings, negative_ratings, appointments
+        FROM business_daily_stats
+        WHERE business_id = p_business_id AND day >= p_since
+    ),
+    drift AS (
+        SELECT
+            COALESCE(a.day, s.day) AS day,
+            COALESCE(a.channel, s.channel) AS channel,
+            COALESCE(a.conversations, 0) - COALESCE(s.conversations, 0) AS conversations,
+            COALESCE(a.messages, 0) - COALESCE(s.messages, 0) AS messages,
+            COALESCE(a.user_messages, 0) - COALESCE(s.user_messages, 0) AS user_messages,
+            COALESCE(a.positive_ratings, 0) - COALESCE(s.positive_ratings, 0) AS positive_ratings,
+            COALESCE(a.negative_ratings, 0) - COALESCE(s.negative_ratings, 0) AS negative_ratings,
+            COALESCE(a.appointments, 0) - COALESCE(s.appointments, 0) AS appointments
+        FROM actual a
+        FULL JOIN stored s ON s.day = a.day AND s.channel = a.channel
+    ),
+    corrected AS (
+        INSERT INTO business_daily_stats AS s (
+            business_id, day, channel, conversations, messages, user_messages,
+            positive_ratings, negative_ratings, appointments
+        )
+        SELECT p_business_id, day, channel, conversations, messages, user_messages,
+               positive_ratings, negative_ratings, appointments
+        FROM drift
+        WHERE (conversations, messages, user_messages, positive_ratings, negative_ratings, appointments)
+              <> (0, 0, 0, 0, 0, 0)
+        ON CONFLICT (business_id, day, channel)
+        DO UPDATE SET conversations = s.conversations + EXCLUDED.conversations,
+                      messages = s.messages + EXCLUDED.messages,
+                      user_messages = s.user_messages + EXCLUDED.user_messages,
+                      positive_ratings = s.positive_ratings + EXCLUDED.positive_ratings,
+                      negative_ratings = s.negative_ratings + EXCLUDED.negative_ratings,
+                      appointments = s.appointments + EXCLUDED.appointments
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO v_corrected FROM corrected;
+
+    RETURN v_corrected;
+END;
+$$;
+
+-- Backfill the full history (writes to the source tables are blocked above)
+SELECT reconcile_business_daily_stats(b.id, '-infinity') FROM businesses b;
+
+-- Replaced by reading business_daily_stats directly
+DROP FUNCTION IF EXISTS get_daily_conversation_counts(UUID, TIMESTAMPTZ);
+
+COMMIT;
+
+COMMENT ON TABLE business_daily_stats IS 'Per-business, per-UTC-day, per-channel counts maintained by triggers (see migration 022)';
+COMMENT ON COLUMN business_daily_stats.messages IS 'Messages created that day in this channel''s conversations';
+COMMENT ON COLUMN business_daily_stats.appointments IS 'Appointments booked that day (by creation date, not appointment date)';
+COMMENT ON FUNCTION reconcile_business_daily_stats(UUID, DATE) IS 'Correct one business''s business_daily_stats rows from p_since onwards; returns the number of corrected rows';
@@ -4,7 +4,14 @@ import { useEffect, useState, useRef } from "react";
 import Link from "next/link";
 import { useRouter, useSearchParams } from "next/navigation";
 import { supabase } from "@/lib/supabase";
-import { businessAPI, liveAPI, type LiveConversation, type Message } from "@/lib/api";
+import {
+  businessAPI,
+  liveAPI,
+  type LiveConversation,
+  type LiveMessageEvent,
+  type LiveTakeoverEvent,
+  type Message,
+} from "@/lib/api";
 import { useLanguage } from "@/components/LanguageProvider";
 import { RavenIcon } from "@/components/shared/RavenIcon";
 import { Avatar } from "@/components/shared/Avatar";
@@ -24,15 +31,97 @@ export default function LiveConversationsPage() {
   const [businessName, setBusinessName] = useState("");
   const [newMessage, setNewMessage] = useState("");
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const conversationsRef = useRef<LiveConversation[]>([]);
+  const selectedIdRef = useRef<string | null>(null);
 
-  // Auto-refresh conversations every 5 seconds
   useEffect(() => {
-    const interval = setInterval(() => {
-      if (userId && businessId) {
-        refreshConversations();
+    conversationsRef.current = conversations;
+  }, [conversations]);
+
+  useEffect(() => {
+    selectedIdRef.current = selectedConversation?.id ?? null;
+  }, [selectedConversation?.id]);
+
+  // Live updates pushed by the backend
+  useEffect(() => {
+    if (!userId || !businessId) return;
+
+    const reloadConversations = () =>
+      liveAPI.getConversations(businessId, userId)
+        .then(setConversations)
+        .catch((err) => console.error("Failed to refresh:", err));
+
+    const source = new EventSource(liveAPI.eventsUrl(businessId, userId));
+    let disconnected = false;
+
+    source.addEventListener("ready", () => {
+      // Resync whatever was missed while the stream was down
+      if (!disconnected) return;
+      disconnected = false;
+      reloadConversations();
+      const selectedId = selectedIdRef.current;
+      if (selectedId) {
+        liveAPI.getConversation(businessId, selectedId, userId)
+          .then(setSelectedConversation)
+          .catch((err) => console.error("Failed to refresh:", err));
       }
-    }, 5000);
-    return () => clearInterval(interval);
+    });
+
+    source.addEventListener("conversation", (e) => {
+      const { conversation } = JSON.parse((e as MessageEvent).data) as { conversation: LiveConversation };
+      setConversations((prev) =>
+        prev.some((c) => c.id === conversation.id)
+          ? prev
+          : [{ ...conversation, message_count: 0 }, ...prev]
+      );
+    });
+
+    source.addEventListener("message", (e) => {
+      const { conversation_id, message } = JSON.parse((e as MessageEvent).data) as LiveMessageEvent;
+
+      if (!conversationsRef.current.some((c) => c.id === conversation_id)) {
+        // First message of a conversation we haven't seen yet
+        reloadConversations();
+      } else {
+        setConversations((prev) => {
+          const convo = prev.find((c) => c.id === conversation_id);
+          if (!convo) return prev;
+          const updated = {
+            ...convo,
+            last_message: message.content,
+            last_message_role: message.role,
+            last_message_at: message.created_at ?? convo.last_message_at,
+            message_count: (convo.message_count ?? 0) + 1,
+          };
+          return [updated, ...prev.filter((c) => c.id !== conversation_id)];
+        });
+      }
+
+      setSelectedConversation((prev) => {
+        if (!prev || prev.id !== conversation_id) return prev;
+        if (message.id && prev.messages?.some((m) => m.id === message.id)) return prev;
+        return { ...prev, messages: [...(prev.messages ?? []), message] };
+      });
+    });
+
+    const handleTakeoverEvent = (e: Event) => {
+      const data = JSON.parse((e as MessageEvent).data) as LiveTakeoverEvent;
+      const apply = (c: LiveConversation): LiveConversation =>
+        c.id === data.conversation_id
+          ? { ...c, is_human_takeover: data.is_human_takeover, taken_over_by: data.taken_over_by ?? undefined }
+          : c;
+      setConversations((prev) => prev.map(apply));
+      setSelectedConversation((prev) => (prev ? apply(prev) : prev));
+    };
+    source.addEventListener("takeover", handleTakeoverEvent);
+    source.addEventListener("release", handleTakeoverEvent);
+
+    // EventSource reconnects on its own; resync once it is back
+    source.onerror = () => {
+      disconnected = true;
+    };
+
+    return () => source.close();
   }, [userId, businessId]);
 
   // Scroll to bottom when messages change
@@ -137,10 +226,14 @@ export default function LiveConversationsPage() {
 
     setSending(true);
     try {
-      await liveAPI.sendMessage(businessId, selectedConversation.id, newMessage.trim(), userId);
+      const { message } = await liveAPI.sendMessage(businessId, selectedConversation.id, newMessage.trim(), userId);
       setNewMessage("");
-      // Refresh to get the new message
-      await loadConversation(selectedConversation.id);
+      // Show it right away; the live feed echo is deduplicated by id
+      setSelectedConversation((prev) => {
+        if (!prev || prev.id !== selectedConversation.id) return prev;
+        if (message.id && prev.messages?.some((m) => m.id === message.id)) return prev;
+        return { ...prev, messages: [...(prev.messages ?? []), message] };
+      });
     } catch (err) {
       console.error("Failed to send message:", err);
       alert(lang === "fr" ? "Échec de l'envoi" : "Failed to send message");
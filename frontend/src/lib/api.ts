@@ -67,6 +67,9 @@ export interface Conversation {
   started_at: string;
   last_message_at: string;
   message_count?: number;
+  user_message_count?: number;
+  last_message_preview?: string;
+  last_message_role?: string;
   visitor_name?: string;
   visitor_email?: string;
   visitor_phone?: string;
@@ -76,8 +79,10 @@ export interface Conversation {
 }
 
 export interface Message {
+  id?: string;
   role: "user" | "assistant";
   content: string;
+  created_at?: string;
 }
 
 // API helper with auth
@@ -565,4 +570,20 @@ export const liveAPI = {
       method: "POST",
       body: JSON.stringify({ user_id: token, content }),
     }),
+
+  // Server-Sent Events feed of new messages, conversations and takeovers
+  eventsUrl: (businessId: string, token: string): string =>
+    `${API_URL}/api/live/${businessId}/events?user_id=${token}`,
 };
+
+// Payloads of the live events feed
+export interface LiveMessageEvent {
+  conversation_id: string;
+  message: Message;
+}
+
+export interface LiveTakeoverEvent {
+  conversation_id: string;
+  is_human_takeover: boolean;
+  taken_over_by: string | null;
+}
@@ -126,17 +126,40 @@ export class RavenChat {
 
   /**
    * Fetch business info (name, welcome message).
+   * The last response is kept in localStorage with its ETag and revalidated
+   * with If-None-Match, so unchanged info comes back as an empty 304.
    */
   async getBusinessInfo(): Promise<BusinessInfo> {
-    const response = await fetch(
-      `${this.apiUrl}/api/chat/business/${this.businessId}/public`
-    );
+    const storageKey = `raven_business_${this.businessId}`;
+    let cached: { etag: string; info: BusinessInfo } | null = null;
+    try {
+      cached = JSON.parse(localStorage.getItem(storageKey) || "null");
+    } catch {
+      cached = null;
+    }
+
+    const url = `${this.apiUrl}/api/chat/business/${this.businessId}/public`;
+    let response = await fetch(url, {
+      headers: cached ? { "If-None-Match": cached.etag } : {},
+    });
+
+    if (response.status === 304 && cached) {
+      return cached.info;
+    }
+    if (response.status === 304) {
+      response = await fetch(url, { cache: "no-store" });
+    }
 
     if (!response.ok) {
       throw new Error("Failed to fetch business info");
     }
 
-    return response.json();
+    const info: BusinessInfo = await response.json();
+    const etag = response.headers.get("ETag");
+    if (etag) {
+      localStorage.setItem(storageKey, JSON.stringify({ etag, info }));
+    }
+    return info;
   }
 
   /**
@@ -167,8 +190,15 @@ export class RavenChat {
 
   /**
    * Send a message and get a response.
+   * The reply is streamed over Server-Sent Events: `onToken` is called with
+   * the text received so far as tokens arrive, and the promise resolves with
+   * the final message once the server has saved it.
    */
-  async sendMessage(content: string, media?: MediaAttachment[]): Promise<SendMessageResult> {
+  async sendMessage(
+    content: string,
+    media?: MediaAttachment[],
+    onToken?: (partial: string) => void
+  ): Promise<SendMessageResult> {
     // Add user message to local messages
     this.messages.push({ role: "user", content, media });
 
@@ -182,10 +212,11 @@ export class RavenChat {
     const timeoutId = setTimeout(() => controller.abort(), 30000); // 30 second timeout
 
     try {
-      const response = await fetch(`${this.apiUrl}/api/chat`, {
+      const response = await fetch(`${this.apiUrl}/api/chat/stream`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          Accept: "text/event-stream",
         },
         body: JSON.stringify({
           business_id: this.businessId,
@@ -200,13 +231,13 @@ export class RavenChat {
         signal: controller.signal,
       });
 
-      clearTimeout(timeoutId);
-
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error("Failed to send message");
       }
 
-      const data: ChatResponse = await response.json();
+      const data = await this.readChatStream(response.body, onToken);
+
+      clearTimeout(timeoutId);
 
       // Save conversation ID for future messages
       this.conversationId = data.conversation_id;
@@ -230,6 +261,51 @@ export class RavenChat {
     }
   }
 
+  /**
+   * Read the SSE stream from /api/chat/stream.
+   * Forwards "token" events to `onToken` and resolves with the "done" payload.
+   */
+  private async readChatStream(
+    body: ReadableStream<Uint8Array>,
+    onToken?: (partial: string) => void
+  ): Promise<ChatResponse> {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let partial = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary = buffer.indexOf("\n\n");
+      while (boundary !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf("\n\n");
+
+        let event = "message";
+        let data = "";
+        for (const line of rawEvent.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) data += line.slice(5).trim();
+        }
+        if (!data) continue;
+
+        if (event === "token") {
+          partial += JSON.parse(data).content;
+          onToken?.(partial);
+        } else if (event === "done") {
+          return JSON.parse(data) as ChatResponse;
+        }
+      }
+    }
+
+    throw new Error("Chat stream ended unexpectedly");
+  }
+
   /**
    * Get all messages in the current conversation.
    */
@@ -563,8 +563,8 @@ class RavenWidget {
   /**
    * Add a message to the chat with read receipt support.
    */
-  private addMessage(role: "user" | "assistant", content: string, media?: MediaAttachment[], showRead = false): void {
-    if (!this.messagesContainer) return;
+  private addMessage(role: "user" | "assistant", content: string, media?: MediaAttachment[], showRead = false): HTMLSpanElement | null {
+    if (!this.messagesContainer) return null;
 
     // Track message count
     this.messageCount++;
@@ -611,6 +611,8 @@ class RavenWidget {
     if (this.messageCount >= this.MAX_MESSAGES_BEFORE_WARNING && !this.longConversationWarningShown) {
       this.showLongConversationWarning();
     }
+
+    return textEl;
   }
 
   /**
@@ -744,8 +746,17 @@ class RavenWidget {
         this.clearPendingImage();
       }
 
-      // Send to API
-      const response = await this.chat.sendMessage(content || "📷 Image", media);
+      // Send to API, rendering the reply as it streams in
+      let streamingText: HTMLSpanElement | null = null;
+      const response = await this.chat.sendMessage(content || "📷 Image", media, (partial) => {
+        if (!streamingText) {
+          this.removeTyping(typing);
+          streamingText = this.addMessage("assistant", partial);
+        } else {
+          streamingText.innerHTML = this.formatMessageText(partial);
+          this.scrollToBottom();
+        }
+      });
 
       // Remove typing indicator
       this.removeTyping(typing);
@@ -761,8 +772,13 @@ class RavenWidget {
       // Update agent status based on response
       this.updateAgentStatus(response.isHumanTakeover);
 
-      // Add assistant message
-      this.addMessage("assistant", response.message);
+      // Add assistant message (or replace the streamed text with the final one,
+      // which may include a booking confirmation added by the server)
+      if (streamingText) {
+        (streamingText as HTMLSpanElement).innerHTML = this.formatMessageText(response.message);
+      } else {
+        this.addMessage("assistant", response.message);
+      }
 
       // Show slot selection buttons if available
       if (response.availableSlots && response.availableSlots.length > 0) {